@@ -0,0 +1,50 @@
+# alembic/env.py
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from app.database import SQLALCHEMY_DATABASE_URL
+from app.models.usuario import Base
+from app.models import usuario, medico, paciente, consulta, prontuario, notificacao, job_lembrete, estatistica
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    """Gera o SQL das migrações (alembic upgrade head --sql) sem conectar ao banco."""
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def _migrar(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # ALTER TABLE no SQLite recria a tabela (benchmarks e CI)
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    # Conexão recebida de quem chamou alembic.command (testes das migrações)
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _migrar(connection)
+        return
+    # Conexão própria, sem pool nem os eventos de métricas do engine da aplicação
+    connectable = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        _migrar(connection)
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,142 @@
+"""esquema inicial
+
+Tabelas e índices exatamente como eram criados por Base.metadata.create_all antes
+da adoção das migrações; o que veio depois está nas revisões seguintes. Em um banco
+já criado assim, marque esta revisão sem executá-la e aplique as demais:
+
+    alembic stamp 0001
+    alembic upgrade head
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Tipos ENUM do PostgreSQL (os modelos gravam o nome do membro)
+ENUMS = {
+    "tipousuario": ("ADMINISTRADOR", "MEDICO", "RECEPCIONISTA"),
+    "sexo": ("MASCULINO", "FEMININO", "OUTRO"),
+    "tipocontato": ("CELULAR", "TELEFONE_FIXO", "WHATSAPP", "OUTRO"),
+    "statusconsulta": ("AGENDADA", "CONFIRMADA", "CANCELADA", "CONCLUIDA", "REMARCADA"),
+}
+
+def _enum(nome):
+    return postgresql.ENUM(*ENUMS[nome], name=nome, create_type=False)
+
+def _datas():
+    return [
+        sa.Column("data_criacao", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("data_atualizacao", sa.TIMESTAMP(timezone=True), nullable=True),
+    ]
+
+def upgrade():
+    bind = op.get_bind()
+    for nome, valores in ENUMS.items():
+        postgresql.ENUM(*valores, name=nome).create(bind, checkfirst=True)
+
+    op.create_table(
+        "usuarios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("senha_hash", sa.String(), nullable=False),
+        sa.Column("tipo", _enum("tipousuario"), nullable=False),
+        sa.Column("foto_perfil", sa.String(), nullable=True),
+        sa.Column("ativo", sa.Boolean(), nullable=True),
+        *_datas(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_usuarios_id", "usuarios", ["id"])
+    op.create_index("ix_usuarios_email", "usuarios", ["email"], unique=True)
+
+    op.create_table(
+        "medicos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("usuario_id", sa.Integer(), nullable=False),
+        sa.Column("crm", sa.String(), nullable=False),
+        sa.Column("especialidade", sa.String(), nullable=False),
+        sa.Column("telefone", sa.String(), nullable=False),
+        sa.Column("data_nascimento", sa.Date(), nullable=False),
+        sa.Column("cpf", sa.String(length=11), nullable=False),
+        sa.Column("horario_inicio_atendimento", sa.String(), nullable=False),
+        sa.Column("horario_fim_atendimento", sa.String(), nullable=False),
+        sa.Column("dias_atendimento", sa.String(), nullable=False),
+        sa.Column("tempo_consulta", sa.Integer(), nullable=False),
+        *_datas(),
+        sa.ForeignKeyConstraint(["usuario_id"], ["usuarios.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("cpf"),
+    )
+    op.create_index("ix_medicos_id", "medicos", ["id"])
+    op.create_index("ix_medicos_crm", "medicos", ["crm"], unique=True)
+
+    op.create_table(
+        "pacientes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nome", sa.String(), nullable=False),
+        sa.Column("cpf", sa.String(length=11), nullable=False),
+        sa.Column("data_nascimento", sa.Date(), nullable=False),
+        sa.Column("sexo", _enum("sexo"), nullable=False),
+        sa.Column("telefone", sa.String(), nullable=False),
+        sa.Column("tipo_contato", _enum("tipocontato"), nullable=False),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("endereco", sa.String(), nullable=True),
+        sa.Column("cidade", sa.String(), nullable=True),
+        sa.Column("estado", sa.String(), nullable=True),
+        sa.Column("cep", sa.String(), nullable=True),
+        *_datas(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_pacientes_id", "pacientes", ["id"])
+    op.create_index("ix_pacientes_cpf", "pacientes", ["cpf"], unique=True)
+
+    op.create_table(
+        "consultas",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("paciente_id", sa.Integer(), nullable=False),
+        sa.Column("medico_id", sa.Integer(), nullable=False),
+        sa.Column("data_consulta", sa.Date(), nullable=False),
+        sa.Column("hora_consulta", sa.Time(), nullable=False),
+        sa.Column("problema_saude", sa.Text(), nullable=True),
+        sa.Column("status", _enum("statusconsulta"), nullable=False),
+        sa.Column("notificacao_enviada", sa.Boolean(), nullable=True),
+        sa.Column("lembrete_enviado", sa.Boolean(), nullable=True),
+        sa.Column("observacoes", sa.Text(), nullable=True),
+        *_datas(),
+        sa.ForeignKeyConstraint(["medico_id"], ["medicos.id"]),
+        sa.ForeignKeyConstraint(["paciente_id"], ["pacientes.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_consultas_id", "consultas", ["id"])
+
+    op.create_table(
+        "prontuarios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("paciente_id", sa.Integer(), nullable=False),
+        sa.Column("consulta_id", sa.Integer(), nullable=False),
+        sa.Column("medico_id", sa.Integer(), nullable=False),
+        sa.Column("diagnostico", sa.Text(), nullable=True),
+        sa.Column("tratamento", sa.Text(), nullable=True),
+        sa.Column("observacoes", sa.Text(), nullable=True),
+        *_datas(),
+        sa.ForeignKeyConstraint(["consulta_id"], ["consultas.id"]),
+        sa.ForeignKeyConstraint(["medico_id"], ["medicos.id"]),
+        sa.ForeignKeyConstraint(["paciente_id"], ["pacientes.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_prontuarios_id", "prontuarios", ["id"])
+
+def downgrade():
+    for tabela in ("prontuarios", "consultas", "pacientes", "medicos", "usuarios"):
+        op.drop_table(tabela)
+    bind = op.get_bind()
+    for nome in ENUMS:
+        postgresql.ENUM(name=nome).drop(bind, checkfirst=True)
@@ -0,0 +1,89 @@
+"""colunas e índices da busca de pacientes
+
+- nome_busca (nome sem acentos, em minúsculas) e telefone_digitos, mantidas pelos
+  validadores do modelo Paciente; os pacientes já cadastrados são preenchidos aqui,
+  em lotes, com a mesma normalização (app.utils.helpers).
+- ix_pacientes_nome_busca_trgm: trigramas (GiST, extensão pg_trgm) para substring,
+  similaridade e ordenação pela distância sobre o nome normalizado.
+- ix_pacientes_cpf_prefixo e ix_pacientes_telefone_prefixo: text_pattern_ops, para
+  buscas por prefixo (LIKE '123%') usarem a b-tree.
+
+No PostgreSQL os índices são criados com CONCURRENTLY, depois de confirmado o
+preenchimento das colunas.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.helpers import normalizar_texto, apenas_digitos
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+TAMANHO_LOTE = 1000
+
+# Só as colunas usadas aqui, independentes do modelo atual
+pacientes = sa.table(
+    "pacientes",
+    sa.column("id", sa.Integer),
+    sa.column("nome", sa.String),
+    sa.column("telefone", sa.String),
+    sa.column("nome_busca", sa.String),
+    sa.column("telefone_digitos", sa.String),
+)
+
+INDICES = (
+    ("ix_pacientes_nome_busca_trgm", ["nome_busca"], {
+        "postgresql_using": "gist", "postgresql_ops": {"nome_busca": "gist_trgm_ops"},
+    }),
+    ("ix_pacientes_cpf_prefixo", ["cpf"], {"postgresql_ops": {"cpf": "text_pattern_ops"}}),
+    ("ix_pacientes_telefone_prefixo", ["telefone_digitos"], {"postgresql_ops": {"telefone_digitos": "text_pattern_ops"}}),
+)
+
+def preencher_colunas_busca(bind):
+    """Percorre os pacientes pelo id, em lotes, gravando as colunas normalizadas."""
+    atualizar = pacientes.update().where(pacientes.c.id == sa.bindparam("b_id")).values(
+        nome_busca=sa.bindparam("b_nome_busca"), telefone_digitos=sa.bindparam("b_telefone_digitos")
+    )
+    ultimo_id = 0
+    while True:
+        linhas = bind.execute(
+            sa.select(pacientes.c.id, pacientes.c.nome, pacientes.c.telefone).
+            where(pacientes.c.id > ultimo_id).order_by(pacientes.c.id).limit(TAMANHO_LOTE)
+        ).all()
+        if not linhas:
+            return
+        bind.execute(atualizar, [
+            {"b_id": linha.id, "b_nome_busca": normalizar_texto(linha.nome), "b_telefone_digitos": apenas_digitos(linha.telefone)}
+            for linha in linhas
+        ])
+        ultimo_id = linhas[-1].id
+
+def upgrade():
+    op.add_column("pacientes", sa.Column("nome_busca", sa.String(), nullable=True))
+    op.add_column("pacientes", sa.Column("telefone_digitos", sa.String(), nullable=True))
+    bind = op.get_bind()
+    # No SQL gerado (--sql) não há pacientes para ler; depois de aplicá-lo, preencha
+    # as colunas com python -m app.cli preencher-busca-pacientes
+    if not op.get_context().as_sql:
+        preencher_colunas_busca(bind)
+    if bind.dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    with op.get_context().autocommit_block():
+        for nome, colunas, opcoes in INDICES:
+            op.create_index(nome, "pacientes", colunas, postgresql_concurrently=True, **opcoes)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for nome, _, _ in reversed(INDICES):
+            op.drop_index(nome, table_name="pacientes", postgresql_concurrently=True)
+    with op.batch_alter_table("pacientes") as tabela:
+        tabela.drop_column("telefone_digitos")
+        tabela.drop_column("nome_busca")
@@ -0,0 +1,122 @@
+"""outbox de e-mails, jobs de lembretes e estatísticas do dashboard
+
+- notificacoes_email: outbox gravado na mesma transação da consulta e enviado pelo
+  worker (app.services.notificacao_service).
+- jobs_lembretes: progresso de cada envio de lembretes, com no máximo um job em
+  andamento por data (uq_jobs_lembretes_data_em_andamento).
+- estatisticas_consultas_dia e estatisticas_pacientes_dia: contadores mantidos pelo
+  dashboard_service a cada escrita. São preenchidos aqui a partir das consultas e dos
+  pacientes já cadastrados, como faz `python -m app.cli reconstruir-estatisticas`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+ENUMS = {
+    "tiponotificacao": ("NOTIFICACAO", "LEMBRETE"),
+    "statusnotificacao": ("PENDENTE", "ENVIADA", "FALHA"),
+    "statusjob": ("EM_ANDAMENTO", "CONCLUIDO", "FALHOU"),
+}
+
+def _enum(nome, valores=None):
+    return postgresql.ENUM(*(valores or ENUMS[nome]), name=nome, create_type=False)
+
+# statusconsulta já existe (revisão 0001)
+STATUS_CONSULTA = ("AGENDADA", "CONFIRMADA", "CANCELADA", "CONCLUIDA", "REMARCADA")
+
+def preencher_estatisticas():
+    # date() existe no PostgreSQL e no SQLite (CAST AS DATE não funciona no SQLite)
+    op.execute(
+        "INSERT INTO estatisticas_consultas_dia (data, medico_id, status, total) "
+        "SELECT data_consulta, medico_id, status, count(*) FROM consultas "
+        "GROUP BY data_consulta, medico_id, status"
+    )
+    op.execute(
+        "INSERT INTO estatisticas_pacientes_dia (data, novos) "
+        "SELECT date(data_criacao), count(*) FROM pacientes "
+        "WHERE data_criacao IS NOT NULL GROUP BY date(data_criacao)"
+    )
+
+def upgrade():
+    bind = op.get_bind()
+    for nome, valores in ENUMS.items():
+        postgresql.ENUM(*valores, name=nome).create(bind, checkfirst=True)
+
+    op.create_table(
+        "notificacoes_email",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("consulta_id", sa.Integer(), nullable=True),
+        sa.Column("tipo", _enum("tiponotificacao"), nullable=False),
+        sa.Column("destinatario", sa.String(), nullable=False),
+        sa.Column("assunto", sa.String(), nullable=False),
+        sa.Column("corpo", sa.Text(), nullable=False),
+        sa.Column("status", _enum("statusnotificacao"), nullable=False),
+        sa.Column("tentativas", sa.Integer(), nullable=False),
+        sa.Column("proxima_tentativa", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("ultimo_erro", sa.Text(), nullable=True),
+        sa.Column("data_criacao", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("data_envio", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["consulta_id"], ["consultas.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_notificacoes_email_id", "notificacoes_email", ["id"])
+    op.create_index(
+        "ix_notificacoes_email_status_proxima_tentativa", "notificacoes_email", ["status", "proxima_tentativa"]
+    )
+
+    op.create_table(
+        "jobs_lembretes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("data_referencia", sa.Date(), nullable=False),
+        sa.Column("status", _enum("statusjob"), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("enviados", sa.Integer(), nullable=False),
+        sa.Column("erros", sa.Integer(), nullable=False),
+        sa.Column("ultimo_consulta_id", sa.Integer(), nullable=False),
+        sa.Column("ultimo_erro", sa.Text(), nullable=True),
+        sa.Column("data_criacao", sa.TIMESTAMP(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("data_atualizacao", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("data_conclusao", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_jobs_lembretes_id", "jobs_lembretes", ["id"])
+    op.create_index("ix_jobs_lembretes_data_referencia", "jobs_lembretes", ["data_referencia"])
+    op.create_index(
+        "uq_jobs_lembretes_data_em_andamento", "jobs_lembretes", ["data_referencia"], unique=True,
+        postgresql_where=sa.text("status = 'EM_ANDAMENTO'"), sqlite_where=sa.text("status = 'EM_ANDAMENTO'"),
+    )
+
+    op.create_table(
+        "estatisticas_consultas_dia",
+        sa.Column("data", sa.Date(), nullable=False),
+        sa.Column("medico_id", sa.Integer(), nullable=False),
+        sa.Column("status", _enum("statusconsulta", STATUS_CONSULTA), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["medico_id"], ["medicos.id"]),
+        sa.PrimaryKeyConstraint("data", "medico_id", "status"),
+    )
+
+    op.create_table(
+        "estatisticas_pacientes_dia",
+        sa.Column("data", sa.Date(), nullable=False),
+        sa.Column("novos", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("data"),
+    )
+
+    preencher_estatisticas()
+
+def downgrade():
+    for tabela in ("estatisticas_pacientes_dia", "estatisticas_consultas_dia", "jobs_lembretes", "notificacoes_email"):
+        op.drop_table(tabela)
+    bind = op.get_bind()
+    for nome in ENUMS:
+        postgresql.ENUM(name=nome).drop(bind, checkfirst=True)
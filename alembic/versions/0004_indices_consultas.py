@@ -0,0 +1,87 @@
+"""índices das consultas mais frequentes
+
+Cada índice atende um caminho quente da aplicação (tests/test_planos.py e
+benchmarks/planos_consultas.py conferem os planos com EXPLAIN):
+
+- uq_consultas_medico_horario_ativo: único e parcial, garante no banco que um médico
+  não tenha duas consultas ativas no mesmo horário; também atende conflitos e
+  horários livres, que ignoram as canceladas.
+- ix_consultas_medico_data_status: agenda do médico no período, com qualquer status
+  (listagem filtrada por médico, consultas do médico logado, dashboard).
+- ix_consultas_data_hora: listagem e exportação por período na ordem do cursor
+  (data, hora, id), sem ordenação em memória.
+- ix_consultas_lembretes_pendentes: parcial, só consultas confirmadas com lembrete
+  pendente; fica pequeno mesmo com anos de histórico.
+- ix_medicos_usuario_id: médico do usuário autenticado.
+- ix_consultas_paciente_data: consultas do paciente em ordem cronológica (listagem
+  filtrada por paciente, linha do tempo).
+- ix_prontuarios_consulta_id: prontuário de uma consulta.
+- ix_prontuarios_paciente_data: prontuários do paciente em ordem cronológica.
+
+Um banco anterior a essa garantia pode ter horários duplicados; nesse caso a migração
+para antes de criar os índices e lista os conflitos, que precisam ser cancelados ou
+remarcados.
+
+No PostgreSQL os índices são criados com CONCURRENTLY, sem bloquear as escritas
+nas tabelas durante a migração.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDICES = (
+    ("uq_consultas_medico_horario_ativo", "consultas", ["medico_id", "data_consulta", "hora_consulta"], {
+        "unique": True,
+        "postgresql_where": sa.text("status <> 'CANCELADA'"),
+        "sqlite_where": sa.text("status <> 'CANCELADA'"),
+    }),
+    ("ix_consultas_paciente_data", "consultas", ["paciente_id", "data_consulta", "hora_consulta"], {}),
+    ("ix_consultas_medico_data_status", "consultas", ["medico_id", "data_consulta", "status"], {}),
+    ("ix_consultas_data_hora", "consultas", ["data_consulta", "hora_consulta", "id"], {}),
+    ("ix_consultas_lembretes_pendentes", "consultas", ["data_consulta", "id"], {
+        "postgresql_where": sa.text("status = 'CONFIRMADA' AND lembrete_enviado = false"),
+        "sqlite_where": sa.text("status = 'CONFIRMADA' AND lembrete_enviado = 0"),
+    }),
+    ("ix_medicos_usuario_id", "medicos", ["usuario_id"], {}),
+    ("ix_prontuarios_consulta_id", "prontuarios", ["consulta_id"], {}),
+    ("ix_prontuarios_paciente_data", "prontuarios", ["paciente_id", "data_criacao"], {}),
+)
+
+def verificar_horarios_duplicados(bind):
+    """Um índice único que falha no meio do CONCURRENTLY fica inválido; melhor parar antes."""
+    duplicados = bind.execute(sa.text(
+        "SELECT medico_id, data_consulta, hora_consulta, count(*) FROM consultas "
+        "WHERE status <> 'CANCELADA' GROUP BY medico_id, data_consulta, hora_consulta "
+        "HAVING count(*) > 1 ORDER BY data_consulta, hora_consulta LIMIT 20"
+    )).all()
+    if duplicados:
+        conflitos = "\n".join(
+            f"  médico {medico_id}, {data} {hora}: {total} consultas ativas"
+            for medico_id, data, hora, total in duplicados
+        )
+        raise RuntimeError(
+            "Há consultas ativas no mesmo horário do mesmo médico; cancele ou remarque "
+            f"antes de aplicar esta migração:\n{conflitos}"
+        )
+
+def upgrade():
+    if not op.get_context().as_sql:
+        verificar_horarios_duplicados(op.get_bind())
+    # CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    with op.get_context().autocommit_block():
+        for nome, tabela, colunas, opcoes in INDICES:
+            op.create_index(nome, tabela, colunas, postgresql_concurrently=True, **opcoes)
+    op.execute("ANALYZE consultas")
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for nome, tabela, _, _ in reversed(INDICES):
+            op.drop_index(nome, table_name=tabela, postgresql_concurrently=True)
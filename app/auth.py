@@ -1,23 +1,70 @@
 # app/auth.py
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 from .config import settings
 from .schemas.auth import TokenData
 from .models.usuario import Usuario, TipoUsuario
-from .database import get_db
+from .database import get_db, get_async_db
+from .utils.cache import CachePrincipais, CachePrincipaisRedis
+from .utils.security import pool_hashing
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
+@dataclass(frozen=True)
+class Principal:
+    """Dados do usuário autenticado necessários para autorização, mantidos em cache."""
+    id: int
+    email: str
+    nome: str
+    tipo: TipoUsuario
+    ativo: bool
+
+def _codificar_principal(user: Principal):
+    return [user.id, user.email, user.nome, user.tipo.name, user.ativo]
+
+def _decodificar_principal(valores) -> Principal:
+    id, email, nome, tipo, ativo = valores
+    return Principal(id, email, nome, TipoUsuario[tipo], ativo)
+
+def criar_cache_principais():
+    if settings.AUTH_CACHE_BACKEND == "redis":
+        return CachePrincipaisRedis(
+            settings.AUTH_CACHE_URL,
+            ttl=settings.AUTH_CACHE_TTL_SEGUNDOS,
+            codificar=_codificar_principal,
+            decodificar=_decodificar_principal
+        )
+    return CachePrincipais(settings.AUTH_CACHE_TAMANHO, ttl=settings.AUTH_CACHE_TTL_SEGUNDOS)
+
+# Principais já resolvidos, indexados pelo e-mail (subject do token)
+cache_principais = criar_cache_principais()
+
+def invalidar_principal(*emails: str):
+    """Deve ser chamado sempre que e-mail, tipo ou status (ativo) de um usuário mudar."""
+    for email in emails:
+        if email:
+            cache_principais.invalidar(email)
+
+# O bcrypt roda no pool de processos de utils.security, fora do threadpool das requisições
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    valida, _ = pool_hashing.verificar_e_atualizar(plain_password, hashed_password)
+    return valida
+
+def verify_password_and_update(plain_password, hashed_password):
+    """Retorna (valida, novo_hash); novo_hash vem preenchido quando o custo do bcrypt mudou."""
+    return pool_hashing.verificar_e_atualizar(plain_password, hashed_password)
+
+async def verify_password_and_update_async(plain_password, hashed_password):
+    return await pool_hashing.verificar_e_atualizar_async(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return pool_hashing.gerar_hash(password)
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -29,12 +76,14 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Credenciais inválidas",
-        headers={"WWW-Authenticate": "Bearer"},
+def create_user_token(user: Usuario):
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.email, "tipo": user.tipo.value}, expires_delta=access_token_expires
     )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+def _email_do_token(token: str, credentials_exception: HTTPException) -> str:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
@@ -43,13 +92,59 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = db.query(Usuario).filter(Usuario.email == token_data.email).first()
-    if user is None:
-        raise credentials_exception
+    return token_data.email
+
+def _principal_em_cache(email: str):
+    return cache_principais.obter(email) if settings.AUTH_CACHE_TTL_SEGUNDOS > 0 else None
+
+def _geracao_principal(email: str):
+    """Lida antes da busca no banco, para que um resultado já invalidado não seja guardado."""
+    return cache_principais.geracao(email) if settings.AUTH_CACHE_TTL_SEGUNDOS > 0 else None
+
+def _guardar_principal(linha, geracao) -> Principal:
+    user = Principal(*linha)
+    if geracao is not None:
+        cache_principais.guardar(user.email, user, geracao)
+    return user
+
+def _verificar_ativo(user: Principal) -> Principal:
     if not user.ativo:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuário inativo")
     return user
 
+def _credenciais_invalidas():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Credenciais inválidas",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+COLUNAS_PRINCIPAL = (Usuario.id, Usuario.email, Usuario.nome, Usuario.tipo, Usuario.ativo)
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    credentials_exception = _credenciais_invalidas()
+    email = _email_do_token(token, credentials_exception)
+    user = _principal_em_cache(email)
+    if user is None:
+        geracao = _geracao_principal(email)
+        linha = db.query(*COLUNAS_PRINCIPAL).filter(Usuario.email == email).first()
+        if linha is None:
+            raise credentials_exception
+        user = _guardar_principal(linha, geracao)
+    return _verificar_ativo(user)
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    credentials_exception = _credenciais_invalidas()
+    email = _email_do_token(token, credentials_exception)
+    user = _principal_em_cache(email)
+    if user is None:
+        geracao = _geracao_principal(email)
+        linha = (await db.execute(select(*COLUNAS_PRINCIPAL).where(Usuario.email == email))).first()
+        if linha is None:
+            raise credentials_exception
+        user = _guardar_principal(linha, geracao)
+    return _verificar_ativo(user)
+
 def get_current_active_user(current_user: Usuario = Depends(get_current_user)):
     if not current_user.ativo:
         raise HTTPException(status_code=400, detail="Usuário inativo")
@@ -67,4 +162,7 @@ def medico_required(current_user: Usuario = Depends(get_current_user)):
 
 def recepcionista_or_above_required(current_user: Usuario = Depends(get_current_user)):
     # Todos os usuários autenticados têm pelo menos o nível de recepcionista
+    return current_user
+
+def recepcionista_or_above_required_async(current_user: Principal = Depends(get_current_user_async)):
     return current_user
\ No newline at end of file
@@ -0,0 +1,71 @@
+# app/cli.py
+"""
+Comandos de manutenção:
+
+    python -m app.cli reconstruir-estatisticas [--inicio AAAA-MM-DD] [--fim AAAA-MM-DD]
+    python -m app.cli importar-pacientes arquivo.csv [--rejeicoes rejeitadas.csv]
+    python -m app.cli preencher-busca-pacientes [--lote 1000]
+"""
+import argparse
+import csv
+import sys
+from datetime import date
+from .database import SessionLocal
+from .main import app  # noqa: F401  (registra modelos e eventos)
+from .services.dashboard_service import reconstruir_estatisticas
+from .services.importacao_service import importar_pacientes_csv
+from .services.paciente_service import preencher_colunas_busca
+
+def cmd_reconstruir_estatisticas(args):
+    with SessionLocal() as db:
+        reconstruir_estatisticas(db, args.inicio, args.fim)
+    print("Estatísticas do dashboard reconstruídas")
+
+def cmd_importar_pacientes(args):
+    with SessionLocal() as db, open(args.arquivo, encoding="utf-8-sig", newline="") as arquivo:
+        try:
+            resultado = importar_pacientes_csv(db, arquivo)
+        except ValueError as e:
+            sys.exit(f"Arquivo inválido: {e}")
+        db.commit()
+    
+    if args.rejeicoes and resultado["rejeicoes"]:
+        with open(args.rejeicoes, "w", encoding="utf-8", newline="") as saida:
+            escritor = csv.DictWriter(saida, fieldnames=["linha", "cpf", "erro"])
+            escritor.writeheader()
+            escritor.writerows(resultado["rejeicoes"])
+    else:
+        for rejeicao in resultado["rejeicoes"]:
+            print(f"linha {rejeicao['linha']}: {rejeicao['erro']}", file=sys.stderr)
+    print(f"{resultado['importados']} de {resultado['total']} pacientes importados, {resultado['rejeitados']} rejeitados")
+
+def cmd_preencher_busca_pacientes(args):
+    with SessionLocal() as db:
+        atualizados = preencher_colunas_busca(db, args.lote)
+    print(f"Colunas de busca preenchidas em {atualizados} pacientes")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    
+    reconstruir = comandos.add_parser("reconstruir-estatisticas", help="recalcula as tabelas do dashboard")
+    reconstruir.add_argument("--inicio", type=date.fromisoformat)
+    reconstruir.add_argument("--fim", type=date.fromisoformat)
+    reconstruir.set_defaults(executar=cmd_reconstruir_estatisticas)
+    
+    importar = comandos.add_parser("importar-pacientes", help="importa pacientes de um CSV em lote")
+    importar.add_argument("arquivo")
+    importar.add_argument("--rejeicoes", help="grava as linhas rejeitadas neste CSV em vez de listá-las")
+    importar.set_defaults(executar=cmd_importar_pacientes)
+    
+    preencher = comandos.add_parser(
+        "preencher-busca-pacientes", help="preenche nome_busca e telefone_digitos dos pacientes antigos"
+    )
+    preencher.add_argument("--lote", type=int, default=1000)
+    preencher.set_defaults(executar=cmd_preencher_busca_pacientes)
+    
+    args = parser.parse_args(argv)
+    args.executar(args)
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,60 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Cache do usuário autenticado (0 desativa). Com mais de um processo, use o backend
+    # "redis" para que a invalidação (troca de perfil, desativação) valha para todos
+    AUTH_CACHE_TTL_SEGUNDOS: int = int(os.getenv("AUTH_CACHE_TTL_SEGUNDOS", "60"))
+    AUTH_CACHE_TAMANHO: int = int(os.getenv("AUTH_CACHE_TAMANHO", "10000"))
+    AUTH_CACHE_BACKEND: str = os.getenv("AUTH_CACHE_BACKEND", "memoria")
+    AUTH_CACHE_URL: Optional[str] = os.getenv("AUTH_CACHE_URL", os.getenv("DISPONIBILIDADE_CACHE_URL"))
+    
+    # Listas grandes montadas direto das linhas do SQL e codificadas com orjson
+    SERIALIZACAO_RAPIDA: bool = os.getenv("SERIALIZACAO_RAPIDA", "true").lower() == "true"
+    
+    # Diretório de médicos em memória; o TTL limita a defasagem entre processos
+    DIRETORIO_MEDICOS_TTL_SEGUNDOS: int = int(os.getenv("DIRETORIO_MEDICOS_TTL_SEGUNDOS", "300"))
+    
+    # Hashing de senhas (bcrypt) em pool de processos dedicado
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    HASH_PROCESSOS: int = int(os.getenv("HASH_PROCESSOS", "2"))
+    HASH_FILA_MAXIMA: int = int(os.getenv("HASH_FILA_MAXIMA", "8"))
+    HASH_TIMEOUT_SEGUNDOS: float = float(os.getenv("HASH_TIMEOUT_SEGUNDOS", "10"))
+    
     # Configurações do banco de dados
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
     POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "localhost")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "consultas_medicas")
+    # URL completa que substitui as variáveis POSTGRES_*; aceita sqlite:///arquivo.db (benchmarks, CI)
+    DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
+    # create_all na inicialização (desenvolvimento); em produção o esquema vem de "alembic upgrade head"
+    DB_CRIAR_TABELAS: bool = os.getenv("DB_CRIAR_TABELAS", "true").lower() == "true"
+    
+    # Pool de conexões
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # 0 = sem limite
+    # Compatível com PgBouncer (transaction pooling): nenhum estado de sessão no servidor
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+    # Réplicas de leitura (URLs separadas por vírgula) para listagens, buscas, disponibilidade e dashboard
+    DB_REPLICAS_URLS: str = os.getenv("DB_REPLICAS_URLS", "")
+    # Depois de uma escrita, as leituras do mesmo cliente vão ao primário por esta janela
+    DB_LEITURA_PRIMARIO_SEGUNDOS: float = float(os.getenv("DB_LEITURA_PRIMARIO_SEGUNDOS", "5"))
+    # Réplicas atrasadas além deste limite (ou fora do ar) deixam de receber leituras
+    DB_REPLICA_ATRASO_MAXIMO_SEGUNDOS: float = float(os.getenv("DB_REPLICA_ATRASO_MAXIMO_SEGUNDOS", "2"))
+    DB_REPLICA_VERIFICACAO_SEGUNDOS: float = float(os.getenv("DB_REPLICA_VERIFICACAO_SEGUNDOS", "5"))
+    # Caminho assíncrono (asyncpg) para as rotas mais acessadas; false mantém só as rotas síncronas
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() == "true"
+    
+    # Métricas (/metrics no formato do Prometheus): a coleta exige "Authorization: Bearer <token>";
+    # sem token definido, /metrics responde 404
+    METRICAS_TOKEN: Optional[str] = os.getenv("METRICAS_TOKEN")
+    # Avisa quando uma requisição executa a mesma instrução SQL mais vezes que isto (0 desativa)
+    SQL_N_MAIS_UM_LIMITE: int = int(os.getenv("SQL_N_MAIS_UM_LIMITE", "0"))
     
     # Configurações de e-mail
     SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -28,6 +76,25 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
     EMAIL_FROM: str = os.getenv("EMAIL_FROM", "")
     
+    # Outbox de e-mails (envio em segundo plano)
+    OUTBOX_WORKER_HABILITADO: bool = os.getenv("OUTBOX_WORKER_HABILITADO", "true").lower() == "true"
+    OUTBOX_INTERVALO_SEGUNDOS: float = float(os.getenv("OUTBOX_INTERVALO_SEGUNDOS", "5"))
+    OUTBOX_TAMANHO_LOTE: int = int(os.getenv("OUTBOX_TAMANHO_LOTE", "50"))
+    OUTBOX_MAX_TENTATIVAS: int = int(os.getenv("OUTBOX_MAX_TENTATIVAS", "5"))
+    OUTBOX_BACKOFF_SEGUNDOS: int = int(os.getenv("OUTBOX_BACKOFF_SEGUNDOS", "60"))
+    
+    # Envio de lembretes em lote
+    LEMBRETES_TAMANHO_LOTE: int = int(os.getenv("LEMBRETES_TAMANHO_LOTE", "200"))
+    LEMBRETES_CONEXOES_SMTP: int = int(os.getenv("LEMBRETES_CONEXOES_SMTP", "4"))
+    LEMBRETES_MAX_TENTATIVAS: int = int(os.getenv("LEMBRETES_MAX_TENTATIVAS", "3"))
+    LEMBRETES_BACKOFF_SEGUNDOS: float = float(os.getenv("LEMBRETES_BACKOFF_SEGUNDOS", "2"))
+    
+    # Cache de disponibilidade ("memoria" ou "redis")
+    DISPONIBILIDADE_CACHE_BACKEND: str = os.getenv("DISPONIBILIDADE_CACHE_BACKEND", "memoria")
+    DISPONIBILIDADE_CACHE_URL: Optional[str] = os.getenv("DISPONIBILIDADE_CACHE_URL")
+    DISPONIBILIDADE_CACHE_TAMANHO: int = int(os.getenv("DISPONIBILIDADE_CACHE_TAMANHO", "4096"))
+    DISPONIBILIDADE_CACHE_TTL_SEGUNDOS: int = int(os.getenv("DISPONIBILIDADE_CACHE_TTL_SEGUNDOS", "300"))
+    
     class Config:
         env_file = ".env"
 
@@ -1,18 +1,304 @@
 # app/database.py
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import Counter
+from sqlalchemy import create_engine, event, exc, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from .config import settings
+from .utils.metricas import registrar_instrucao
+from .utils.replicas import ler_do_primario
 
-SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+logger = logging.getLogger("app.replicas")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL or f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+
+def url_assincrona(url: str) -> str:
+    """Mesmo banco, pelo driver assíncrono (asyncpg ou aiosqlite)."""
+    for sincrono, assincrono in (("postgresql://", "postgresql+asyncpg://"), ("sqlite://", "sqlite+aiosqlite://")):
+        if url.startswith(sincrono):
+            return assincrono + url[len(sincrono):]
+    return url
+
+ASYNC_DATABASE_URL = url_assincrona(SQLALCHEMY_DATABASE_URL)
+
+class MetricasPool:
+    """Tempo de espera por conexão (checkout) e timeouts do pool."""
+
+    LIMITES_HISTOGRAMA = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+        self.histograma = [0] * (len(self.LIMITES_HISTOGRAMA) + 1)
+
+    def registrar_checkout(self, espera: float):
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+            indice = next(
+                (i for i, limite in enumerate(self.LIMITES_HISTOGRAMA) if espera <= limite),
+                len(self.LIMITES_HISTOGRAMA)
+            )
+            self.histograma[indice] += 1
+
+    def registrar_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+metricas_pool = MetricasPool()
+
+class QueuePoolInstrumentado(QueuePool):
+    """QueuePool que mede quanto tempo cada checkout esperou por uma conexão."""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super()._do_get()
+        except exc.TimeoutError:
+            metricas_pool.registrar_timeout()
+            raise
+        metricas_pool.registrar_checkout(time.perf_counter() - inicio)
+        return conexao
+
+def instrumentar_engine(engine):
+    """Registra, para cada instrução SQL, o tempo de execução e as linhas retornadas (ver utils.metricas)."""
+    @event.listens_for(engine, "before_cursor_execute")
+    def iniciar_instrucao(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("inicio_instrucoes", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def concluir_instrucao(conn, cursor, statement, parameters, context, executemany):
+        duracao = time.perf_counter() - conn.info["inicio_instrucoes"].pop()
+        # Para SELECT, o psycopg2 informa em rowcount as linhas recebidas; outros drivers podem informar -1
+        linhas = cursor.rowcount if cursor.description is not None and cursor.rowcount > 0 else 0
+        registrar_instrucao(statement, duracao, linhas)
+
+def criar_engine(url: str, poolclass=QueuePoolInstrumentado, **kwargs):
+    connect_args = {}
+    postgresql = url.startswith("postgresql")
+    if url.startswith("sqlite"):
+        # SQLite (benchmarks, CI): a mesma conexão do pool passa por várias threads
+        connect_args["check_same_thread"] = False
+    elif postgresql and settings.DB_STATEMENT_TIMEOUT_MS and not settings.DB_PGBOUNCER:
+        # Parâmetro de inicialização da sessão; o PgBouncer não repassa "options"
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    
+    engine = create_engine(
+        url,
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args=connect_args,
+        **kwargs
+    )
+    
+    if postgresql and settings.DB_STATEMENT_TIMEOUT_MS and settings.DB_PGBOUNCER:
+        # Com PgBouncer em modo transação, o limite vale só para a transação atual
+        @event.listens_for(engine, "begin")
+        def definir_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+    
+    instrumentar_engine(engine)
+    return engine
+
+engine = criar_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def criar_async_engine(url: str):
+    connect_args = {}
+    postgresql = url.startswith("postgresql")
+    if postgresql and settings.DB_PGBOUNCER:
+        # O PgBouncer em modo transação não suporta prepared statements nomeados
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+    elif postgresql and settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    
+    # O aiosqlite usa NullPool, que não aceita os parâmetros de tamanho do pool
+    opcoes_pool = dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    ) if postgresql else {}
+    async_engine = create_async_engine(url, connect_args=connect_args, **opcoes_pool)
+    
+    if postgresql and settings.DB_STATEMENT_TIMEOUT_MS and settings.DB_PGBOUNCER:
+        @event.listens_for(async_engine.sync_engine, "begin")
+        def definir_statement_timeout(conn):
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+    
+    instrumentar_engine(async_engine.sync_engine)
+    return async_engine
+
+# Criado só no modo assíncrono, para não exigir o asyncpg no modo síncrono
+async_engine = criar_async_engine(ASYNC_DATABASE_URL) if settings.DB_ASYNC else None
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False) if async_engine else None
+
+# ---------------------------------------------------------------------------
+# Réplicas de leitura
+# ---------------------------------------------------------------------------
+
+# Atraso de replay da réplica; zero quando ela já aplicou todo o WAL recebido (sem
+# escritas no primário, pg_last_xact_replay_timestamp envelhece sem haver atraso)
+SQL_ATRASO_REPLICA = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class Replica:
+    def __init__(self, nome: str, url: str):
+        self.nome = nome
+        # O pool das réplicas não entra nas métricas do pool do primário
+        self.engine = criar_engine(url, poolclass=QueuePool)
+        self.async_engine = criar_async_engine(url_assincrona(url)) if settings.DB_ASYNC else None
+        self.disponivel = True
+        self.atraso = None  # segundos; None enquanto não medido
+        self.verificada_em = float("-inf")
+
+    def medir_atraso(self):
+        with self.engine.connect() as conexao:
+            if conexao.dialect.name != "postgresql":
+                return 0.0
+            return float(conexao.execute(SQL_ATRASO_REPLICA).scalar())
+
+class RoteadorLeituras:
+    """
+    Distribui as sessões das rotas somente leitura entre as réplicas, em rodízio.
+    Ficam no primário os clientes que escreveram há pouco (utils.replicas) e as
+    leituras feitas quando nenhuma réplica está no ar dentro do atraso máximo. O
+    atraso de cada réplica é medido a cada DB_REPLICA_VERIFICACAO_SEGUNDOS, pela
+    primeira requisição que encontrar a medição vencida.
+    """
+
+    def __init__(self, urls):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls)]
+        self._rodizio = itertools.count()
+        self._lock = threading.Lock()
+        self.decisoes = Counter()  # (destino, motivo)
+
+    def atualizar_atrasos(self):
+        agora = time.monotonic()
+        with self._lock:
+            vencidas = [r for r in self.replicas if agora - r.verificada_em >= settings.DB_REPLICA_VERIFICACAO_SEGUNDOS]
+            for replica in vencidas:
+                replica.verificada_em = agora
+        for replica in vencidas:
+            try:
+                replica.atraso = replica.medir_atraso()
+                replica.disponivel = True
+            except exc.SQLAlchemyError as erro:
+                if replica.disponivel:
+                    logger.warning("Réplica %s indisponível, leituras vão ao primário: %s", replica.nome, erro)
+                replica.disponivel = False
+
+    def escolher(self):
+        """Réplica da próxima sessão de leitura, ou None para usar o primário."""
+        replica = None
+        if not self.replicas:
+            motivo = "sem_replicas"
+        elif ler_do_primario():
+            motivo = "escrita_recente"
+        else:
+            self.atualizar_atrasos()
+            elegiveis = [
+                r for r in self.replicas
+                if r.disponivel and (r.atraso or 0.0) <= settings.DB_REPLICA_ATRASO_MAXIMO_SEGUNDOS
+            ]
+            if elegiveis:
+                replica = elegiveis[next(self._rodizio) % len(elegiveis)]
+                motivo = "rodizio"
+            else:
+                motivo = "replicas_indisponiveis"
+        with self._lock:
+            self.decisoes[(replica.nome if replica else "primario", motivo)] += 1
+        return replica
+
+    def estatisticas(self):
+        with self._lock:
+            decisoes = [
+                {"destino": destino, "motivo": motivo, "total": total}
+                for (destino, motivo), total in sorted(self.decisoes.items())
+            ]
+        return {
+            "replicas": [
+                {"nome": r.nome, "disponivel": r.disponivel, "atraso_segundos": r.atraso}
+                for r in self.replicas
+            ],
+            "decisoes": decisoes
+        }
+
+roteador_leituras = RoteadorLeituras([url.strip() for url in settings.DB_REPLICAS_URLS.split(",") if url.strip()])
+SessionLeitura = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLeitura = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+def em_replica(db) -> bool:
+    """Se a sessão (síncrona ou assíncrona) lê de uma réplica."""
+    return db.info.get("replica") is not None
+
+def estatisticas_pool():
+    pool = engine.pool
+    with metricas_pool._lock:
+        return {
+            "tamanho": pool.size(),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "em_uso": pool.checkedout(),
+            "disponiveis": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": metricas_pool.checkouts,
+            "timeouts": metricas_pool.timeouts,
+            "espera_media_segundos": metricas_pool.espera_total / metricas_pool.checkouts if metricas_pool.checkouts else 0.0,
+            "espera_maxima_segundos": metricas_pool.espera_maxima,
+            "histograma_espera_segundos": {
+                **{str(limite): total for limite, total in zip(MetricasPool.LIMITES_HISTOGRAMA, metricas_pool.histograma)},
+                "+Inf": metricas_pool.histograma[-1]
+            }
+        }
+
 # Dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db():
+    """Sessão das rotas somente leitura: uma réplica, quando houver, ou o primário."""
+    replica = roteador_leituras.escolher()
+    db = SessionLeitura(bind=replica.engine) if replica else SessionLocal()
+    db.info["replica"] = replica.nome if replica else None
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db():
+    # A medição do atraso é síncrona; com réplicas, a escolha sai do event loop
+    if roteador_leituras.replicas:
+        replica = await asyncio.to_thread(roteador_leituras.escolher)
+    else:
+        replica = roteador_leituras.escolher()
+    async with (AsyncSessionLeitura(bind=replica.async_engine) if replica else AsyncSessionLocal()) as db:
+        db.info["replica"] = replica.nome if replica else None
+        yield db
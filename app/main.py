@@ -0,0 +1,65 @@
+# app/main.py
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from .config import settings
+from .database import engine, async_engine
+from .models.usuario import Base
+from .models import usuario, medico, paciente, consulta, prontuario, notificacao, job_lembrete, estatistica
+from .routes import auth, usuarios, medicos, pacientes, consultas, prontuarios, dashboard, metricas
+from .routes import auth_async, pacientes_async, consultas_async
+from .services.notificacao_service import processador_notificacoes
+from .services.lembrete_service import retomar_jobs_lembretes
+from .utils.security import pool_hashing, PoolHashingSaturado
+from .utils.metricas import MiddlewareMetricas
+from .utils.replicas import MiddlewareLeituraPrimario
+
+app = FastAPI(title=settings.APP_NAME, debug=settings.DEBUG)
+if settings.DB_REPLICAS_URLS:
+    app.add_middleware(MiddlewareLeituraPrimario)
+app.add_middleware(MiddlewareMetricas)
+
+# No modo assíncrono, as rotas async são registradas antes e atendem os mesmos caminhos
+if settings.DB_ASYNC:
+    app.include_router(auth_async.router, prefix=settings.API_PREFIX)
+    app.include_router(pacientes_async.router, prefix=settings.API_PREFIX)
+    app.include_router(consultas_async.router, prefix=settings.API_PREFIX)
+
+app.include_router(auth.router, prefix=settings.API_PREFIX)
+app.include_router(usuarios.router, prefix=settings.API_PREFIX)
+app.include_router(medicos.router, prefix=settings.API_PREFIX)
+app.include_router(pacientes.router, prefix=settings.API_PREFIX)
+app.include_router(consultas.router, prefix=settings.API_PREFIX)
+app.include_router(prontuarios.router, prefix=settings.API_PREFIX)
+app.include_router(dashboard.router, prefix=settings.API_PREFIX)
+app.include_router(metricas.router, prefix=settings.API_PREFIX)
+app.include_router(metricas.router_prometheus)
+
+@app.exception_handler(PoolHashingSaturado)
+def pool_hashing_saturado(request: Request, exc: PoolHashingSaturado):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Serviço de autenticação sobrecarregado, tente novamente"},
+        headers={"Retry-After": "1"}
+    )
+
+@app.on_event("startup")
+def startup():
+    if settings.DB_CRIAR_TABELAS:
+        Base.metadata.create_all(bind=engine)
+    if settings.OUTBOX_WORKER_HABILITADO:
+        processador_notificacoes.iniciar()
+    retomar_jobs_lembretes()
+
+@app.on_event("shutdown")
+def shutdown():
+    processador_notificacoes.parar()
+    pool_hashing.encerrar()
+
+@app.on_event("shutdown")
+async def encerrar_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
+
+@app.get("/")
+def root():
+    return {"mensagem": settings.APP_NAME, "documentacao": "/docs"}
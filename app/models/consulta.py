@@ -1,5 +1,5 @@
 # app/models/consulta.py
-from sqlalchemy import Column, Integer, String, Date, Time, ForeignKey, Enum, Text, Boolean
+from sqlalchemy import Column, Integer, String, Date, Time, ForeignKey, Enum, Text, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import TIMESTAMP
@@ -32,4 +32,28 @@ class Consulta(Base):
     # Relacionamentos
     paciente = relationship("Paciente", back_populates="consultas")
     medico = relationship("Medico", back_populates="consultas")
-    prontuario = relationship("Prontuario", back_populates="consulta", uselist=False)
\ No newline at end of file
+    prontuario = relationship("Prontuario", back_populates="consulta", uselist=False)
+
+    __table_args__ = (
+        # Garantia no banco: um médico não pode ter duas consultas ativas no mesmo horário
+        Index(
+            "uq_consultas_medico_horario_ativo",
+            "medico_id", "data_consulta", "hora_consulta",
+            unique=True,
+            postgresql_where=text("status <> 'CANCELADA'"),
+            sqlite_where=text("status <> 'CANCELADA'")
+        ),
+        # Consultas do paciente em ordem cronológica (linha do tempo)
+        Index("ix_consultas_paciente_data", "paciente_id", "data_consulta", "hora_consulta"),
+        # Agenda do médico no período, com qualquer status (listagem, dashboard)
+        Index("ix_consultas_medico_data_status", "medico_id", "data_consulta", "status"),
+        # Listagem e exportação do período na ordem da paginação por cursor
+        Index("ix_consultas_data_hora", "data_consulta", "hora_consulta", "id"),
+        # Lembretes a enviar: só as consultas confirmadas ainda não lembradas
+        Index(
+            "ix_consultas_lembretes_pendentes",
+            "data_consulta", "id",
+            postgresql_where=text("status = 'CONFIRMADA' AND lembrete_enviado = false"),
+            sqlite_where=text("status = 'CONFIRMADA' AND lembrete_enviado = 0")
+        ),
+    )
\ No newline at end of file
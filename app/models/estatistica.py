@@ -0,0 +1,20 @@
+# app/models/estatistica.py
+from sqlalchemy import Column, Integer, Date, ForeignKey, Enum
+from .usuario import Base
+from .consulta import StatusConsulta
+
+class EstatisticaConsultasDia(Base):
+    """Quantidade de consultas por dia, médico e status (mantida pelo dashboard_service)."""
+    __tablename__ = "estatisticas_consultas_dia"
+
+    data = Column(Date, primary_key=True)
+    medico_id = Column(Integer, ForeignKey("medicos.id"), primary_key=True)
+    status = Column(Enum(StatusConsulta), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+class EstatisticaPacientesDia(Base):
+    """Quantidade de pacientes cadastrados por dia (mantida pelo dashboard_service)."""
+    __tablename__ = "estatisticas_pacientes_dia"
+
+    data = Column(Date, primary_key=True)
+    novos = Column(Integer, nullable=False, default=0)
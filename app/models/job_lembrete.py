@@ -0,0 +1,38 @@
+# app/models/job_lembrete.py
+from sqlalchemy import Column, Integer, Date, Enum, Text, Index, text
+from sqlalchemy.sql import func
+from sqlalchemy.sql.sqltypes import TIMESTAMP
+import enum
+from .usuario import Base
+
+class StatusJob(enum.Enum):
+    EM_ANDAMENTO = "em_andamento"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"
+
+class JobLembretes(Base):
+    """Progresso de um envio de lembretes; permite retomar o envio após um reinício."""
+    __tablename__ = "jobs_lembretes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    data_referencia = Column(Date, nullable=False, index=True)
+    status = Column(Enum(StatusJob), default=StatusJob.EM_ANDAMENTO, nullable=False)
+    total = Column(Integer, default=0, nullable=False)
+    enviados = Column(Integer, default=0, nullable=False)
+    erros = Column(Integer, default=0, nullable=False)
+    ultimo_consulta_id = Column(Integer, default=0, nullable=False)  # cursor do último lote confirmado
+    ultimo_erro = Column(Text, nullable=True)
+    data_criacao = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    data_atualizacao = Column(TIMESTAMP(timezone=True), onupdate=func.now())
+    data_conclusao = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # No máximo um job em andamento por data, mesmo com requisições simultâneas
+        Index(
+            "uq_jobs_lembretes_data_em_andamento",
+            "data_referencia",
+            unique=True,
+            postgresql_where=text("status = 'EM_ANDAMENTO'"),
+            sqlite_where=text("status = 'EM_ANDAMENTO'")
+        ),
+    )
@@ -9,7 +9,7 @@ class Medico(Base):
     __tablename__ = "medicos"
 
     id = Column(Integer, primary_key=True, index=True)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
     crm = Column(String, unique=True, nullable=False, index=True)
     especialidade = Column(String, nullable=False)
     telefone = Column(String, nullable=False)
@@ -0,0 +1,40 @@
+# app/models/notificacao.py
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Text, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from sqlalchemy.sql.sqltypes import TIMESTAMP
+import enum
+from .usuario import Base
+
+class TipoNotificacao(enum.Enum):
+    NOTIFICACAO = "notificacao"
+    LEMBRETE = "lembrete"
+
+class StatusNotificacao(enum.Enum):
+    PENDENTE = "pendente"
+    ENVIADA = "enviada"
+    FALHA = "falha"  # esgotou as tentativas (dead-letter)
+
+class NotificacaoEmail(Base):
+    """Outbox de e-mails: gravado na mesma transação da consulta e enviado por um worker."""
+    __tablename__ = "notificacoes_email"
+
+    id = Column(Integer, primary_key=True, index=True)
+    consulta_id = Column(Integer, ForeignKey("consultas.id"), nullable=True)
+    tipo = Column(Enum(TipoNotificacao), nullable=False)
+    destinatario = Column(String, nullable=False)
+    assunto = Column(String, nullable=False)
+    corpo = Column(Text, nullable=False)
+    status = Column(Enum(StatusNotificacao), default=StatusNotificacao.PENDENTE, nullable=False)
+    tentativas = Column(Integer, default=0, nullable=False)
+    proxima_tentativa = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    ultimo_erro = Column(Text, nullable=True)
+    data_criacao = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    data_envio = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    # Relacionamentos
+    consulta = relationship("Consulta")
+
+    __table_args__ = (
+        Index("ix_notificacoes_email_status_proxima_tentativa", "status", "proxima_tentativa"),
+    )
@@ -1,10 +1,11 @@
 # app/models/paciente.py
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum, Text, Index, DDL, event
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 import enum
 from .usuario import Base
+from ..utils.helpers import normalizar_texto, apenas_digitos
 
 class Sexo(enum.Enum):
     MASCULINO = "masculino"
@@ -34,7 +35,38 @@ class Paciente(Base):
     cep = Column(String, nullable=True)
     data_criacao = Column(TIMESTAMP(timezone=True), server_default=func.now())
     data_atualizacao = Column(TIMESTAMP(timezone=True), onupdate=func.now())
+    # Colunas de busca, mantidas pelos validadores abaixo
+    nome_busca = Column(String, nullable=True)  # nome sem acentos, em minúsculas
+    telefone_digitos = Column(String, nullable=True)
 
     # Relacionamentos
     consultas = relationship("Consulta", back_populates="paciente")
-    prontuarios = relationship("Prontuario", back_populates="paciente")
\ No newline at end of file
+    prontuarios = relationship("Prontuario", back_populates="paciente")
+
+    __table_args__ = (
+        # Trigramas (GiST): substring (LIKE '%...%'), similaridade e ordenação pela
+        # distância (<<->) sobre o nome normalizado, lendo só os primeiros resultados
+        Index(
+            "ix_pacientes_nome_busca_trgm", "nome_busca",
+            postgresql_using="gist", postgresql_ops={"nome_busca": "gist_trgm_ops"}
+        ),
+        # text_pattern_ops permite usar a b-tree em buscas por prefixo (LIKE '123%')
+        Index("ix_pacientes_cpf_prefixo", "cpf", postgresql_ops={"cpf": "text_pattern_ops"}),
+        Index("ix_pacientes_telefone_prefixo", "telefone_digitos", postgresql_ops={"telefone_digitos": "text_pattern_ops"}),
+    )
+
+    @validates("nome")
+    def _atualizar_nome_busca(self, chave, nome):
+        self.nome_busca = normalizar_texto(nome)
+        return nome
+
+    @validates("telefone")
+    def _atualizar_telefone_digitos(self, chave, telefone):
+        self.telefone_digitos = apenas_digitos(telefone)
+        return telefone
+
+# O índice de trigramas depende da extensão pg_trgm
+event.listen(
+    Paciente.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
\ No newline at end of file
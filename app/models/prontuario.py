@@ -1,5 +1,5 @@
 # app/models/prontuario.py
-from sqlalchemy import Column, Integer, Text, ForeignKey
+from sqlalchemy import Column, Integer, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.sql.sqltypes import TIMESTAMP
@@ -10,7 +10,7 @@ class Prontuario(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     paciente_id = Column(Integer, ForeignKey("pacientes.id"), nullable=False)
-    consulta_id = Column(Integer, ForeignKey("consultas.id"), nullable=False)
+    consulta_id = Column(Integer, ForeignKey("consultas.id"), nullable=False, index=True)
     medico_id = Column(Integer, ForeignKey("medicos.id"), nullable=False)
     diagnostico = Column(Text, nullable=True)
     tratamento = Column(Text, nullable=True)
@@ -21,4 +21,9 @@ class Prontuario(Base):
     # Relacionamentos
     paciente = relationship("Paciente", back_populates="prontuarios")
     consulta = relationship("Consulta", back_populates="prontuario")
-    medico = relationship("Medico")
\ No newline at end of file
+    medico = relationship("Medico")
+
+    __table_args__ = (
+        # Prontuários do paciente em ordem cronológica (listagem e linha do tempo)
+        Index("ix_prontuarios_paciente_data", "paciente_id", "data_criacao"),
+    )
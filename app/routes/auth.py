@@ -7,7 +7,8 @@ from ..database import get_db
 from ..schemas.auth import Token, Login
 from ..schemas.usuario import UsuarioCreate, Usuario
 from ..models.usuario import Usuario as UsuarioModel, TipoUsuario
-from ..auth import verify_password, create_access_token, get_password_hash
+from ..auth import verify_password_and_update, create_user_token, get_password_hash, admin_required
+from ..utils.security import pool_hashing
 from ..config import settings
 
 router = APIRouter(
@@ -18,7 +19,8 @@ router = APIRouter(
 @router.post("/login", response_model=Token)
 def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(UsuarioModel).filter(UsuarioModel.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.senha_hash):
+    senha_valida, novo_hash = verify_password_and_update(form_data.password, user.senha_hash) if user else (False, None)
+    if not senha_valida:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
@@ -27,11 +29,12 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
     if not user.ativo:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuário inativo")
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email, "tipo": user.tipo.value}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    # Atualizar o hash de forma transparente quando o custo do bcrypt foi alterado
+    if novo_hash:
+        user.senha_hash = novo_hash
+        db.commit()
+    
+    return create_user_token(user)
 
 @router.post("/register", response_model=Usuario)
 def register_user(user: UsuarioCreate, db: Session = Depends(get_db)):
@@ -53,4 +56,8 @@ def register_user(user: UsuarioCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    return db_user
+
+@router.get("/hash/estatisticas")
+def get_estatisticas_hashing(current_user: UsuarioModel = Depends(admin_required)):
+    return pool_hashing.estatisticas()
@@ -0,0 +1,34 @@
+# app/routes/auth_async.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..schemas.auth import Token
+from ..models.usuario import Usuario as UsuarioModel
+from ..auth import verify_password_and_update_async, create_user_token
+
+router = APIRouter(
+    prefix="/auth",
+    tags=["autenticação"]
+)
+
+@router.post("/login", response_model=Token)
+async def login_for_access_token_async(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = (await db.scalars(select(UsuarioModel).where(UsuarioModel.email == form_data.username))).first()
+    # O bcrypt roda no pool de processos; o event loop fica livre enquanto isso
+    senha_valida, novo_hash = await verify_password_and_update_async(form_data.password, user.senha_hash) if user else (False, None)
+    if not senha_valida:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email ou senha incorretos",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.ativo:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuário inativo")
+    
+    if novo_hash:
+        user.senha_hash = novo_hash
+        await db.commit()
+    
+    return create_user_token(user)
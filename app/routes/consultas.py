@@ -1,15 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import date, time, datetime, timedelta
-from ..database import get_db
-from ..schemas.consulta import Consulta, ConsultaCreate, ConsultaUpdate, ConsultaDetalhada, StatusConsulta
+from ..database import get_db, get_read_db
+from ..schemas.consulta import (
+    Consulta, ConsultaCreate, ConsultaUpdate, ConsultaDetalhada, StatusConsulta,
+    ConsultaBatchCreate, ConsultaBatchResultado
+)
 from ..models.consulta import Consulta as ConsultaModel, StatusConsulta as StatusConsultaModel
 from ..models.paciente import Paciente as PacienteModel
 from ..models.medico import Medico as MedicoModel
 from ..models.usuario import Usuario as UsuarioModel
-from ..auth import recepcionista_or_above_required, medico_required
-from ..services.email_service import enviar_notificacao_consulta, enviar_lembrete_consulta
+from ..models.job_lembrete import JobLembretes
+from ..auth import recepcionista_or_above_required, medico_required, admin_required
+from ..services.notificacao_service import enfileirar_notificacao_consulta
+from ..services.medico_service import agenda_do_medico
+from ..services.lembrete_service import criar_job_lembretes, iniciar_job_lembretes, progresso_job_lembretes
+from ..services.consulta_service import (
+    query_consultas_detalhadas, query_consultas_versionadas, separar_versoes, obter_consulta_detalhada,
+    linha_para_dict, ORDENACAO_CONSULTAS,
+    bloquear_agenda_medico, validar_horario_medico, reservar_horario,
+    horarios_livres_dia, calcular_disponibilidade_periodo,
+    cache_disponibilidade, invalidar_disponibilidade, criar_consultas_em_lote,
+    filtrar_consultas, exportar_consultas,
+    montar_disponibilidade_dia, validar_periodo_disponibilidade, verificar_medicos_encontrados
+)
+from ..utils.helpers import paginar, proximo_cursor
+from ..utils.serializacao import resposta_lista
+from ..utils.condicional import verificar_condicional
 
 router = APIRouter(
     prefix="/consultas",
@@ -18,6 +38,8 @@ router = APIRouter(
 
 @router.get("/", response_model=List[ConsultaDetalhada])
 def get_consultas(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     data_inicio: Optional[date] = None,
@@ -25,69 +47,57 @@ def get_consultas(
     medico_id: Optional[int] = None,
     paciente_id: Optional[int] = None,
     status: Optional[StatusConsulta] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: UsuarioModel = Depends(recepcionista_or_above_required)
 ):
-    query = db.query(ConsultaModel).\
-        join(PacienteModel, ConsultaModel.paciente_id == PacienteModel.id).\
-        join(MedicoModel, ConsultaModel.medico_id == MedicoModel.id).\
-        join(UsuarioModel, MedicoModel.usuario_id == UsuarioModel.id)
-    
-    if data_inicio:
-        query = query.filter(ConsultaModel.data_consulta >= data_inicio)
-    
-    if data_fim:
-        query = query.filter(ConsultaModel.data_consulta <= data_fim)
-    
-    if medico_id:
-        query = query.filter(ConsultaModel.medico_id == medico_id)
-    
-    if paciente_id:
-        query = query.filter(ConsultaModel.paciente_id == paciente_id)
-    
-    if status:
-        query = query.filter(ConsultaModel.status == status)
-    
-    consultas = query.offset(skip).limit(limit).all()
-    
-    resultado = []
-    for consulta in consultas:
-        paciente = db.query(PacienteModel).filter(PacienteModel.id == consulta.paciente_id).first()
-        medico = db.query(MedicoModel).filter(MedicoModel.id == consulta.medico_id).first()
-        usuario_medico = db.query(UsuarioModel).filter(UsuarioModel.id == medico.usuario_id).first()
-        
-        consulta_detalhada = {
-            **consulta.__dict__,
-            "paciente_nome": paciente.nome,
-            "paciente_cpf": paciente.cpf,
-            "medico_nome": usuario_medico.nome,
-            "medico_especialidade": medico.especialidade
-        }
-        resultado.append(consulta_detalhada)
-    
-    return resultado
+    # Versões e conteúdo na mesma instrução: o ETag descreve exatamente a página servida
+    query = filtrar_consultas(query_consultas_versionadas(db), data_inicio, data_fim, medico_id, paciente_id, status)
+    consultas, versoes = separar_versoes(paginar(query, ORDENACAO_CONSULTAS, skip, limit, cursor))
+    nao_modificado = verificar_condicional(request, response, versoes, lista=True)
+    if nao_modificado:
+        return nao_modificado
+    
+    next_cursor = proximo_cursor(consultas, ORDENACAO_CONSULTAS, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return resposta_lista(consultas, response)
+
+@router.get("/export")
+def export_consultas(
+    formato: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    medico_id: Optional[int] = None,
+    paciente_id: Optional[int] = None,
+    status: Optional[StatusConsulta] = None,
+    current_user: UsuarioModel = Depends(recepcionista_or_above_required)
+):
+    # O gerador usa a própria sessão, que permanece aberta até o fim do streaming
+    linhas = exportar_consultas(formato, data_inicio, data_fim, medico_id, paciente_id, status)
+    media_type = "text/csv; charset=utf-8" if formato == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        linhas,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="consultas.{formato}"'}
+    )
 
 @router.get("/{consulta_id}", response_model=ConsultaDetalhada)
 def get_consulta(
     consulta_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: UsuarioModel = Depends(recepcionista_or_above_required)
 ):
-    consulta = db.query(ConsultaModel).filter(ConsultaModel.id == consulta_id).first()
-    if consulta is None:
+    linha = query_consultas_versionadas(db).filter(ConsultaModel.id == consulta_id).first()
+    if linha is None:
         raise HTTPException(status_code=404, detail="Consulta não encontrada")
-    
-    paciente = db.query(PacienteModel).filter(PacienteModel.id == consulta.paciente_id).first()
-    medico = db.query(MedicoModel).filter(MedicoModel.id == consulta.medico_id).first()
-    usuario_medico = db.query(UsuarioModel).filter(UsuarioModel.id == medico.usuario_id).first()
-    
-    consulta_detalhada = {
-        **consulta.__dict__,
-        "paciente_nome": paciente.nome,
-        "paciente_cpf": paciente.cpf,
-        "medico_nome": usuario_medico.nome,
-        "medico_especialidade": medico.especialidade
-    }
+    [consulta_detalhada], versoes = separar_versoes([linha])
+    nao_modificado = verificar_condicional(request, response, versoes)
+    if nao_modificado:
+        return nao_modificado
     
     return consulta_detalhada
 
@@ -107,42 +117,9 @@ def create_consulta(
     if not medico:
         raise HTTPException(status_code=404, detail="Médico não encontrado")
     
-    # Verificar se o horário está disponível para o médico
-    # Converter a string para um objeto time
-    hora_inicio = consulta_data.hora_consulta
-    hora_fim = (datetime.combine(datetime.today(), hora_inicio) + timedelta(minutes=medico.tempo_consulta)).time()
-    
-    # Verificar se há alguma consulta neste horário para este médico
-    consulta_existente = db.query(ConsultaModel).filter(
-        ConsultaModel.medico_id == consulta_data.medico_id,
-        ConsultaModel.data_consulta == consulta_data.data_consulta,
-        ConsultaModel.status != StatusConsultaModel.CANCELADA,
-        ((ConsultaModel.hora_consulta <= hora_inicio) & 
-         (datetime.combine(datetime.min, ConsultaModel.hora_consulta) + 
-          timedelta(minutes=medico.tempo_consulta) > datetime.combine(datetime.min, hora_inicio))) |
-        ((ConsultaModel.hora_consulta < hora_fim) & 
-         (ConsultaModel.hora_consulta >= hora_inicio))
-    ).first()
-    
-    if consulta_existente:
-        raise HTTPException(status_code=400, detail="Horário não disponível para este médico")
-    
-    # Verificar se o dia da semana está disponível para o médico
-    dia_semana = consulta_data.data_consulta.weekday()  # 0=Seg, 1=Ter, ..., 6=Dom
-    dias_atendimento = [int(d) for d in medico.dias_atendimento.split(",")]
-    
-    if dia_semana not in dias_atendimento:
-        raise HTTPException(status_code=400, detail="O médico não atende neste dia da semana")
-    
-    # Verificar se o horário está dentro do horário de atendimento do médico
-    horario_inicio_medico = datetime.strptime(medico.horario_inicio_atendimento, "%H:%M").time()
-    horario_fim_medico = datetime.strptime(medico.horario_fim_atendimento, "%H:%M").time()
-    
-    if hora_inicio < horario_inicio_medico or hora_fim > horario_fim_medico:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Horário fora do período de atendimento do médico ({medico.horario_inicio_atendimento} - {medico.horario_fim_atendimento})"
-        )
+    # Validar o horário na agenda do médico, bloquear o dia até o commit e verificar conflitos
+    validar_horario_medico(medico, consulta_data.data_consulta, consulta_data.hora_consulta)
+    reservar_horario(db, medico, consulta_data.data_consulta, consulta_data.hora_consulta)
     
     # Criar a consulta
     db_consulta = ConsultaModel(
@@ -151,41 +128,50 @@ def create_consulta(
         data_consulta=consulta_data.data_consulta,
         hora_consulta=consulta_data.hora_consulta,
         problema_saude=consulta_data.problema_saude,
-        status=consulta_data.status,
+        status=StatusConsultaModel[consulta_data.status.name],
         observacoes=consulta_data.observacoes
     )
     
     db.add(db_consulta)
-    db.commit()
-    db.refresh(db_consulta)
-    
-    # Enviar e-mail de notificação para o paciente
     try:
-        usuario_medico = db.query(UsuarioModel).filter(UsuarioModel.id == medico.usuario_id).first()
-        enviar_notificacao_consulta(
-            paciente.email,
-            paciente.nome,
-            usuario_medico.nome,
-            medico.especialidade,
-            db_consulta.data_consulta,
-            db_consulta.hora_consulta
-        )
-        db_consulta.notificacao_enviada = True
+        db.flush()
+        consulta_detalhada = obter_consulta_detalhada(db, db_consulta.id)
+        
+        # A notificação para o paciente vai para a outbox na mesma transação
+        enfileirar_notificacao_consulta(db, consulta_detalhada, paciente.email)
         db.commit()
-    except Exception as e:
-        # Não falhar se o e-mail não puder ser enviado
-        print(f"Erro ao enviar notificação: {e}")
-    
-    consulta_detalhada = {
-        **db_consulta.__dict__,
-        "paciente_nome": paciente.nome,
-        "paciente_cpf": paciente.cpf,
-        "medico_nome": usuario_medico.nome,
-        "medico_especialidade": medico.especialidade
-    }
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Horário não disponível para este médico")
+    
+    invalidar_disponibilidade(db_consulta.medico_id, db_consulta.data_consulta)
     
     return consulta_detalhada
 
+@router.post("/batch", response_model=ConsultaBatchResultado)
+def create_consultas_batch(
+    lote: ConsultaBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: UsuarioModel = Depends(recepcionista_or_above_required)
+):
+    try:
+        itens, agendas_alteradas = criar_consultas_em_lote(db, lote.consultas)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Conflito de horário com outro agendamento simultâneo; tente novamente")
+    
+    for medico_id, data_consulta in agendas_alteradas:
+        invalidar_disponibilidade(medico_id, data_consulta)
+    
+    criadas = sum(1 for item in itens if item["sucesso"])
+    return {
+        "total": len(itens),
+        "criadas": criadas,
+        "rejeitadas": len(itens) - criadas,
+        "itens": itens
+    }
+
 @router.put("/{consulta_id}", response_model=ConsultaDetalhada)
 def update_consulta(
     consulta_id: int,
@@ -196,114 +182,66 @@ def update_consulta(
     db_consulta = db.query(ConsultaModel).filter(ConsultaModel.id == consulta_id).first()
     if db_consulta is None:
         raise HTTPException(status_code=404, detail="Consulta não encontrada")
+    # Agenda de onde a consulta sai, cujo cache também precisa ser invalidado
+    medico_anterior_id, data_anterior = db_consulta.medico_id, db_consulta.data_consulta
     
-    # Se estamos alterando a data ou hora, precisamos verificar disponibilidade
-    if consulta_data.data_consulta is not None or consulta_data.hora_consulta is not None:
-        data_consulta = consulta_data.data_consulta or db_consulta.data_consulta
-        hora_consulta = consulta_data.hora_consulta or db_consulta.hora_consulta
-        
-        medico = db.query(MedicoModel).filter(MedicoModel.id == db_consulta.medico_id).first()
-        
-        hora_fim = (datetime.combine(datetime.today(), hora_consulta) + timedelta(minutes=medico.tempo_consulta)).time()
-        
-        # Verificar se há alguma consulta neste horário para este médico (exceto a atual)
-        consulta_existente = db.query(ConsultaModel).filter(
-            ConsultaModel.id != consulta_id,
-            ConsultaModel.medico_id == db_consulta.medico_id,
-            ConsultaModel.data_consulta == data_consulta,
-            ConsultaModel.status != StatusConsultaModel.CANCELADA,
-            ((ConsultaModel.hora_consulta <= hora_consulta) & 
-             (datetime.combine(datetime.min, ConsultaModel.hora_consulta) + 
-              timedelta(minutes=medico.tempo_consulta) > datetime.combine(datetime.min, hora_consulta))) |
-            ((ConsultaModel.hora_consulta < hora_fim) & 
-             (ConsultaModel.hora_consulta >= hora_consulta))
-        ).first()
-        
-        if consulta_existente:
-            raise HTTPException(status_code=400, detail="Horário não disponível para este médico")
-        
-        # Verificar se o dia da semana está disponível para o médico
-        dia_semana = data_consulta.weekday()
-        dias_atendimento = [int(d) for d in medico.dias_atendimento.split(",")]
-        
-        if dia_semana not in dias_atendimento:
-            raise HTTPException(status_code=400, detail="O médico não atende neste dia da semana")
-        
-        # Verificar se o horário está dentro do horário de atendimento do médico
-        horario_inicio_medico = datetime.strptime(medico.horario_inicio_atendimento, "%H:%M").time()
-        horario_fim_medico = datetime.strptime(medico.horario_fim_atendimento, "%H:%M").time()
-        
-        if hora_consulta < horario_inicio_medico or hora_fim > horario_fim_medico:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Horário fora do período de atendimento do médico ({medico.horario_inicio_atendimento} - {medico.horario_fim_atendimento})"
-            )
-    
-    # Atualizar os campos da consulta
     if consulta_data.paciente_id is not None:
         # Verificar se o paciente existe
         paciente = db.query(PacienteModel).filter(PacienteModel.id == consulta_data.paciente_id).first()
         if not paciente:
             raise HTTPException(status_code=404, detail="Paciente não encontrado")
-        db_consulta.paciente_id = consulta_data.paciente_id
     
-    if consulta_data.medico_id is not None:
-        # Verificar se o médico existe
-        medico = db.query(MedicoModel).filter(MedicoModel.id == consulta_data.medico_id).first()
-        if not medico:
-            raise HTTPException(status_code=404, detail="Médico não encontrado")
-        db_consulta.medico_id = consulta_data.medico_id
+    # Médico, data, hora e status que a consulta terá depois da alteração
+    medico_id = consulta_data.medico_id or db_consulta.medico_id
+    medico = db.query(MedicoModel).filter(MedicoModel.id == medico_id).first()
+    if not medico:
+        raise HTTPException(status_code=404, detail="Médico não encontrado")
+    data_consulta = consulta_data.data_consulta or db_consulta.data_consulta
+    hora_consulta = consulta_data.hora_consulta or db_consulta.hora_consulta
+    status_consulta = StatusConsultaModel[consulta_data.status.name] if consulta_data.status else db_consulta.status
+    
+    # Remarcar, trocar de médico ou reativar uma consulta cancelada ocupa um horário
+    ocupa_horario = status_consulta != StatusConsultaModel.CANCELADA and (
+        medico_id != db_consulta.medico_id
+        or data_consulta != db_consulta.data_consulta
+        or hora_consulta != db_consulta.hora_consulta
+        or db_consulta.status == StatusConsultaModel.CANCELADA
+    )
+    if ocupa_horario:
+        # Validar na agenda do médico de destino e bloquear o dia dele até o commit (exceto a atual)
+        validar_horario_medico(medico, data_consulta, hora_consulta)
+        reservar_horario(db, medico, data_consulta, hora_consulta, consulta_id)
     
-    if consulta_data.data_consulta is not None:
-        db_consulta.data_consulta = consulta_data.data_consulta
+    # Atualizar os campos da consulta
+    if consulta_data.paciente_id is not None:
+        db_consulta.paciente_id = consulta_data.paciente_id
     
-    if consulta_data.hora_consulta is not None:
-        db_consulta.hora_consulta = consulta_data.hora_consulta
+    db_consulta.medico_id = medico_id
+    db_consulta.data_consulta = data_consulta
+    db_consulta.hora_consulta = hora_consulta
+    db_consulta.status = status_consulta
     
     if consulta_data.problema_saude is not None:
         db_consulta.problema_saude = consulta_data.problema_saude
     
-    if consulta_data.status is not None:
-        db_consulta.status = consulta_data.status
-    
     if consulta_data.observacoes is not None:
         db_consulta.observacoes = consulta_data.observacoes
     
-    db.commit()
-    db.refresh(db_consulta)
-    
-    # Enviar notificação de atualização se o status mudou para CONFIRMADA
-    if consulta_data.status == StatusConsultaModel.CONFIRMADA and not db_consulta.notificacao_enviada:
-        try:
-            paciente = db.query(PacienteModel).filter(PacienteModel.id == db_consulta.paciente_id).first()
-            medico = db.query(MedicoModel).filter(MedicoModel.id == db_consulta.medico_id).first()
-            usuario_medico = db.query(UsuarioModel).filter(UsuarioModel.id == medico.usuario_id).first()
-            enviar_notificacao_consulta(
-                paciente.email,
-                paciente.nome,
-                usuario_medico.nome,
-                medico.especialidade,
-                db_consulta.data_consulta,
-                db_consulta.hora_consulta
-            )
-            db_consulta.notificacao_enviada = True
-            db.commit()
-        except Exception as e:
-            # Não falhar se o e-mail não puder ser enviado
-            print(f"Erro ao enviar notificação: {e}")
-    
-    # Buscar dados atualizados para o retorno
-    paciente = db.query(PacienteModel).filter(PacienteModel.id == db_consulta.paciente_id).first()
-    medico = db.query(MedicoModel).filter(MedicoModel.id == db_consulta.medico_id).first()
-    usuario_medico = db.query(UsuarioModel).filter(UsuarioModel.id == medico.usuario_id).first()
-    
-    consulta_detalhada = {
-        **db_consulta.__dict__,
-        "paciente_nome": paciente.nome,
-        "paciente_cpf": paciente.cpf,
-        "medico_nome": usuario_medico.nome,
-        "medico_especialidade": medico.especialidade
-    }
+    try:
+        db.flush()
+        consulta_detalhada = obter_consulta_detalhada(db, consulta_id)
+        
+        # Notificar o paciente (via outbox, na mesma transação) se a consulta foi confirmada
+        if consulta_data.status == StatusConsulta.CONFIRMADA and not consulta_detalhada["notificacao_enviada"]:
+            paciente_email = db.query(PacienteModel.email).filter(PacienteModel.id == consulta_detalhada["paciente_id"]).scalar()
+            enfileirar_notificacao_consulta(db, consulta_detalhada, paciente_email)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Horário não disponível para este médico")
+    
+    invalidar_disponibilidade(medico_anterior_id, data_anterior)
+    invalidar_disponibilidade(db_consulta.medico_id, db_consulta.data_consulta)
     
     return consulta_detalhada
 
@@ -317,9 +255,17 @@ def delete_consulta(
     if db_consulta is None:
         raise HTTPException(status_code=404, detail="Consulta não encontrada")
     
-    # Em vez de excluir, marcamos como cancelada
+    # Em vez de excluir, marcamos como cancelada; o lock ordena o cancelamento com
+    # os agendamentos simultâneos do mesmo dia
+    bloquear_agenda_medico(db, db_consulta.medico_id, db_consulta.data_consulta)
     db_consulta.status = StatusConsultaModel.CANCELADA
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Não foi possível cancelar a consulta")
+    
+    invalidar_disponibilidade(db_consulta.medico_id, db_consulta.data_consulta)
     
     return None
 
@@ -334,31 +280,32 @@ def update_consulta_status(
     if db_consulta is None:
         raise HTTPException(status_code=404, detail="Consulta não encontrada")
     
-    db_consulta.status = status
-    db.commit()
-    db.refresh(db_consulta)
-    
-    # Buscar dados para o retorno
-    paciente = db.query(PacienteModel).filter(PacienteModel.id == db_consulta.paciente_id).first()
-    medico = db.query(MedicoModel).filter(MedicoModel.id == db_consulta.medico_id).first()
-    usuario_medico = db.query(UsuarioModel).filter(UsuarioModel.id == medico.usuario_id).first()
-    
-    consulta_detalhada = {
-        **db_consulta.__dict__,
-        "paciente_nome": paciente.nome,
-        "paciente_cpf": paciente.cpf,
-        "medico_nome": usuario_medico.nome,
-        "medico_especialidade": medico.especialidade
-    }
+    status_consulta = StatusConsultaModel[status.name]
+    if db_consulta.status == StatusConsultaModel.CANCELADA and status_consulta != StatusConsultaModel.CANCELADA:
+        # Reativar uma consulta cancelada volta a ocupar o horário, que pode já ter sido remarcado
+        medico = db.query(MedicoModel).filter(MedicoModel.id == db_consulta.medico_id).first()
+        reservar_horario(db, medico, db_consulta.data_consulta, db_consulta.hora_consulta, consulta_id)
+    else:
+        bloquear_agenda_medico(db, db_consulta.medico_id, db_consulta.data_consulta)
     
-    return consulta_detalhada
+    db_consulta.status = status_consulta
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Horário não disponível para este médico")
+    
+    invalidar_disponibilidade(db_consulta.medico_id, db_consulta.data_consulta)
+    
+    return obter_consulta_detalhada(db, consulta_id)
 
 @router.get("/medico/minhas-consultas", response_model=List[ConsultaDetalhada])
 def get_consultas_medico(
+    response: Response,
     data_inicial: Optional[date] = None,
     data_final: Optional[date] = None,
     status: Optional[StatusConsulta] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: UsuarioModel = Depends(medico_required)
 ):
     # Obter o ID do médico pelo usuário atual
@@ -366,153 +313,82 @@ def get_consultas_medico(
     if not medico:
         raise HTTPException(status_code=404, detail="Médico não encontrado para este usuário")
     
-    query = db.query(ConsultaModel).filter(ConsultaModel.medico_id == medico.id)
-    
-    if data_inicial:
-        query = query.filter(ConsultaModel.data_consulta >= data_inicial)
-    
-    if data_final:
-        query = query.filter(ConsultaModel.data_consulta <= data_final)
-    
-    if status:
-        query = query.filter(ConsultaModel.status == status)
-    
-    # Ordenar por data e hora
-    query = query.order_by(ConsultaModel.data_consulta, ConsultaModel.hora_consulta)
+    query = filtrar_consultas(
+        query_consultas_detalhadas(db), data_inicial, data_final, medico_id=medico.id, status=status
+    ).order_by(*ORDENACAO_CONSULTAS)
     
     consultas = query.all()
     
-    resultado = []
-    for consulta in consultas:
-        paciente = db.query(PacienteModel).filter(PacienteModel.id == consulta.paciente_id).first()
-        
-        consulta_detalhada = {
-            **consulta.__dict__,
-            "paciente_nome": paciente.nome,
-            "paciente_cpf": paciente.cpf,
-            "medico_nome": current_user.nome,
-            "medico_especialidade": medico.especialidade
-        }
-        resultado.append(consulta_detalhada)
-    
-    return resultado
+    return resposta_lista([linha_para_dict(consulta) for consulta in consultas], response)
 
 @router.get("/agenda/disponibilidade")
 def get_disponibilidade_medico(
     medico_id: int,
     data_consulta: date,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: UsuarioModel = Depends(recepcionista_or_above_required)
 ):
     # Verificar se o médico existe
-    medico = db.query(MedicoModel).filter(MedicoModel.id == medico_id).first()
+    medico = db.query(MedicoModel).options(joinedload(MedicoModel.usuario)).\
+        filter(MedicoModel.id == medico_id).first()
     if not medico:
         raise HTTPException(status_code=404, detail="Médico não encontrado")
     
     # Verificar se o médico atende nesse dia da semana
-    dia_semana = data_consulta.weekday()
-    dias_atendimento = [int(d) for d in medico.dias_atendimento.split(",")]
-    
-    if dia_semana not in dias_atendimento:
+    agenda = agenda_do_medico(medico)
+    if not agenda.atende_em(data_consulta):
         return {"disponibilidade": [], "mensagem": "O médico não atende neste dia da semana"}
     
-    # Obter o horário de atendimento do médico
-    horario_inicio = datetime.strptime(medico.horario_inicio_atendimento, "%H:%M").time()
-    horario_fim = datetime.strptime(medico.horario_fim_atendimento, "%H:%M").time()
-    tempo_consulta = medico.tempo_consulta
-    
-    # Obter todas as consultas do médico para a data especificada
-    consultas = db.query(ConsultaModel).filter(
-        ConsultaModel.medico_id == medico_id,
-        ConsultaModel.data_consulta == data_consulta,
-        ConsultaModel.status != StatusConsultaModel.CANCELADA
-    ).all()
-    
-    # Calcular horários ocupados
-    horarios_ocupados = []
-    for consulta in consultas:
-        hora_inicio = consulta.hora_consulta
-        hora_fim = (datetime.combine(datetime.today(), hora_inicio) + timedelta(minutes=tempo_consulta)).time()
-        horarios_ocupados.append((hora_inicio, hora_fim))
-    
-    # Calcular horários disponíveis
-    horarios_disponiveis = []
-    hora_atual = horario_inicio
-    
-    while hora_atual < horario_fim:
-        # Verificar se o horário atual está disponível
-        hora_fim_atual = (datetime.combine(datetime.today(), hora_atual) + timedelta(minutes=tempo_consulta)).time()
-        
-        # Se passar do horário final de atendimento, interromper
-        if hora_fim_atual > horario_fim:
-            break
-        
-        disponivel = True
-        for inicio, fim in horarios_ocupados:
-            # Verificar se há sobreposição
-            if (hora_atual < fim and hora_fim_atual > inicio):
-                disponivel = False
-                break
-        
-        if disponivel:
-            horarios_disponiveis.append({
-                "hora_inicio": hora_atual.strftime("%H:%M"),
-                "hora_fim": hora_fim_atual.strftime("%H:%M")
-            })
-        
-        # Avançar para o próximo horário
-        hora_atual = (datetime.combine(datetime.today(), hora_atual) + timedelta(minutes=tempo_consulta)).time()
+    livres = horarios_livres_dia(db, medico.id, agenda, data_consulta)
+    return montar_disponibilidade_dia(medico, data_consulta, agenda, livres)
+
+@router.get("/agenda/disponibilidade/periodo")
+def get_disponibilidade_periodo(
+    data_inicio: date,
+    data_fim: date,
+    medico_ids: List[int] = Query(...),
+    db: Session = Depends(get_read_db),
+    current_user: UsuarioModel = Depends(recepcionista_or_above_required)
+):
+    validar_periodo_disponibilidade(data_inicio, data_fim)
+    
+    medico_ids = sorted(set(medico_ids))
+    medicos = db.query(MedicoModel).options(joinedload(MedicoModel.usuario)).\
+        filter(MedicoModel.id.in_(medico_ids)).order_by(MedicoModel.id).all()
+    verificar_medicos_encontrados(medico_ids, medicos)
     
     return {
-        "medico_id": medico_id,
-        "medico_nome": db.query(UsuarioModel).filter(UsuarioModel.id == medico.usuario_id).first().nome,
-        "especialidade": medico.especialidade,
-        "data_consulta": data_consulta.strftime("%Y-%m-%d"),
-        "tempo_consulta": f"{tempo_consulta} minutos",
-        "disponibilidade": horarios_disponiveis
+        "data_inicio": data_inicio.strftime("%Y-%m-%d"),
+        "data_fim": data_fim.strftime("%Y-%m-%d"),
+        "medicos": calcular_disponibilidade_periodo(db, medicos, data_inicio, data_fim)
     }
 
-@router.post("/enviar-lembretes")
+@router.get("/agenda/cache")
+def get_estatisticas_cache_disponibilidade(
+    current_user: UsuarioModel = Depends(admin_required)
+):
+    return cache_disponibilidade.estatisticas()
+
+@router.post("/enviar-lembretes", status_code=status.HTTP_202_ACCEPTED)
 def enviar_lembretes_consultas(
     db: Session = Depends(get_db),
     current_user: UsuarioModel = Depends(recepcionista_or_above_required)
 ):
-    # Buscar consultas para o dia seguinte que ainda não receberam lembrete
+    # Lembretes das consultas confirmadas do dia seguinte, enviados em segundo plano
     amanha = datetime.now().date() + timedelta(days=1)
-    consultas = db.query(ConsultaModel).filter(
-        ConsultaModel.data_consulta == amanha,
-        ConsultaModel.status == StatusConsultaModel.CONFIRMADA,
-        ConsultaModel.lembrete_enviado == False
-    ).all()
-    
-    resultados = {
-        "total_consultas": len(consultas),
-        "lembretes_enviados": 0,
-        "erros": []
-    }
+    job = criar_job_lembretes(db, amanha)
+    iniciar_job_lembretes(job.id)
     
-    for consulta in consultas:
-        paciente = db.query(PacienteModel).filter(PacienteModel.id == consulta.paciente_id).first()
-        medico = db.query(MedicoModel).filter(MedicoModel.id == consulta.medico_id).first()
-        usuario_medico = db.query(UsuarioModel).filter(UsuarioModel.id == medico.usuario_id).first()
-        
-        try:
-            enviar_lembrete_consulta(
-                paciente.email,
-                paciente.nome,
-                usuario_medico.nome,
-                medico.especialidade,
-                consulta.data_consulta,
-                consulta.hora_consulta
-            )
-            consulta.lembrete_enviado = True
-            resultados["lembretes_enviados"] += 1
-        except Exception as e:
-            resultados["erros"].append({
-                "consulta_id": consulta.id,
-                "paciente": paciente.nome,
-                "erro": str(e)
-            })
-    
-    db.commit()
-    return resultados
\ No newline at end of file
+    return progresso_job_lembretes(job)
+
+@router.get("/enviar-lembretes/{job_id}")
+def get_progresso_lembretes(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: UsuarioModel = Depends(recepcionista_or_above_required)
+):
+    job = db.query(JobLembretes).filter(JobLembretes.id == job_id).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Envio de lembretes não encontrado")
+    
+    return progresso_job_lembretes(job)
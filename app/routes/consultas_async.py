@@ -0,0 +1,100 @@
+# app/routes/consultas_async.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional
+from datetime import date
+from ..database import get_async_read_db
+from ..schemas.consulta import ConsultaDetalhada, StatusConsulta
+from ..models.medico import Medico as MedicoModel
+from ..auth import Principal, recepcionista_or_above_required_async
+from ..services.medico_service import agenda_do_medico
+from ..services.consulta_service import (
+    select_consultas_versionadas, separar_versoes, filtrar_consultas, ORDENACAO_CONSULTAS,
+    horarios_livres_dia, calcular_disponibilidade_periodo, montar_disponibilidade_dia,
+    validar_periodo_disponibilidade, verificar_medicos_encontrados
+)
+from ..utils.helpers import aplicar_paginacao, proximo_cursor
+from ..utils.serializacao import resposta_lista
+from ..utils.condicional import verificar_condicional
+
+# Versões assíncronas das rotas mais acessadas de /consultas (DB_ASYNC=true).
+# O cálculo de horários livres reaproveita as funções síncronas do serviço por
+# meio de AsyncSession.run_sync, que executa o acesso ao banco pelo asyncpg.
+router = APIRouter(
+    prefix="/consultas",
+    tags=["consultas"]
+)
+
+@router.get("/", response_model=List[ConsultaDetalhada])
+async def get_consultas_async(
+    request: Request,
+    response: Response,
+    skip: int = 0, 
+    limit: int = 100,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    medico_id: Optional[int] = None,
+    paciente_id: Optional[int] = None,
+    status: Optional[StatusConsulta] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(recepcionista_or_above_required_async)
+):
+    # Versões e conteúdo na mesma instrução: o ETag descreve exatamente a página servida
+    query = filtrar_consultas(select_consultas_versionadas(), data_inicio, data_fim, medico_id, paciente_id, status)
+    linhas = (await db.execute(aplicar_paginacao(query, ORDENACAO_CONSULTAS, skip, limit, cursor))).all()
+    consultas, versoes = separar_versoes(linhas)
+    nao_modificado = verificar_condicional(request, response, versoes, lista=True)
+    if nao_modificado:
+        return nao_modificado
+    
+    next_cursor = proximo_cursor(consultas, ORDENACAO_CONSULTAS, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return resposta_lista(consultas, response)
+
+@router.get("/agenda/disponibilidade")
+async def get_disponibilidade_medico_async(
+    medico_id: int,
+    data_consulta: date,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(recepcionista_or_above_required_async)
+):
+    medico = (await db.execute(
+        select(MedicoModel).options(joinedload(MedicoModel.usuario)).where(MedicoModel.id == medico_id)
+    )).scalar_one_or_none()
+    if not medico:
+        raise HTTPException(status_code=404, detail="Médico não encontrado")
+    
+    agenda = agenda_do_medico(medico)
+    if not agenda.atende_em(data_consulta):
+        return {"disponibilidade": [], "mensagem": "O médico não atende neste dia da semana"}
+    
+    livres = await db.run_sync(horarios_livres_dia, medico.id, agenda, data_consulta)
+    return montar_disponibilidade_dia(medico, data_consulta, agenda, livres)
+
+@router.get("/agenda/disponibilidade/periodo")
+async def get_disponibilidade_periodo_async(
+    data_inicio: date,
+    data_fim: date,
+    medico_ids: List[int] = Query(...),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(recepcionista_or_above_required_async)
+):
+    validar_periodo_disponibilidade(data_inicio, data_fim)
+    
+    medico_ids = sorted(set(medico_ids))
+    medicos = (await db.scalars(
+        select(MedicoModel).options(joinedload(MedicoModel.usuario)).
+        where(MedicoModel.id.in_(medico_ids)).order_by(MedicoModel.id)
+    )).all()
+    verificar_medicos_encontrados(medico_ids, medicos)
+    
+    return {
+        "data_inicio": data_inicio.strftime("%Y-%m-%d"),
+        "data_fim": data_fim.strftime("%Y-%m-%d"),
+        "medicos": await db.run_sync(calcular_disponibilidade_periodo, medicos, data_inicio, data_fim)
+    }
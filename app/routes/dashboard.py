@@ -0,0 +1,53 @@
+# app/routes/dashboard.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date, timedelta
+from ..database import get_read_db
+from ..models.usuario import Usuario as UsuarioModel
+from ..auth import admin_required
+from ..services.dashboard_service import consultas_por_dia, pacientes_por_dia, utilizacao_medicos
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["dashboard"]
+)
+
+# Período padrão (em dias, até hoje) e máximo aceito pelos relatórios
+DIAS_PADRAO = 30
+MAX_DIAS_DASHBOARD = 366
+
+def periodo(data_inicio: Optional[date] = None, data_fim: Optional[date] = None):
+    data_fim = data_fim or date.today()
+    data_inicio = data_inicio or data_fim - timedelta(days=DIAS_PADRAO - 1)
+    if data_fim < data_inicio:
+        raise HTTPException(status_code=400, detail="A data final deve ser igual ou posterior à data inicial")
+    if (data_fim - data_inicio).days >= MAX_DIAS_DASHBOARD:
+        raise HTTPException(status_code=400, detail=f"O período deve ter no máximo {MAX_DIAS_DASHBOARD} dias")
+    return data_inicio, data_fim
+
+@router.get("/consultas")
+def get_estatisticas_consultas(
+    medico_id: Optional[int] = None,
+    intervalo: tuple = Depends(periodo),
+    db: Session = Depends(get_read_db),
+    current_user: UsuarioModel = Depends(admin_required)
+):
+    return consultas_por_dia(db, *intervalo, medico_id=medico_id)
+
+@router.get("/pacientes")
+def get_estatisticas_pacientes(
+    intervalo: tuple = Depends(periodo),
+    db: Session = Depends(get_read_db),
+    current_user: UsuarioModel = Depends(admin_required)
+):
+    return pacientes_por_dia(db, *intervalo)
+
+@router.get("/utilizacao")
+def get_utilizacao_medicos(
+    medico_id: Optional[int] = None,
+    intervalo: tuple = Depends(periodo),
+    db: Session = Depends(get_read_db),
+    current_user: UsuarioModel = Depends(admin_required)
+):
+    return utilizacao_medicos(db, *intervalo, medico_id=medico_id)
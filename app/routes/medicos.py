@@ -1,12 +1,20 @@
 # app/routes/medicos.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..schemas.medico import Medico, MedicoCreate, MedicoUpdate, MedicoCompleto
 from ..models.medico import Medico as MedicoModel
 from ..models.usuario import Usuario as UsuarioModel, TipoUsuario
-from ..auth import admin_required, medico_required, get_password_hash
+from ..auth import admin_required, medico_required, recepcionista_or_above_required, get_password_hash, invalidar_principal
+from ..utils.helpers import paginar, proximo_cursor
+from ..services.consulta_service import cache_disponibilidade
+from ..services.medico_service import (
+    compilar_agenda, diretorio_medicos, query_medicos_versionados, query_versoes_medicos, separar_versoes_medicos
+)
+from ..utils.serializacao import resposta_lista
+from ..utils.condicional import verificar_condicional, etag_confere
 
 router = APIRouter(
     prefix="/medicos",
@@ -15,44 +23,78 @@ router = APIRouter(
 
 @router.get("/", response_model=List[MedicoCompleto])
 def get_medicos(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     nome: Optional[str] = None,
     especialidade: Optional[str] = None,
     crm: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: UsuarioModel = Depends(medico_required)
 ):
-    query = db.query(MedicoModel).join(UsuarioModel)
-    
+    filtros = []
     if nome:
-        query = query.filter(UsuarioModel.nome.ilike(f"%{nome}%"))
+        filtros.append(UsuarioModel.nome.ilike(f"%{nome}%"))
     if especialidade:
-        query = query.filter(MedicoModel.especialidade.ilike(f"%{especialidade}%"))
+        filtros.append(MedicoModel.especialidade.ilike(f"%{especialidade}%"))
     if crm:
-        query = query.filter(MedicoModel.crm.ilike(f"%{crm}%"))
-    
-    medicos = query.offset(skip).limit(limit).all()
-    
-    resultado = []
-    for medico in medicos:
-        medico_completo = {
-            **medico.__dict__,
-            "nome": medico.usuario.nome,
-            "email": medico.usuario.email,
-            "foto_perfil": medico.usuario.foto_perfil,
-            "ativo": medico.usuario.ativo
-        }
-        resultado.append(medico_completo)
-    
-    return resultado
+        filtros.append(MedicoModel.crm.ilike(f"%{crm}%"))
+    
+    ordenacao = (UsuarioModel.nome, MedicoModel.id)
+    if "if-none-match" in request.headers:
+        # Só as versões da página, para responder 304 sem carregar o conteúdo
+        versoes = paginar(query_versoes_medicos(db).filter(*filtros), ordenacao, skip, limit, cursor)
+        nao_modificado = verificar_condicional(request, response, versoes, lista=True)
+        if nao_modificado:
+            return nao_modificado
+    
+    # Versões e conteúdo na mesma instrução: o ETag descreve exatamente a página servida
+    query = query_medicos_versionados(db).filter(*filtros)
+    resultado, versoes = separar_versoes_medicos(paginar(query, ordenacao, skip, limit, cursor))
+    nao_modificado = verificar_condicional(request, response, versoes, lista=True)
+    if nao_modificado:
+        return nao_modificado
+    
+    next_cursor = proximo_cursor(resultado, ordenacao, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return resposta_lista(resultado, response)
+
+@router.get("/diretorio")
+def get_diretorio_medicos(
+    request: Request,
+    prefixo: Optional[str] = None,
+    especialidade: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: UsuarioModel = Depends(recepcionista_or_above_required)
+):
+    # Médicos ativos agrupados por especialidade, servidos da memória;
+    # declarada antes de /{medico_id} para não ser capturada por ela
+    snapshot = diretorio_medicos.obter(db)
+    cabecalhos = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+    if etag_confere(request, snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    
+    return JSONResponse(snapshot.buscar(prefixo, especialidade), headers=cabecalhos)
 
 @router.get("/{medico_id}", response_model=MedicoCompleto)
 def get_medico(
     medico_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: UsuarioModel = Depends(medico_required)
 ):
+    versao = query_versoes_medicos(db).filter(MedicoModel.id == medico_id).first()
+    if versao is None:
+        raise HTTPException(status_code=404, detail="Médico não encontrado")
+    nao_modificado = verificar_condicional(request, response, [versao])
+    if nao_modificado:
+        return nao_modificado
+    
     medico = db.query(MedicoModel).filter(MedicoModel.id == medico_id).first()
     if medico is None:
         raise HTTPException(status_code=404, detail="Médico não encontrado")
@@ -99,6 +141,17 @@ def create_medico(
     if usuario.tipo != TipoUsuario.MEDICO:
         raise HTTPException(status_code=400, detail="O usuário deve ser do tipo 'medico'")
     
+    # Validar a configuração de atendimento
+    try:
+        compilar_agenda(
+            medico_data.dias_atendimento,
+            medico_data.horario_inicio_atendimento,
+            medico_data.horario_fim_atendimento,
+            medico_data.tempo_consulta
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     db_medico = MedicoModel(
         usuario_id=medico_data.usuario_id,
         crm=medico_data.crm,
@@ -115,6 +168,7 @@ def create_medico(
     db.add(db_medico)
     db.commit()
     db.refresh(db_medico)
+    diretorio_medicos.invalidar()
     
     medico_completo = {
         **db_medico.__dict__,
@@ -165,9 +219,25 @@ def update_medico(
     if medico_data.tempo_consulta is not None:
         db_medico.tempo_consulta = medico_data.tempo_consulta
     
+    # Validar a configuração de atendimento resultante
+    try:
+        compilar_agenda(
+            db_medico.dias_atendimento,
+            db_medico.horario_inicio_atendimento,
+            db_medico.horario_fim_atendimento,
+            db_medico.tempo_consulta
+        )
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
     db.commit()
     db.refresh(db_medico)
     
+    # Horários ou duração da consulta podem ter mudado
+    cache_disponibilidade.invalidar_medico(medico_id)
+    diretorio_medicos.invalidar()
+    
     usuario = db.query(UsuarioModel).filter(UsuarioModel.id == db_medico.usuario_id).first()
     
     medico_completo = {
@@ -199,4 +269,9 @@ def delete_medico(
     db.delete(db_medico)
     db.commit()
     
+    cache_disponibilidade.invalidar_medico(medico_id)
+    diretorio_medicos.invalidar()
+    if usuario:
+        invalidar_principal(usuario.email)
+    
     return {"detail": "Médico removido com sucesso"}
\ No newline at end of file
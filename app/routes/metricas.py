@@ -0,0 +1,126 @@
+# app/routes/metricas.py
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from ..config import settings
+from ..database import estatisticas_pool, metricas_pool, MetricasPool, roteador_leituras
+from ..models.usuario import Usuario as UsuarioModel
+from ..auth import admin_required, cache_principais
+from ..services.consulta_service import cache_disponibilidade
+from ..utils.metricas import metricas_requisicoes, linhas_histograma, rotulos_prometheus
+from ..utils.security import pool_hashing, PoolHashing
+
+router = APIRouter(
+    prefix="/metricas",
+    tags=["métricas"]
+)
+
+# Registrado sem o prefixo da API: /metrics, o caminho padrão da coleta do Prometheus
+router_prometheus = APIRouter(tags=["métricas"])
+
+@router.get("/pool")
+def get_metricas_pool(current_user: UsuarioModel = Depends(admin_required)):
+    return estatisticas_pool()
+
+@router.get("/replicas")
+def get_metricas_replicas(current_user: UsuarioModel = Depends(admin_required)):
+    roteador_leituras.atualizar_atrasos()
+    return roteador_leituras.estatisticas()
+
+def _linhas_pool():
+    pool = estatisticas_pool()
+    linhas = []
+    for nome, tipo, descricao, valor in (
+        ("clinica_db_pool_em_uso", "gauge", "Conexões do pool em uso.", pool["em_uso"]),
+        ("clinica_db_pool_disponiveis", "gauge", "Conexões ociosas no pool.", pool["disponiveis"]),
+        ("clinica_db_pool_overflow", "gauge", "Conexões abertas além de DB_POOL_SIZE.", pool["overflow"]),
+        ("clinica_db_pool_timeouts_total", "counter", "Esperas por conexão que excederam DB_POOL_TIMEOUT.", pool["timeouts"]),
+    ):
+        linhas += [f"# HELP {nome} {descricao}", f"# TYPE {nome} {tipo}", f"{nome} {valor}"]
+    linhas += [
+        "# HELP clinica_db_pool_espera_segundos Espera por uma conexão do pool.",
+        "# TYPE clinica_db_pool_espera_segundos histogram",
+    ]
+    with metricas_pool._lock:
+        linhas.extend(linhas_histograma(
+            "clinica_db_pool_espera_segundos", MetricasPool.LIMITES_HISTOGRAMA,
+            list(metricas_pool.histograma), metricas_pool.espera_total, metricas_pool.checkouts
+        ))
+    return linhas
+
+def _linhas_replicas():
+    # A coleta também renova a medição do atraso, mesmo sem leituras recentes
+    roteador_leituras.atualizar_atrasos()
+    estatisticas = roteador_leituras.estatisticas()
+    linhas = [
+        "# HELP clinica_db_leituras_total Sessões das rotas somente leitura, por destino e motivo da escolha.",
+        "# TYPE clinica_db_leituras_total counter",
+    ]
+    for decisao in estatisticas["decisoes"]:
+        linhas.append(
+            f"clinica_db_leituras_total{rotulos_prometheus(destino=decisao['destino'], motivo=decisao['motivo'])} {decisao['total']}"
+        )
+    linhas += [
+        "# HELP clinica_db_replica_disponivel Réplica respondendo à medição de atraso (1) ou não (0).",
+        "# TYPE clinica_db_replica_disponivel gauge",
+    ]
+    for replica in estatisticas["replicas"]:
+        linhas.append(f"clinica_db_replica_disponivel{rotulos_prometheus(replica=replica['nome'])} {int(replica['disponivel'])}")
+    linhas += [
+        "# HELP clinica_db_replica_atraso_segundos Atraso de replay da réplica em relação ao primário.",
+        "# TYPE clinica_db_replica_atraso_segundos gauge",
+    ]
+    for replica in estatisticas["replicas"]:
+        if replica["atraso_segundos"] is not None:
+            linhas.append(f"clinica_db_replica_atraso_segundos{rotulos_prometheus(replica=replica['nome'])} {replica['atraso_segundos']}")
+    return linhas
+
+def _linhas_caches():
+    caches = {"principais": cache_principais.estatisticas(), "disponibilidade": cache_disponibilidade.estatisticas()}
+    linhas = []
+    for chave, tipo, descricao in (
+        ("hits", "counter", "Leituras atendidas pelo cache."),
+        ("misses", "counter", "Leituras não encontradas no cache."),
+        ("evictions", "counter", "Itens removidos por falta de espaço."),
+        ("itens", "gauge", "Itens armazenados no cache."),
+    ):
+        nome = f"clinica_cache_{chave}" + ("_total" if tipo == "counter" else "")
+        linhas += [f"# HELP {nome} {descricao}", f"# TYPE {nome} {tipo}"]
+        for cache, estatisticas in caches.items():
+            # O Redis não informa remoções nem itens; a série é omitida
+            if estatisticas.get(chave) is not None:
+                linhas.append(f"{nome}{rotulos_prometheus(cache=cache, backend=estatisticas['backend'])} {estatisticas[chave]}")
+    return linhas
+
+def _linhas_hashing():
+    hashing = pool_hashing.estatisticas()
+    linhas = []
+    for nome, tipo, descricao, valor in (
+        ("clinica_hash_em_andamento", "gauge", "Operações de bcrypt em andamento no pool de processos.", hashing["em_andamento"]),
+        ("clinica_hash_rejeicoes_total", "counter", "Operações recusadas com a fila do pool cheia.", hashing["rejeicoes"]),
+        ("clinica_hash_timeouts_total", "counter", "Operações que não terminaram no prazo (HASH_TIMEOUT_SEGUNDOS).", hashing["timeouts"]),
+    ):
+        linhas += [f"# HELP {nome} {descricao}", f"# TYPE {nome} {tipo}", f"{nome} {valor}"]
+    histograma = hashing["histograma_segundos"]
+    linhas += [
+        "# HELP clinica_hash_duracao_segundos Duração das operações de bcrypt, incluindo a fila.",
+        "# TYPE clinica_hash_duracao_segundos histogram",
+    ]
+    linhas.extend(linhas_histograma(
+        "clinica_hash_duracao_segundos", PoolHashing.LIMITES_HISTOGRAMA,
+        [histograma[str(limite)] for limite in PoolHashing.LIMITES_HISTOGRAMA],
+        hashing["tempo_medio_segundos"] * hashing["operacoes"], hashing["operacoes"]
+    ))
+    return linhas
+
+@router_prometheus.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics(request: Request):
+    # Rotas, volumes e tempos não são públicos: sem METRICAS_TOKEN a coleta fica desativada
+    if not settings.METRICAS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Métricas desativadas (defina METRICAS_TOKEN)")
+    autorizacao = request.headers.get("authorization", "").encode()
+    if not secrets.compare_digest(autorizacao, f"Bearer {settings.METRICAS_TOKEN}".encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token de métricas inválido")
+
+    linhas = metricas_requisicoes.linhas_prometheus() + _linhas_pool() + _linhas_replicas() + _linhas_caches() + _linhas_hashing()
+    return PlainTextResponse("\n".join(linhas) + "\n", media_type="text/plain; version=0.0.4")
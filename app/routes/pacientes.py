@@ -1,12 +1,23 @@
 # app/routes/pacientes.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import csv
+import io
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from ..database import get_db
-from ..schemas.paciente import Paciente, PacienteCreate, PacienteUpdate
+from ..database import get_db, get_read_db
+from ..schemas.paciente import Paciente, PacienteCreate, PacienteUpdate, PacienteImportacaoResultado
+from ..schemas.prontuario import ItemTimeline
 from ..models.paciente import Paciente as PacienteModel
 from ..models.usuario import Usuario as UsuarioModel
-from ..auth import recepcionista_or_above_required
+from ..auth import recepcionista_or_above_required, medico_required, admin_required
+from ..services.paciente_service import (
+    filtrar_pacientes, aplicar_busca, separar_versoes_pacientes,
+    ORDENACAO_PACIENTES, COLUNA_VERSAO_PACIENTE, COLUNAS_VERSAO_PACIENTE
+)
+from ..services.importacao_service import importar_pacientes_csv
+from ..services.prontuario_service import timeline_paciente, COLUNAS_TIMELINE
+from ..utils.helpers import paginar, proximo_cursor
+from ..utils.condicional import verificar_condicional
 
 router = APIRouter(
     prefix="/pacientes",
@@ -15,35 +26,85 @@ router = APIRouter(
 
 @router.get("/", response_model=List[Paciente])
 def get_pacientes(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     nome: Optional[str] = None,
     cpf: Optional[str] = None,
     email: Optional[str] = None,
     telefone: Optional[str] = None,
-    db: Session = Depends(get_db),
+    busca: Optional[str] = Query(None, min_length=2),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     current_user: UsuarioModel = Depends(recepcionista_or_above_required)
 ):
-    query = db.query(PacienteModel)
-    
-    if nome:
-        query = query.filter(PacienteModel.nome.ilike(f"%{nome}%"))
-    if cpf:
-        query = query.filter(PacienteModel.cpf.ilike(f"%{cpf}%"))
-    if email:
-        query = query.filter(PacienteModel.email.ilike(f"%{email}%"))
-    if telefone:
-        query = query.filter(PacienteModel.telefone.ilike(f"%{telefone}%"))
-    
-    pacientes = query.offset(skip).limit(limit).all()
+    query = filtrar_pacientes(db.query(PacienteModel), nome, cpf, email, telefone)
+    if busca:
+        # Resultados ordenados por relevância: paginação apenas por skip/limit
+        trigramas = db.get_bind().dialect.name == "postgresql"
+        return aplicar_busca(query, busca, trigramas).offset(skip).limit(limit).all()
+    
+    if "if-none-match" in request.headers:
+        # Só as versões da página, para responder 304 sem carregar o conteúdo
+        versoes = paginar(
+            filtrar_pacientes(db.query(*COLUNAS_VERSAO_PACIENTE), nome, cpf, email, telefone),
+            ORDENACAO_PACIENTES, skip, limit, cursor
+        )
+        nao_modificado = verificar_condicional(request, response, versoes, lista=True)
+        if nao_modificado:
+            return nao_modificado
+    
+    # Versões e conteúdo na mesma instrução: o ETag descreve exatamente a página servida
+    pacientes, versoes = separar_versoes_pacientes(paginar(
+        query.add_columns(COLUNA_VERSAO_PACIENTE), ORDENACAO_PACIENTES, skip, limit, cursor
+    ))
+    nao_modificado = verificar_condicional(request, response, versoes, lista=True)
+    if nao_modificado:
+        return nao_modificado
+    
+    next_cursor = proximo_cursor(pacientes, ORDENACAO_PACIENTES, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
     return pacientes
 
+@router.get("/{paciente_id}/timeline", response_model=List[ItemTimeline])
+def get_timeline_paciente(
+    paciente_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: UsuarioModel = Depends(medico_required)
+):
+    # Consultas e prontuários, do mais recente para o mais antigo, em uma única consulta
+    itens = timeline_paciente(db, paciente_id, limit, cursor)
+    if not itens and not cursor:
+        if not db.query(PacienteModel.id).filter(PacienteModel.id == paciente_id).first():
+            raise HTTPException(status_code=404, detail="Paciente não encontrado")
+    
+    next_cursor = proximo_cursor(itens, COLUNAS_TIMELINE, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return itens
+
 @router.get("/{paciente_id}", response_model=Paciente)
 def get_paciente(
     paciente_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: UsuarioModel = Depends(recepcionista_or_above_required)
 ):
+    versao = db.query(*COLUNAS_VERSAO_PACIENTE).filter(PacienteModel.id == paciente_id).first()
+    if versao is None:
+        raise HTTPException(status_code=404, detail="Paciente não encontrado")
+    nao_modificado = verificar_condicional(request, response, [versao])
+    if nao_modificado:
+        return nao_modificado
+    
     paciente = db.query(PacienteModel).filter(PacienteModel.id == paciente_id).first()
     if paciente is None:
         raise HTTPException(status_code=404, detail="Paciente não encontrado")
@@ -78,6 +139,25 @@ def create_paciente(
     db.refresh(db_paciente)
     return db_paciente
 
+@router.post("/importar", response_model=PacienteImportacaoResultado)
+def importar_pacientes(
+    arquivo: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: UsuarioModel = Depends(admin_required)
+):
+    # CSV em UTF-8 (com ou sem BOM), lido em fluxo a partir do arquivo temporário do upload
+    texto = io.TextIOWrapper(arquivo.file, encoding="utf-8-sig", newline="")
+    try:
+        resultado = importar_pacientes_csv(db, texto)
+        db.commit()
+    except (ValueError, csv.Error) as e:
+        # UnicodeDecodeError também é um ValueError
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Arquivo inválido: {e}")
+    finally:
+        texto.detach()
+    return resultado
+
 @router.put("/{paciente_id}", response_model=Paciente)
 def update_paciente(
     paciente_id: int,
@@ -0,0 +1,64 @@
+# app/routes/pacientes_async.py
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_read_db
+from ..schemas.paciente import Paciente
+from ..models.paciente import Paciente as PacienteModel
+from ..auth import Principal, recepcionista_or_above_required_async
+from ..services.paciente_service import (
+    filtrar_pacientes, aplicar_busca, separar_versoes_pacientes,
+    ORDENACAO_PACIENTES, COLUNA_VERSAO_PACIENTE, COLUNAS_VERSAO_PACIENTE
+)
+from ..utils.helpers import aplicar_paginacao, proximo_cursor
+from ..utils.condicional import verificar_condicional
+
+router = APIRouter(
+    prefix="/pacientes",
+    tags=["pacientes"]
+)
+
+@router.get("/", response_model=List[Paciente])
+async def get_pacientes_async(
+    request: Request,
+    response: Response,
+    skip: int = 0, 
+    limit: int = 100,
+    nome: Optional[str] = None,
+    cpf: Optional[str] = None,
+    email: Optional[str] = None,
+    telefone: Optional[str] = None,
+    busca: Optional[str] = Query(None, min_length=2),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: Principal = Depends(recepcionista_or_above_required_async)
+):
+    query = filtrar_pacientes(select(PacienteModel), nome, cpf, email, telefone)
+    if busca:
+        trigramas = db.bind.dialect.name == "postgresql"
+        return (await db.scalars(aplicar_busca(query, busca, trigramas).offset(skip).limit(limit))).all()
+    
+    if "if-none-match" in request.headers:
+        # Só as versões da página, para responder 304 sem carregar o conteúdo
+        versoes = (await db.execute(aplicar_paginacao(
+            filtrar_pacientes(select(*COLUNAS_VERSAO_PACIENTE), nome, cpf, email, telefone),
+            ORDENACAO_PACIENTES, skip, limit, cursor
+        ))).all()
+        nao_modificado = verificar_condicional(request, response, versoes, lista=True)
+        if nao_modificado:
+            return nao_modificado
+    
+    # Versões e conteúdo na mesma instrução: o ETag descreve exatamente a página servida
+    pacientes, versoes = separar_versoes_pacientes((await db.execute(aplicar_paginacao(
+        query.add_columns(COLUNA_VERSAO_PACIENTE), ORDENACAO_PACIENTES, skip, limit, cursor
+    ))).all())
+    nao_modificado = verificar_condicional(request, response, versoes, lista=True)
+    if nao_modificado:
+        return nao_modificado
+    
+    next_cursor = proximo_cursor(pacientes, ORDENACAO_PACIENTES, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return pacientes
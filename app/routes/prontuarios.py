@@ -0,0 +1,139 @@
+# app/routes/prontuarios.py
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..database import get_db, get_read_db
+from ..schemas.prontuario import Prontuario, ProntuarioCreate, ProntuarioUpdate
+from ..models.prontuario import Prontuario as ProntuarioModel
+from ..models.consulta import Consulta as ConsultaModel
+from ..models.medico import Medico as MedicoModel
+from ..models.usuario import Usuario as UsuarioModel, TipoUsuario
+from ..auth import admin_required, medico_required
+from ..utils.helpers import paginar, proximo_cursor
+
+router = APIRouter(
+    prefix="/prontuarios",
+    tags=["prontuários"]
+)
+
+def verificar_autor(db: Session, current_user, medico_id: int):
+    """Médicos só registram e alteram os próprios prontuários; administradores, qualquer um."""
+    if current_user.tipo == TipoUsuario.ADMINISTRADOR:
+        return
+    medico_usuario = db.query(MedicoModel.id).filter(MedicoModel.usuario_id == current_user.id).scalar()
+    if medico_usuario != medico_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permissão negada")
+
+@router.get("/", response_model=List[Prontuario])
+def get_prontuarios(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    paciente_id: Optional[int] = None,
+    medico_id: Optional[int] = None,
+    consulta_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: UsuarioModel = Depends(medico_required)
+):
+    query = db.query(ProntuarioModel)
+    
+    if paciente_id:
+        query = query.filter(ProntuarioModel.paciente_id == paciente_id)
+    if medico_id:
+        query = query.filter(ProntuarioModel.medico_id == medico_id)
+    if consulta_id:
+        query = query.filter(ProntuarioModel.consulta_id == consulta_id)
+    
+    ordenacao = (ProntuarioModel.data_criacao, ProntuarioModel.id)
+    prontuarios = paginar(query, ordenacao, skip, limit, cursor)
+    
+    next_cursor = proximo_cursor(prontuarios, ordenacao, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
+    return prontuarios
+
+@router.get("/{prontuario_id}", response_model=Prontuario)
+def get_prontuario(
+    prontuario_id: int,
+    db: Session = Depends(get_db),
+    current_user: UsuarioModel = Depends(medico_required)
+):
+    prontuario = db.query(ProntuarioModel).filter(ProntuarioModel.id == prontuario_id).first()
+    if prontuario is None:
+        raise HTTPException(status_code=404, detail="Prontuário não encontrado")
+    return prontuario
+
+@router.post("/", response_model=Prontuario)
+def create_prontuario(
+    prontuario: ProntuarioCreate,
+    db: Session = Depends(get_db),
+    current_user: UsuarioModel = Depends(medico_required)
+):
+    verificar_autor(db, current_user, prontuario.medico_id)
+    
+    # A consulta deve existir e pertencer ao paciente e ao médico informados
+    consulta = db.query(ConsultaModel.paciente_id, ConsultaModel.medico_id).\
+        filter(ConsultaModel.id == prontuario.consulta_id).first()
+    if consulta is None:
+        raise HTTPException(status_code=404, detail="Consulta não encontrada")
+    if consulta.paciente_id != prontuario.paciente_id or consulta.medico_id != prontuario.medico_id:
+        raise HTTPException(status_code=400, detail="A consulta não pertence a este paciente e médico")
+    
+    # Cada consulta tem no máximo um prontuário
+    existente = db.query(ProntuarioModel.id).filter(ProntuarioModel.consulta_id == prontuario.consulta_id).first()
+    if existente:
+        raise HTTPException(status_code=400, detail="Já existe um prontuário para esta consulta")
+    
+    db_prontuario = ProntuarioModel(
+        paciente_id=prontuario.paciente_id,
+        consulta_id=prontuario.consulta_id,
+        medico_id=prontuario.medico_id,
+        diagnostico=prontuario.diagnostico,
+        tratamento=prontuario.tratamento,
+        observacoes=prontuario.observacoes
+    )
+    db.add(db_prontuario)
+    db.commit()
+    db.refresh(db_prontuario)
+    return db_prontuario
+
+@router.put("/{prontuario_id}", response_model=Prontuario)
+def update_prontuario(
+    prontuario_id: int,
+    prontuario: ProntuarioUpdate,
+    db: Session = Depends(get_db),
+    current_user: UsuarioModel = Depends(medico_required)
+):
+    db_prontuario = db.query(ProntuarioModel).filter(ProntuarioModel.id == prontuario_id).first()
+    if db_prontuario is None:
+        raise HTTPException(status_code=404, detail="Prontuário não encontrado")
+    verificar_autor(db, current_user, db_prontuario.medico_id)
+    
+    if prontuario.diagnostico is not None:
+        db_prontuario.diagnostico = prontuario.diagnostico
+    
+    if prontuario.tratamento is not None:
+        db_prontuario.tratamento = prontuario.tratamento
+    
+    if prontuario.observacoes is not None:
+        db_prontuario.observacoes = prontuario.observacoes
+    
+    db.commit()
+    db.refresh(db_prontuario)
+    return db_prontuario
+
+@router.delete("/{prontuario_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_prontuario(
+    prontuario_id: int,
+    db: Session = Depends(get_db),
+    current_user: UsuarioModel = Depends(admin_required)
+):
+    db_prontuario = db.query(ProntuarioModel).filter(ProntuarioModel.id == prontuario_id).first()
+    if db_prontuario is None:
+        raise HTTPException(status_code=404, detail="Prontuário não encontrado")
+    
+    db.delete(db_prontuario)
+    db.commit()
+    return None
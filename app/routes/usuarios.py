@@ -1,11 +1,13 @@
 # app/routes/usuarios.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from ..database import get_db
 from ..schemas.usuario import Usuario, UsuarioCreate, UsuarioUpdate
 from ..models.usuario import Usuario as UsuarioModel
-from ..auth import get_password_hash, admin_required
+from ..auth import get_password_hash, admin_required, invalidar_principal
+from ..services.medico_service import diretorio_medicos
+from ..utils.helpers import paginar, proximo_cursor
 
 router = APIRouter(
     prefix="/usuarios",
@@ -14,12 +16,20 @@ router = APIRouter(
 
 @router.get("/", response_model=List[Usuario])
 def get_usuarios(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: UsuarioModel = Depends(admin_required)
 ):
-    usuarios = db.query(UsuarioModel).offset(skip).limit(limit).all()
+    ordenacao = (UsuarioModel.nome, UsuarioModel.id)
+    usuarios = paginar(db.query(UsuarioModel), ordenacao, skip, limit, cursor)
+    
+    next_cursor = proximo_cursor(usuarios, ordenacao, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    
     return usuarios
 
 @router.get("/{usuario_id}", response_model=Usuario)
@@ -67,6 +77,7 @@ def update_usuario(
     db_usuario = db.query(UsuarioModel).filter(UsuarioModel.id == usuario_id).first()
     if db_usuario is None:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
+    email_anterior = db_usuario.email
     
     # Atualizar os campos
     if usuario.email is not None:
@@ -93,6 +104,9 @@ def update_usuario(
     
     db.commit()
     db.refresh(db_usuario)
+    invalidar_principal(email_anterior, db_usuario.email)
+    # Nome, foto ou status de um médico aparecem no diretório
+    diretorio_medicos.invalidar()
     return db_usuario
 
 @router.delete("/{usuario_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -108,4 +122,6 @@ def delete_usuario(
     # Em vez de deletar, marcar como inativo
     db_usuario.ativo = False
     db.commit()
+    invalidar_principal(db_usuario.email)
+    diretorio_medicos.invalidar()
     return {"detail": "Usuário removido com sucesso"}
\ No newline at end of file
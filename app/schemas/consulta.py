@@ -24,6 +24,8 @@ class ConsultaCreate(ConsultaBase):
     pass
 
 class ConsultaUpdate(BaseModel):
+    paciente_id: Optional[int] = None
+    medico_id: Optional[int] = None
     data_consulta: Optional[date] = None
     hora_consulta: Optional[time] = None
     problema_saude: Optional[str] = None
@@ -44,4 +46,19 @@ class ConsultaDetalhada(Consulta):
     paciente_nome: str
     paciente_cpf: str
     medico_nome: str
-    medico_especialidade: str
\ No newline at end of file
+    medico_especialidade: str
+
+class ConsultaBatchCreate(BaseModel):
+    consultas: List[ConsultaCreate] = Field(..., min_items=1, max_items=1000)
+
+class ConsultaBatchItemResultado(BaseModel):
+    indice: int
+    sucesso: bool
+    consulta_id: Optional[int] = None
+    erro: Optional[str] = None
+
+class ConsultaBatchResultado(BaseModel):
+    total: int
+    criadas: int
+    rejeitadas: int
+    itens: List[ConsultaBatchItemResultado]
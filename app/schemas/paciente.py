@@ -1,5 +1,5 @@
 # app/schemas/paciente.py
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional, List
 from datetime import date, datetime
 from enum import Enum
@@ -48,5 +48,21 @@ class Paciente(PacienteBase):
     data_criacao: datetime
     data_atualizacao: Optional[datetime] = None
 
+    # O modelo usa os próprios enums (models.paciente); aqui vale o valor ("masculino")
+    @validator("sexo", "tipo_contato", pre=True)
+    def _valor_do_enum(cls, valor):
+        return getattr(valor, "value", valor)
+
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class PacienteImportacaoRejeicao(BaseModel):
+    linha: int
+    cpf: Optional[str] = None
+    erro: str
+
+class PacienteImportacaoResultado(BaseModel):
+    total: int
+    importados: int
+    rejeitados: int
+    rejeicoes: List[PacienteImportacaoRejeicao]
\ No newline at end of file
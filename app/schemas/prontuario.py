@@ -25,4 +25,17 @@ class Prontuario(ProntuarioBase):
     data_atualizacao: Optional[datetime] = None
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class ItemTimeline(BaseModel):
+    tipo: str  # "consulta" ou "prontuario"
+    id: int
+    momento: datetime
+    consulta_id: Optional[int] = None
+    medico_id: int
+    medico_nome: str
+    status: Optional[str] = None
+    problema_saude: Optional[str] = None
+    diagnostico: Optional[str] = None
+    tratamento: Optional[str] = None
+    observacoes: Optional[str] = None
@@ -1,5 +1,5 @@
 # app/schemas/usuario.py
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -40,5 +40,10 @@ class Usuario(UsuarioBase):
     data_criacao: datetime
     data_atualizacao: Optional[datetime] = None
 
+    # O modelo usa o próprio enum (models.usuario); aqui vale o valor ("medico")
+    @validator("tipo", pre=True)
+    def _valor_do_enum(cls, valor):
+        return getattr(valor, "value", valor)
+
     class Config:
         orm_mode = True
\ No newline at end of file
@@ -0,0 +1,521 @@
+# app/services/consulta_service.py
+import csv
+import enum
+import io
+import json
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import date, time, datetime, timedelta
+from typing import List
+from fastapi import HTTPException
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session, joinedload
+from ..models.consulta import Consulta as ConsultaModel, StatusConsulta as StatusConsultaModel
+from ..models.paciente import Paciente as PacienteModel
+from ..models.medico import Medico as MedicoModel
+from ..models.usuario import Usuario as UsuarioModel
+from ..config import settings
+from ..database import SessionLocal, em_replica
+from ..utils.cache import CacheDisponibilidade, CacheDisponibilidadeRedis
+from ..utils.condicional import colunas_versao
+from .medico_service import AgendaMedico, agenda_do_medico
+from .notificacao_service import criar_notificacao_consulta
+
+def criar_cache_disponibilidade():
+    if settings.DISPONIBILIDADE_CACHE_BACKEND == "redis":
+        return CacheDisponibilidadeRedis(
+            settings.DISPONIBILIDADE_CACHE_URL,
+            ttl=settings.DISPONIBILIDADE_CACHE_TTL_SEGUNDOS
+        )
+    return CacheDisponibilidade(
+        settings.DISPONIBILIDADE_CACHE_TAMANHO,
+        ttl=settings.DISPONIBILIDADE_CACHE_TTL_SEGUNDOS
+    )
+
+# Horários livres por (medico_id, data); invalidado pelas rotas que alteram a agenda
+cache_disponibilidade = criar_cache_disponibilidade()
+
+def invalidar_disponibilidade(medico_id: int, *dias: date):
+    for dia in set(dias):
+        cache_disponibilidade.invalidar(medico_id, dia)
+
+# Linhas buscadas do cursor no servidor (e enviadas ao cliente) por vez na exportação
+TAMANHO_BLOCO_EXPORTACAO = 1000
+
+# Colunas necessárias para montar o schema ConsultaDetalhada
+COLUNAS_CONSULTA_DETALHADA = (
+    ConsultaModel.id,
+    ConsultaModel.paciente_id,
+    ConsultaModel.medico_id,
+    ConsultaModel.data_consulta,
+    ConsultaModel.hora_consulta,
+    ConsultaModel.problema_saude,
+    ConsultaModel.status,
+    ConsultaModel.observacoes,
+    ConsultaModel.notificacao_enviada,
+    ConsultaModel.lembrete_enviado,
+    ConsultaModel.data_criacao,
+    ConsultaModel.data_atualizacao,
+    PacienteModel.nome.label("paciente_nome"),
+    PacienteModel.cpf.label("paciente_cpf"),
+    UsuarioModel.nome.label("medico_nome"),
+    MedicoModel.especialidade.label("medico_especialidade"),
+)
+
+# Versão de uma ConsultaDetalhada: muda com a consulta, o paciente, o médico ou o usuário do médico.
+# Rotuladas para virem na mesma linha da projeção: o ETag sai das linhas servidas
+COLUNAS_VERSAO_CONSULTA = tuple(
+    versao.label(f"versao_{tabela}") for tabela, versao in zip(
+        ("consulta", "paciente", "medico", "usuario"),
+        colunas_versao(ConsultaModel, PacienteModel, MedicoModel, UsuarioModel)
+    )
+)
+
+def _juntar_paciente_e_medico(query):
+    # Funciona tanto com Query (sessão síncrona) quanto com select() (sessão assíncrona)
+    return query.join(PacienteModel, ConsultaModel.paciente_id == PacienteModel.id).\
+        join(MedicoModel, ConsultaModel.medico_id == MedicoModel.id).\
+        join(UsuarioModel, MedicoModel.usuario_id == UsuarioModel.id)
+
+def query_consultas_detalhadas(db: Session):
+    """Consulta única (com joins) que projeta apenas as colunas de ConsultaDetalhada."""
+    return _juntar_paciente_e_medico(db.query(*COLUNAS_CONSULTA_DETALHADA))
+
+def select_consultas_detalhadas():
+    """Equivalente a query_consultas_detalhadas para uso com AsyncSession."""
+    return _juntar_paciente_e_medico(select(*COLUNAS_CONSULTA_DETALHADA))
+
+def query_consultas_versionadas(db: Session):
+    """query_consultas_detalhadas com as versões das quatro tabelas, para o ETag."""
+    return _juntar_paciente_e_medico(db.query(*COLUNAS_CONSULTA_DETALHADA, *COLUNAS_VERSAO_CONSULTA))
+
+def select_consultas_versionadas():
+    return _juntar_paciente_e_medico(select(*COLUNAS_CONSULTA_DETALHADA, *COLUNAS_VERSAO_CONSULTA))
+
+# Chave de ordenação da listagem de consultas (a última coluna é única)
+ORDENACAO_CONSULTAS = (ConsultaModel.data_consulta, ConsultaModel.hora_consulta, ConsultaModel.id)
+
+def linha_para_dict(linha):
+    consulta = dict(linha._mapping)
+    # Enum do modelo -> valor ("agendada"), que é o que o schema e o JSON esperam
+    consulta["status"] = consulta["status"].value
+    return consulta
+
+def separar_versoes(linhas):
+    """Linhas versionadas -> (consultas como dicts, versões de cada uma para o ETag)."""
+    consultas, versoes = [], []
+    for linha in linhas:
+        consulta = linha_para_dict(linha)
+        versoes.append((consulta["id"], *(consulta.pop(coluna.key) for coluna in COLUNAS_VERSAO_CONSULTA)))
+        consultas.append(consulta)
+    return consultas, versoes
+
+def filtrar_consultas(query, data_inicio=None, data_fim=None, medico_id=None, paciente_id=None, status=None):
+    """Filtros comuns da listagem e da exportação de consultas."""
+    if data_inicio:
+        query = query.filter(ConsultaModel.data_consulta >= data_inicio)
+    
+    if data_fim:
+        query = query.filter(ConsultaModel.data_consulta <= data_fim)
+    
+    if medico_id:
+        query = query.filter(ConsultaModel.medico_id == medico_id)
+    
+    if paciente_id:
+        query = query.filter(ConsultaModel.paciente_id == paciente_id)
+    
+    if status:
+        query = query.filter(ConsultaModel.status == StatusConsultaModel[status.name])
+    
+    return query
+
+def obter_consulta_detalhada(db: Session, consulta_id: int):
+    linha = query_consultas_detalhadas(db).filter(ConsultaModel.id == consulta_id).first()
+    if linha is None:
+        return None
+    return linha_para_dict(linha)
+
+def suporta_advisory_lock(db: Session) -> bool:
+    # Fora do PostgreSQL (SQLite nos benchmarks e no CI) as escritas já são serializadas pelo banco
+    return db.get_bind().dialect.name == "postgresql"
+
+def bloquear_agenda_medico(db: Session, medico_id: int, data_consulta: date):
+    """
+    Obtém um advisory lock transacional do PostgreSQL para a agenda (médico, dia).
+    O lock é liberado no commit/rollback, então verificação de conflito e inserção
+    ficam atômicas; agendamentos de outros médicos ou dias não se bloqueiam.
+    """
+    if not suporta_advisory_lock(db):
+        return
+    db.execute(
+        text("SELECT pg_advisory_xact_lock(:medico_id, :dia)"),
+        {"medico_id": medico_id, "dia": data_consulta.toordinal()}
+    )
+
+def existe_conflito_horario(
+    db: Session,
+    medico_id: int,
+    data_consulta: date,
+    hora_consulta: time,
+    tempo_consulta: int,
+    consulta_id: int = None
+) -> bool:
+    """
+    Verifica, em SQL, se alguma consulta ativa do médico se sobrepõe ao intervalo
+    [hora_consulta, hora_consulta + tempo_consulta). Como todas as consultas do médico
+    têm a mesma duração, há sobreposição quando a outra consulta começa depois de
+    (hora_consulta - tempo_consulta) e antes de (hora_consulta + tempo_consulta).
+    """
+    inicio = datetime.combine(data_consulta, hora_consulta)
+    limite_inferior = inicio - timedelta(minutes=tempo_consulta)
+    limite_superior = inicio + timedelta(minutes=tempo_consulta)
+    
+    query = db.query(ConsultaModel.id).filter(
+        ConsultaModel.medico_id == medico_id,
+        ConsultaModel.data_consulta == data_consulta,
+        ConsultaModel.status != StatusConsultaModel.CANCELADA
+    )
+    if consulta_id is not None:
+        query = query.filter(ConsultaModel.id != consulta_id)
+    # Limites que caem em outro dia não restringem a busca
+    if limite_inferior.date() == data_consulta:
+        query = query.filter(ConsultaModel.hora_consulta > limite_inferior.time())
+    if limite_superior.date() == data_consulta:
+        query = query.filter(ConsultaModel.hora_consulta < limite_superior.time())
+    
+    return query.first() is not None
+
+def validar_horario_medico(medico, data_consulta: date, hora_consulta: time):
+    """Recusa (400) dias e horários fora da agenda de atendimento do médico."""
+    agenda = agenda_do_medico(medico)
+    
+    # Verificar se o dia da semana está disponível para o médico
+    if not agenda.atende_em(data_consulta):
+        raise HTTPException(status_code=400, detail="O médico não atende neste dia da semana")
+    
+    # Verificar se o horário está dentro do horário de atendimento do médico
+    if not agenda.horario_valido(hora_para_minutos(hora_consulta)):
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Horário fora do período de atendimento do médico ({medico.horario_inicio_atendimento} - {medico.horario_fim_atendimento})"
+        )
+
+def reservar_horario(db: Session, medico, data_consulta: date, hora_consulta: time, consulta_id: int = None):
+    """
+    Bloqueia a agenda (médico, dia) até o fim da transação e recusa (400) o horário se
+    ele se sobrepõe a outra consulta ativa. Usado por toda escrita que ocupa um horário:
+    criação, remarcação, troca de médico e reativação de uma consulta cancelada.
+    """
+    bloquear_agenda_medico(db, medico.id, data_consulta)
+    if existe_conflito_horario(db, medico.id, data_consulta, hora_consulta, medico.tempo_consulta, consulta_id):
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Horário não disponível para este médico")
+
+def hora_para_minutos(hora: time) -> int:
+    return hora.hour * 60 + hora.minute
+
+def minutos_para_hora(minutos: int) -> str:
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+def calcular_horarios_livres(inicio: int, fim: int, tempo_consulta: int, ocupados: List[int]) -> List[int]:
+    """
+    Retorna o início (em minutos do dia) de cada horário livre entre inicio e fim.
+    `ocupados` são os inícios das consultas já marcadas, em ordem crescente; como todas
+    têm a mesma duração, uma única varredura é suficiente (O(horários + consultas)).
+    """
+    livres = []
+    j = 0
+    hora_atual = inicio
+    while hora_atual + tempo_consulta <= fim:
+        hora_fim_atual = hora_atual + tempo_consulta
+        # Descartar consultas que terminam antes do horário atual
+        while j < len(ocupados) and ocupados[j] + tempo_consulta <= hora_atual:
+            j += 1
+        if j == len(ocupados) or ocupados[j] >= hora_fim_atual:
+            livres.append(hora_atual)
+        hora_atual = hora_fim_atual
+    return livres
+
+def horarios_livres_dia(db: Session, medico_id: int, agenda: AgendaMedico, dia: date):
+    """Horários livres do médico no dia (em minutos), usando o cache quando possível."""
+    livres = cache_disponibilidade.obter(medico_id, dia)
+    if livres is not None:
+        return livres
+    
+    consultas = db.query(ConsultaModel.hora_consulta).filter(
+        ConsultaModel.medico_id == medico_id,
+        ConsultaModel.data_consulta == dia,
+        ConsultaModel.status != StatusConsultaModel.CANCELADA
+    ).order_by(ConsultaModel.hora_consulta).all()
+    ocupados = [hora_para_minutos(hora_consulta) for hora_consulta, in consultas]
+    
+    livres = calcular_horarios_livres(agenda.inicio, agenda.fim, agenda.tempo_consulta, ocupados)
+    # Uma réplica atrasada recolocaria no cache um dia que uma escrita acabou de invalidar
+    if not em_replica(db):
+        cache_disponibilidade.guardar(medico_id, dia, livres)
+    return livres
+
+def montar_disponibilidade_dia(medico, data_consulta: date, agenda: AgendaMedico, livres: List[int]):
+    """Resposta da disponibilidade de um dia; `medico.usuario` já deve estar carregado."""
+    return {
+        "medico_id": medico.id,
+        "medico_nome": medico.usuario.nome,
+        "especialidade": medico.especialidade,
+        "data_consulta": data_consulta.strftime("%Y-%m-%d"),
+        "tempo_consulta": f"{agenda.tempo_consulta} minutos",
+        "disponibilidade": [
+            {
+                "hora_inicio": minutos_para_hora(inicio),
+                "hora_fim": minutos_para_hora(inicio + agenda.tempo_consulta)
+            }
+            for inicio in livres
+        ]
+    }
+
+# Tamanho máximo do período aceito pela grade de disponibilidade
+MAX_DIAS_DISPONIBILIDADE = 62
+
+def validar_periodo_disponibilidade(data_inicio: date, data_fim: date):
+    if data_fim < data_inicio:
+        raise HTTPException(status_code=400, detail="A data final deve ser igual ou posterior à data inicial")
+    
+    if (data_fim - data_inicio).days >= MAX_DIAS_DISPONIBILIDADE:
+        raise HTTPException(status_code=400, detail=f"O período deve ter no máximo {MAX_DIAS_DISPONIBILIDADE} dias")
+
+def verificar_medicos_encontrados(medico_ids: List[int], medicos):
+    encontrados = {medico.id for medico in medicos}
+    nao_encontrados = [medico_id for medico_id in medico_ids if medico_id not in encontrados]
+    if nao_encontrados:
+        raise HTTPException(status_code=404, detail=f"Médico(s) não encontrado(s): {nao_encontrados}")
+
+def calcular_disponibilidade_periodo(db: Session, medicos, data_inicio: date, data_fim: date):
+    """
+    Calcula a grade de horários livres de vários médicos em um intervalo de datas.
+    Os dias que não estão no cache são resolvidos com uma única consulta ao banco.
+    Dias em que o médico não atende não aparecem em "dias".
+    """
+    agendas = {}
+    livres = {}
+    pendentes = []
+    for medico in medicos:
+        agenda = agenda_do_medico(medico)
+        agendas[medico.id] = agenda
+        
+        dia = data_inicio
+        while dia <= data_fim:
+            if agenda.atende_em(dia):
+                em_cache = cache_disponibilidade.obter(medico.id, dia)
+                if em_cache is None:
+                    pendentes.append((medico, dia))
+                else:
+                    livres[(medico.id, dia)] = em_cache
+            dia += timedelta(days=1)
+    
+    if pendentes:
+        medico_ids = {medico.id for medico, _ in pendentes}
+        consultas = db.query(ConsultaModel.medico_id, ConsultaModel.data_consulta, ConsultaModel.hora_consulta).filter(
+            ConsultaModel.medico_id.in_(medico_ids),
+            ConsultaModel.data_consulta >= min(dia for _, dia in pendentes),
+            ConsultaModel.data_consulta <= max(dia for _, dia in pendentes),
+            ConsultaModel.status != StatusConsultaModel.CANCELADA
+        ).order_by(ConsultaModel.medico_id, ConsultaModel.data_consulta, ConsultaModel.hora_consulta).all()
+        
+        ocupados = defaultdict(list)
+        for medico_id, data_consulta, hora_consulta in consultas:
+            ocupados[(medico_id, data_consulta)].append(hora_para_minutos(hora_consulta))
+        
+        for medico, dia in pendentes:
+            agenda = agendas[medico.id]
+            calculados = calcular_horarios_livres(agenda.inicio, agenda.fim, agenda.tempo_consulta, ocupados.get((medico.id, dia), []))
+            if not em_replica(db):
+                cache_disponibilidade.guardar(medico.id, dia, calculados)
+            livres[(medico.id, dia)] = calculados
+    
+    resultado = []
+    for medico in medicos:
+        dias = {}
+        dia = data_inicio
+        while dia <= data_fim:
+            if (medico.id, dia) in livres:
+                dias[dia.strftime("%Y-%m-%d")] = [minutos_para_hora(m) for m in livres[(medico.id, dia)]]
+            dia += timedelta(days=1)
+        
+        resultado.append({
+            "medico_id": medico.id,
+            "medico_nome": medico.usuario.nome,
+            "especialidade": medico.especialidade,
+            "tempo_consulta": medico.tempo_consulta,
+            "dias": dias
+        })
+    
+    return resultado
+
+def bloquear_agendas_medicos(db: Session, agendas):
+    """
+    Obtém, em uma única instrução, os advisory locks de vários pares (medico_id, data).
+    Os locks são pedidos sempre na mesma ordem para evitar deadlock entre lotes.
+    """
+    agendas = sorted(set(agendas))
+    if not agendas or not suporta_advisory_lock(db):
+        return
+    db.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(medico_id, dia) "
+            "FROM unnest(CAST(:medicos AS integer[]), CAST(:dias AS integer[])) AS t(medico_id, dia) "
+            "ORDER BY medico_id, dia"
+        ),
+        {
+            "medicos": [medico_id for medico_id, _ in agendas],
+            "dias": [dia.toordinal() for _, dia in agendas]
+        }
+    )
+
+def conflita_com(ocupados: List[int], inicio: int, tempo_consulta: int) -> bool:
+    """Se um horário iniciando em `inicio` se sobrepõe a algum dos inícios ordenados em `ocupados`."""
+    posicao = bisect_left(ocupados, inicio)
+    if posicao < len(ocupados) and ocupados[posicao] < inicio + tempo_consulta:
+        return True
+    if posicao > 0 and ocupados[posicao - 1] + tempo_consulta > inicio:
+        return True
+    return False
+
+def criar_consultas_em_lote(db: Session, itens):
+    """
+    Valida e cria várias consultas em uma única transação. Pacientes, médicos e consultas
+    já marcadas são carregados com poucas consultas em conjunto; cada item recebe um
+    resultado próprio, e os itens válidos são inseridos mesmo que outros sejam rejeitados.
+    As notificações vão para a outbox. Retorna (resultados, agendas_alteradas).
+    """
+    pacientes = {
+        paciente.id: paciente
+        for paciente in db.query(PacienteModel.id, PacienteModel.nome, PacienteModel.email).
+        filter(PacienteModel.id.in_({item.paciente_id for item in itens}))
+    }
+    medicos = {
+        medico.id: medico
+        for medico in db.query(MedicoModel).options(joinedload(MedicoModel.usuario)).
+        filter(MedicoModel.id.in_({item.medico_id for item in itens}))
+    }
+    
+    resultados = [None] * len(itens)
+    candidatos = []
+    for indice, item in enumerate(itens):
+        medico = medicos.get(item.medico_id)
+        erro = None
+        if item.paciente_id not in pacientes:
+            erro = "Paciente não encontrado"
+        elif medico is None:
+            erro = "Médico não encontrado"
+        else:
+            agenda = agenda_do_medico(medico)
+            if not agenda.atende_em(item.data_consulta):
+                erro = "O médico não atende neste dia da semana"
+            elif not agenda.horario_valido(hora_para_minutos(item.hora_consulta)):
+                erro = f"Horário fora do período de atendimento do médico ({medico.horario_inicio_atendimento} - {medico.horario_fim_atendimento})"
+        
+        if erro:
+            resultados[indice] = {"indice": indice, "sucesso": False, "erro": erro}
+        else:
+            candidatos.append((indice, item))
+    
+    agendas = {(item.medico_id, item.data_consulta) for _, item in candidatos}
+    ocupados = defaultdict(list)
+    if candidatos:
+        bloquear_agendas_medicos(db, agendas)
+        
+        consultas = db.query(ConsultaModel.medico_id, ConsultaModel.data_consulta, ConsultaModel.hora_consulta).filter(
+            ConsultaModel.medico_id.in_({medico_id for medico_id, _ in agendas}),
+            ConsultaModel.data_consulta >= min(dia for _, dia in agendas),
+            ConsultaModel.data_consulta <= max(dia for _, dia in agendas),
+            ConsultaModel.status != StatusConsultaModel.CANCELADA
+        ).order_by(ConsultaModel.hora_consulta).all()
+        for medico_id, data_consulta, hora_consulta in consultas:
+            ocupados[(medico_id, data_consulta)].append(hora_para_minutos(hora_consulta))
+    
+    criadas = []
+    for indice, item in candidatos:
+        medico = medicos[item.medico_id]
+        chave = (item.medico_id, item.data_consulta)
+        inicio = hora_para_minutos(item.hora_consulta)
+        if conflita_com(ocupados[chave], inicio, medico.tempo_consulta):
+            resultados[indice] = {"indice": indice, "sucesso": False, "erro": "Horário não disponível para este médico"}
+            continue
+        
+        # Reservar o horário também para os próximos itens do mesmo lote
+        insort(ocupados[chave], inicio)
+        db_consulta = ConsultaModel(
+            paciente_id=item.paciente_id,
+            medico_id=item.medico_id,
+            data_consulta=item.data_consulta,
+            hora_consulta=item.hora_consulta,
+            problema_saude=item.problema_saude,
+            status=StatusConsultaModel[item.status.name],
+            observacoes=item.observacoes
+        )
+        db.add(db_consulta)
+        criadas.append((indice, db_consulta))
+    
+    db.flush()
+    
+    for indice, db_consulta in criadas:
+        paciente = pacientes[db_consulta.paciente_id]
+        medico = medicos[db_consulta.medico_id]
+        if paciente.email:
+            db.add(criar_notificacao_consulta({
+                "id": db_consulta.id,
+                "paciente_nome": paciente.nome,
+                "medico_nome": medico.usuario.nome,
+                "medico_especialidade": medico.especialidade,
+                "data_consulta": db_consulta.data_consulta,
+                "hora_consulta": db_consulta.hora_consulta
+            }, paciente.email))
+        resultados[indice] = {"indice": indice, "sucesso": True, "consulta_id": db_consulta.id}
+    
+    return resultados, {(db_consulta.medico_id, db_consulta.data_consulta) for _, db_consulta in criadas}
+
+def _valor_exportacao(valor):
+    if isinstance(valor, enum.Enum):
+        return valor.value
+    if isinstance(valor, (date, time, datetime)):
+        return valor.isoformat()
+    return valor
+
+def exportar_consultas(formato: str, data_inicio=None, data_fim=None, medico_id=None, paciente_id=None, status=None):
+    """
+    Gera as consultas filtradas em CSV ou NDJSON, em blocos de texto. As linhas vêm de
+    um cursor no servidor (yield_per), então o consumo de memória não depende do total.
+    """
+    colunas = [coluna.key for coluna in COLUNAS_CONSULTA_DETALHADA]
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    
+    if formato == "csv":
+        # O cabeçalho sai antes da primeira consulta ao banco
+        escritor.writerow(colunas)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    db = SessionLocal()
+    try:
+        query = filtrar_consultas(query_consultas_detalhadas(db), data_inicio, data_fim, medico_id, paciente_id, status).\
+            order_by(ConsultaModel.data_consulta, ConsultaModel.hora_consulta, ConsultaModel.id).\
+            execution_options(yield_per=TAMANHO_BLOCO_EXPORTACAO)
+        
+        for numero, linha in enumerate(query, start=1):
+            valores = [_valor_exportacao(valor) for valor in linha]
+            if formato == "csv":
+                escritor.writerow(valores)
+            else:
+                buffer.write(json.dumps(dict(zip(colunas, valores)), ensure_ascii=False))
+                buffer.write("\n")
+            
+            if numero % TAMANHO_BLOCO_EXPORTACAO == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
@@ -0,0 +1,258 @@
+# app/services/dashboard_service.py
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from sqlalchemy import event, insert, select, delete, Date
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.sql import func
+from ..models.consulta import Consulta as ConsultaModel, StatusConsulta as StatusConsultaModel
+from ..models.paciente import Paciente as PacienteModel
+from ..models.medico import Medico as MedicoModel
+from ..models.usuario import Usuario as UsuarioModel
+from ..models.estatistica import EstatisticaConsultasDia, EstatisticaPacientesDia
+from .medico_service import agenda_do_medico
+
+# ---------------------------------------------------------------------------
+# Manutenção incremental: a cada flush, as mudanças em consultas e pacientes
+# viram deltas aplicados nas tabelas de estatística, na mesma transação.
+# ---------------------------------------------------------------------------
+
+def _valores(objeto, atributo):
+    """(valor anterior, valor atual) de um atributo ainda não confirmado."""
+    adicionado, inalterado, removido = get_history(objeto, atributo)
+    atual = adicionado[0] if adicionado else (inalterado[0] if inalterado else getattr(objeto, atributo))
+    anterior = removido[0] if removido else atual
+    return anterior, atual
+
+def _chave_consulta(objeto, anterior: bool):
+    indice = 0 if anterior else 1
+    return (
+        _valores(objeto, "data_consulta")[indice],
+        _valores(objeto, "medico_id")[indice],
+        _valores(objeto, "status")[indice]
+    )
+
+def calcular_deltas(session: Session):
+    consultas = Counter()
+    novos_pacientes = 0
+    # As estatísticas de um médico removido já saíram em remover_estatisticas
+    medicos_removidos = {objeto.id for objeto in session.deleted if isinstance(objeto, MedicoModel)}
+    
+    for objeto in session.new:
+        if isinstance(objeto, ConsultaModel):
+            consultas[_chave_consulta(objeto, anterior=False)] += 1
+        elif isinstance(objeto, PacienteModel):
+            novos_pacientes += 1
+    
+    for objeto in session.dirty:
+        if isinstance(objeto, ConsultaModel):
+            anterior = _chave_consulta(objeto, anterior=True)
+            atual = _chave_consulta(objeto, anterior=False)
+            if anterior != atual:
+                consultas[anterior] -= 1
+                consultas[atual] += 1
+    
+    for objeto in session.deleted:
+        if isinstance(objeto, ConsultaModel):
+            consultas[_chave_consulta(objeto, anterior=True)] -= 1
+    
+    return {
+        chave: delta for chave, delta in consultas.items() if delta and chave[1] not in medicos_removidos
+    }, novos_pacientes
+
+def _upsert_soma(conexao, modelo, linhas, chaves, coluna):
+    """INSERT ... ON CONFLICT DO UPDATE somando `coluna` (PostgreSQL ou SQLite)."""
+    dialeto = postgresql if conexao.dialect.name == "postgresql" else sqlite
+    instrucao = dialeto.insert(modelo).values(linhas)
+    instrucao = instrucao.on_conflict_do_update(
+        index_elements=chaves,
+        set_={coluna: getattr(modelo, coluna) + getattr(instrucao.excluded, coluna)}
+    )
+    conexao.execute(instrucao)
+
+def registrar_novos_pacientes(conexao, quantidade: int):
+    """Soma pacientes cadastrados hoje; usado também por inserções fora do ORM (importação)."""
+    _upsert_soma(conexao, EstatisticaPacientesDia, [
+        {"data": func.current_date(), "novos": quantidade}
+    ], ["data"], "novos")
+
+@event.listens_for(Session, "before_flush")
+def remover_estatisticas(session: Session, flush_context, instances):
+    """
+    Remoções tratadas antes do flush, enquanto as linhas ainda existem: as estatísticas
+    do médico saem antes dele (a FK não tem ON DELETE CASCADE) e cada paciente removido
+    é descontado do dia em que foi cadastrado.
+    """
+    medico_ids = [objeto.id for objeto in session.deleted if isinstance(objeto, MedicoModel)]
+    removidos = Counter(
+        objeto.data_criacao.date() for objeto in session.deleted
+        if isinstance(objeto, PacienteModel) and objeto.data_criacao is not None
+    )
+    if not medico_ids and not removidos:
+        return
+    
+    conexao = session.connection()
+    if medico_ids:
+        conexao.execute(delete(EstatisticaConsultasDia).where(EstatisticaConsultasDia.medico_id.in_(medico_ids)))
+    if removidos:
+        _upsert_soma(conexao, EstatisticaPacientesDia, [
+            {"data": data, "novos": -quantidade} for data, quantidade in sorted(removidos.items())
+        ], ["data"], "novos")
+
+@event.listens_for(Session, "after_flush")
+def atualizar_estatisticas(session: Session, flush_context):
+    consultas, novos_pacientes = calcular_deltas(session)
+    if not consultas and not novos_pacientes:
+        return
+    
+    conexao = session.connection()
+    if consultas:
+        # Uma única instrução por flush, com uma linha por (dia, médico, status)
+        _upsert_soma(conexao, EstatisticaConsultasDia, [
+            {"data": data, "medico_id": medico_id, "status": status, "total": delta}
+            for (data, medico_id, status), delta in sorted(consultas.items(), key=lambda item: (item[0][0], item[0][1], item[0][2].name))
+        ], ["data", "medico_id", "status"], "total")
+    if novos_pacientes:
+        registrar_novos_pacientes(conexao, novos_pacientes)
+
+def reconstruir_estatisticas(db: Session, data_inicio: date = None, data_fim: date = None):
+    """
+    Recalcula as tabelas de estatística a partir de consultas e pacientes, no
+    intervalo informado (ou em todo o histórico). Executa em uma única transação.
+    """
+    filtros_consultas = []
+    filtros_estatisticas = []
+    filtros_pacientes = []
+    filtros_estatisticas_pacientes = []
+    # date() existe no PostgreSQL e no SQLite (CAST AS DATE não funciona no SQLite)
+    data_cadastro = func.date(PacienteModel.data_criacao, type_=Date)
+    if data_inicio:
+        filtros_consultas.append(ConsultaModel.data_consulta >= data_inicio)
+        filtros_estatisticas.append(EstatisticaConsultasDia.data >= data_inicio)
+        filtros_pacientes.append(data_cadastro >= data_inicio)
+        filtros_estatisticas_pacientes.append(EstatisticaPacientesDia.data >= data_inicio)
+    if data_fim:
+        filtros_consultas.append(ConsultaModel.data_consulta <= data_fim)
+        filtros_estatisticas.append(EstatisticaConsultasDia.data <= data_fim)
+        filtros_pacientes.append(data_cadastro <= data_fim)
+        filtros_estatisticas_pacientes.append(EstatisticaPacientesDia.data <= data_fim)
+    
+    db.execute(delete(EstatisticaConsultasDia).where(*filtros_estatisticas))
+    db.execute(insert(EstatisticaConsultasDia).from_select(
+        ["data", "medico_id", "status", "total"],
+        select(ConsultaModel.data_consulta, ConsultaModel.medico_id, ConsultaModel.status, func.count()).
+        where(*filtros_consultas).
+        group_by(ConsultaModel.data_consulta, ConsultaModel.medico_id, ConsultaModel.status)
+    ))
+    
+    db.execute(delete(EstatisticaPacientesDia).where(*filtros_estatisticas_pacientes))
+    db.execute(insert(EstatisticaPacientesDia).from_select(
+        ["data", "novos"],
+        select(data_cadastro, func.count()).
+        where(PacienteModel.data_criacao.isnot(None), *filtros_pacientes).
+        group_by(data_cadastro)
+    ))
+    db.commit()
+
+# ---------------------------------------------------------------------------
+# Leitura: custo proporcional aos dias do período (e médicos), não às consultas
+# ---------------------------------------------------------------------------
+
+def _dias(data_inicio: date, data_fim: date):
+    dia = data_inicio
+    while dia <= data_fim:
+        yield dia
+        dia += timedelta(days=1)
+
+def consultas_por_dia(db: Session, data_inicio: date, data_fim: date, medico_id: int = None):
+    query = db.query(
+        EstatisticaConsultasDia.data,
+        EstatisticaConsultasDia.status,
+        func.sum(EstatisticaConsultasDia.total)
+    ).filter(EstatisticaConsultasDia.data >= data_inicio, EstatisticaConsultasDia.data <= data_fim)
+    if medico_id:
+        query = query.filter(EstatisticaConsultasDia.medico_id == medico_id)
+    linhas = query.group_by(EstatisticaConsultasDia.data, EstatisticaConsultasDia.status).all()
+    
+    por_dia = defaultdict(Counter)
+    for data, status, total in linhas:
+        por_dia[data][status.value] += total
+    
+    totais = Counter()
+    serie = []
+    for dia in _dias(data_inicio, data_fim):
+        contagem = por_dia.get(dia, Counter())
+        totais.update(contagem)
+        serie.append({
+            "data": dia.strftime("%Y-%m-%d"),
+            "total": sum(contagem.values()),
+            "por_status": {status.value: contagem.get(status.value, 0) for status in StatusConsultaModel}
+        })
+    
+    return {
+        "data_inicio": data_inicio.strftime("%Y-%m-%d"),
+        "data_fim": data_fim.strftime("%Y-%m-%d"),
+        "total": sum(totais.values()),
+        "por_status": {status.value: totais.get(status.value, 0) for status in StatusConsultaModel},
+        "dias": serie
+    }
+
+def pacientes_por_dia(db: Session, data_inicio: date, data_fim: date):
+    novos = dict(db.query(EstatisticaPacientesDia.data, EstatisticaPacientesDia.novos).filter(
+        EstatisticaPacientesDia.data >= data_inicio,
+        EstatisticaPacientesDia.data <= data_fim
+    ).all())
+    serie = [{"data": dia.strftime("%Y-%m-%d"), "novos": novos.get(dia, 0)} for dia in _dias(data_inicio, data_fim)]
+    return {
+        "data_inicio": data_inicio.strftime("%Y-%m-%d"),
+        "data_fim": data_fim.strftime("%Y-%m-%d"),
+        "novos_pacientes": sum(novos.values()),
+        "dias": serie
+    }
+
+def utilizacao_medicos(db: Session, data_inicio: date, data_fim: date, medico_id: int = None):
+    """
+    Utilização = minutos agendados / minutos disponíveis. Os minutos disponíveis
+    vêm da agenda de atendimento (horários que cabem no expediente, nos dias de
+    atendimento); os agendados, das consultas não canceladas × tempo de consulta.
+    """
+    query = db.query(MedicoModel.id, UsuarioModel.nome, MedicoModel.especialidade,
+                     MedicoModel.dias_atendimento, MedicoModel.horario_inicio_atendimento,
+                     MedicoModel.horario_fim_atendimento, MedicoModel.tempo_consulta).\
+        join(UsuarioModel, MedicoModel.usuario_id == UsuarioModel.id)
+    if medico_id:
+        query = query.filter(MedicoModel.id == medico_id)
+    medicos = query.order_by(UsuarioModel.nome, MedicoModel.id).all()
+    
+    agendadas = db.query(EstatisticaConsultasDia.medico_id, func.sum(EstatisticaConsultasDia.total)).filter(
+        EstatisticaConsultasDia.data >= data_inicio,
+        EstatisticaConsultasDia.data <= data_fim,
+        EstatisticaConsultasDia.status != StatusConsultaModel.CANCELADA
+    )
+    if medico_id:
+        agendadas = agendadas.filter(EstatisticaConsultasDia.medico_id == medico_id)
+    agendadas = dict(agendadas.group_by(EstatisticaConsultasDia.medico_id).all())
+    
+    resultado = []
+    for medico in medicos:
+        agenda = agenda_do_medico(medico)
+        horarios_por_dia = (agenda.fim - agenda.inicio) // agenda.tempo_consulta
+        dias_atendimento = sum(1 for dia in _dias(data_inicio, data_fim) if agenda.atende_em(dia))
+        minutos_disponiveis = dias_atendimento * horarios_por_dia * agenda.tempo_consulta
+        minutos_agendados = (agendadas.get(medico.id) or 0) * agenda.tempo_consulta
+        resultado.append({
+            "medico_id": medico.id,
+            "medico_nome": medico.nome,
+            "especialidade": medico.especialidade,
+            "dias_atendimento": dias_atendimento,
+            "minutos_disponiveis": minutos_disponiveis,
+            "minutos_agendados": minutos_agendados,
+            "utilizacao": round(minutos_agendados / minutos_disponiveis, 4) if minutos_disponiveis else 0.0
+        })
+    
+    return {
+        "data_inicio": data_inicio.strftime("%Y-%m-%d"),
+        "data_fim": data_fim.strftime("%Y-%m-%d"),
+        "medicos": resultado
+    }
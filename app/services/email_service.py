@@ -0,0 +1,106 @@
+# app/services/email_service.py
+import smtplib
+from email.mime.text import MIMEText
+from datetime import date, time
+from ..config import settings
+
+def montar_email_notificacao(paciente_nome: str, medico_nome: str, especialidade: str, data_consulta: date, hora_consulta: time):
+    assunto = "Confirmação de agendamento de consulta"
+    corpo = (
+        f"Olá, {paciente_nome}!\n\n"
+        f"Sua consulta com {medico_nome} ({especialidade}) foi agendada para "
+        f"{data_consulta.strftime('%d/%m/%Y')} às {hora_consulta.strftime('%H:%M')}.\n\n"
+        f"Em caso de dúvidas ou para remarcar, entre em contato com a clínica.\n\n"
+        f"{settings.APP_NAME}"
+    )
+    return assunto, corpo
+
+def montar_email_lembrete(paciente_nome: str, medico_nome: str, especialidade: str, data_consulta: date, hora_consulta: time):
+    assunto = "Lembrete de consulta"
+    corpo = (
+        f"Olá, {paciente_nome}!\n\n"
+        f"Lembramos que você tem uma consulta com {medico_nome} ({especialidade}) em "
+        f"{data_consulta.strftime('%d/%m/%Y')} às {hora_consulta.strftime('%H:%M')}.\n\n"
+        f"Por favor, chegue com 15 minutos de antecedência.\n\n"
+        f"{settings.APP_NAME}"
+    )
+    return assunto, corpo
+
+class ConexaoSMTP:
+    """
+    Conexão SMTP reaproveitável para vários envios. Qualquer falha descarta a conexão,
+    cujo estado passa a ser desconhecido (ex.: respostas fora de ordem), e o envio
+    seguinte abre outra; se o servidor apenas encerrou a sessão, o envio é repetido.
+    """
+
+    def __init__(self, servidor: str = None, porta: int = None):
+        self.servidor = servidor or settings.SMTP_SERVER
+        self.porta = porta or settings.SMTP_PORT
+        self._smtp = None
+
+    def _conectar(self):
+        smtp = smtplib.SMTP(self.servidor, self.porta, timeout=30)
+        try:
+            smtp.ehlo()
+            if smtp.has_extn("starttls"):
+                smtp.starttls()
+                smtp.ehlo()
+            if settings.SMTP_USERNAME:
+                smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+            raise
+        self._smtp = smtp
+
+    def _descartar(self):
+        # Sem QUIT: depois de uma falha, a sessão pode não responder mais em ordem
+        if self._smtp is not None:
+            self._smtp.close()
+            self._smtp = None
+
+    def enviar(self, destinatario: str, assunto: str, corpo: str):
+        if not destinatario:
+            raise ValueError("Destinatário sem e-mail cadastrado")
+
+        mensagem = MIMEText(corpo, "plain", "utf-8")
+        mensagem["Subject"] = assunto
+        mensagem["From"] = settings.EMAIL_FROM
+        mensagem["To"] = destinatario
+
+        for tentativa in range(2):
+            if self._smtp is None:
+                self._conectar()
+            try:
+                self._smtp.send_message(mensagem)
+                return
+            except (smtplib.SMTPException, OSError) as erro:
+                self._descartar()
+                # Sessão encerrada pelo servidor (ex.: por ociosidade): repetir com outra conexão
+                if tentativa or not isinstance(erro, smtplib.SMTPServerDisconnected):
+                    raise
+
+    def fechar(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                pass
+            self._smtp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+def enviar_email(destinatario: str, assunto: str, corpo: str):
+    with ConexaoSMTP() as conexao:
+        conexao.enviar(destinatario, assunto, corpo)
+
+def enviar_notificacao_consulta(paciente_email: str, paciente_nome: str, medico_nome: str, especialidade: str, data_consulta: date, hora_consulta: time):
+    assunto, corpo = montar_email_notificacao(paciente_nome, medico_nome, especialidade, data_consulta, hora_consulta)
+    enviar_email(paciente_email, assunto, corpo)
+
+def enviar_lembrete_consulta(paciente_email: str, paciente_nome: str, medico_nome: str, especialidade: str, data_consulta: date, hora_consulta: time):
+    assunto, corpo = montar_email_lembrete(paciente_nome, medico_nome, especialidade, data_consulta, hora_consulta)
+    enviar_email(paciente_email, assunto, corpo)
@@ -0,0 +1,181 @@
+# app/services/importacao_service.py
+import csv
+import io
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from ..models.paciente import Paciente as PacienteModel, Sexo as SexoModel, TipoContato as TipoContatoModel
+from ..schemas.paciente import PacienteCreate
+from ..utils.helpers import normalizar_texto, apenas_digitos
+from .dashboard_service import registrar_novos_pacientes
+
+# Linhas validadas, conferidas no banco e enviadas ao COPY por vez
+TAMANHO_BLOCO_IMPORTACAO = 5000
+
+# Colunas gravadas pela importação; data_criacao e id ficam com o default do banco
+COLUNAS_IMPORTACAO = (
+    "nome", "nome_busca", "cpf", "data_nascimento", "sexo", "telefone", "telefone_digitos",
+    "tipo_contato", "email", "endereco", "cidade", "estado", "cep"
+)
+
+CAMPOS_OBRIGATORIOS = [nome for nome, campo in PacienteCreate.__fields__.items() if campo.required]
+
+def _descrever_erros(erro: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in erro.errors())
+
+def _valores_importacao(paciente: PacienteCreate) -> dict:
+    # As colunas de busca são calculadas aqui porque o COPY não passa pelos validadores do modelo
+    return {
+        "nome": paciente.nome,
+        "nome_busca": normalizar_texto(paciente.nome),
+        "cpf": paciente.cpf,
+        "data_nascimento": paciente.data_nascimento,
+        "sexo": SexoModel[paciente.sexo.name],
+        "telefone": paciente.telefone,
+        "telefone_digitos": apenas_digitos(paciente.telefone),
+        "tipo_contato": TipoContatoModel[paciente.tipo_contato.name],
+        "email": paciente.email,
+        "endereco": paciente.endereco,
+        "cidade": paciente.cidade,
+        "estado": paciente.estado,
+        "cep": paciente.cep
+    }
+
+class ImportadorPacientes:
+    """
+    Importa pacientes de um CSV (cabeçalho com os campos de PacienteCreate) em uma
+    única transação. As linhas são lidas e validadas em fluxo; a cada bloco, os CPFs
+    são conferidos no banco com uma só consulta e as linhas válidas seguem, no
+    PostgreSQL, por COPY para uma tabela temporária. Ao final, um único
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING mescla tudo em pacientes.
+    Linhas inválidas ou com CPF repetido são rejeitadas sem interromper as demais.
+    O commit fica com quem chama.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.conexao = db.connection()
+        self.postgresql = self.conexao.dialect.name == "postgresql"
+        self.total = 0
+        self.inseridos = 0
+        self.rejeicoes = []
+        self._linhas_por_cpf = {}  # CPFs aceitos no arquivo -> linha de origem
+        self._bloco = []
+        self._cursor = None
+
+    def _rejeitar(self, linha: int, cpf, erro: str):
+        self.rejeicoes.append({"linha": linha, "cpf": cpf, "erro": erro})
+
+    def _preparar_tabela_temporaria(self):
+        self._cursor = self.conexao.connection.cursor()
+        # Carga administrativa: o limite de tempo por instrução da aplicação não se aplica
+        self._cursor.execute("SET LOCAL statement_timeout = 0")
+        self._cursor.execute(
+            f"CREATE TEMP TABLE importacao_pacientes ON COMMIT DROP AS "
+            f"SELECT {', '.join(COLUNAS_IMPORTACAO)} FROM pacientes WITH NO DATA"
+        )
+
+    def _descarregar_bloco(self):
+        if not self._bloco:
+            return
+        cpfs = [valores["cpf"] for _, valores in self._bloco]
+        existentes = {
+            cpf for cpf, in self.db.query(PacienteModel.cpf).filter(PacienteModel.cpf.in_(cpfs))
+        }
+        aceitos = []
+        for linha, valores in self._bloco:
+            if valores["cpf"] in existentes:
+                self._rejeitar(linha, valores["cpf"], "CPF já cadastrado")
+            else:
+                aceitos.append(valores)
+        self._bloco = []
+        if not aceitos:
+            return
+
+        if self.postgresql:
+            buffer = io.StringIO()
+            escritor = csv.writer(buffer)
+            for valores in aceitos:
+                # Enums gravados pelo nome, como o SQLAlchemy faz; None vira NULL no formato csv
+                escritor.writerow([
+                    valor.name if isinstance(valor, (SexoModel, TipoContatoModel)) else valor
+                    for valor in (valores[coluna] for coluna in COLUNAS_IMPORTACAO)
+                ])
+            buffer.seek(0)
+            self._cursor.copy_expert(
+                f"COPY importacao_pacientes ({', '.join(COLUNAS_IMPORTACAO)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        else:
+            # Outros bancos (desenvolvimento): inserção em lote direto na tabela
+            self.db.execute(insert(PacienteModel), aceitos)
+            self.inseridos += len(aceitos)
+
+    def _mesclar(self) -> int:
+        """Move as linhas da tabela temporária para pacientes e retorna quantas entraram."""
+        if not self.postgresql:
+            return self.inseridos
+        colunas = ", ".join(COLUNAS_IMPORTACAO)
+        self._cursor.execute(
+            f"INSERT INTO pacientes ({colunas}) SELECT {colunas} FROM importacao_pacientes "
+            f"ON CONFLICT (cpf) DO NOTHING RETURNING cpf"
+        )
+        inseridos = {cpf for cpf, in self._cursor.fetchall()}
+        self._cursor.execute("SELECT cpf FROM importacao_pacientes")
+        for cpf, in self._cursor.fetchall():
+            if cpf not in inseridos:
+                # Cadastrado por outra transação depois da conferência do bloco
+                self._rejeitar(self._linhas_por_cpf[cpf], cpf, "CPF já cadastrado")
+        return len(inseridos)
+
+    def importar(self, arquivo) -> dict:
+        """`arquivo` é um objeto de texto (ou iterável de linhas) com o CSV."""
+        leitor = csv.DictReader(arquivo)
+        cabecalho = [campo.strip() for campo in leitor.fieldnames or []]
+        faltando = [campo for campo in CAMPOS_OBRIGATORIOS if campo not in cabecalho]
+        if faltando:
+            raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(faltando)}")
+        leitor.fieldnames = cabecalho
+
+        if self.postgresql:
+            self._preparar_tabela_temporaria()
+
+        for campos in leitor:
+            self.total += 1
+            linha = leitor.line_num
+            # Campos vazios valem como ausentes; colunas extras (sem cabeçalho) são ignoradas
+            dados = {
+                chave: valor.strip() for chave, valor in campos.items()
+                if chave and isinstance(valor, str) and valor.strip()
+            }
+            try:
+                paciente = PacienteCreate(**dados)
+            except ValidationError as e:
+                self._rejeitar(linha, dados.get("cpf"), _descrever_erros(e))
+                continue
+
+            if paciente.cpf in self._linhas_por_cpf:
+                self._rejeitar(linha, paciente.cpf, f"CPF repetido no arquivo (linha {self._linhas_por_cpf[paciente.cpf]})")
+                continue
+            self._linhas_por_cpf[paciente.cpf] = linha
+
+            self._bloco.append((linha, _valores_importacao(paciente)))
+            if len(self._bloco) >= TAMANHO_BLOCO_IMPORTACAO:
+                self._descarregar_bloco()
+
+        self._descarregar_bloco()
+        importados = self._mesclar()
+        if importados:
+            # O INSERT ... SELECT não passa pelo flush da sessão, que mantém o dashboard
+            registrar_novos_pacientes(self.conexao, importados)
+
+        self.rejeicoes.sort(key=lambda rejeicao: rejeicao["linha"])
+        return {
+            "total": self.total,
+            "importados": importados,
+            "rejeitados": len(self.rejeicoes),
+            "rejeicoes": self.rejeicoes
+        }
+
+def importar_pacientes_csv(db: Session, arquivo) -> dict:
+    return ImportadorPacientes(db).importar(arquivo)
@@ -0,0 +1,203 @@
+# app/services/lembrete_service.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from ..config import settings
+from ..database import SessionLocal
+from ..models.consulta import Consulta as ConsultaModel, StatusConsulta as StatusConsultaModel
+from ..models.paciente import Paciente as PacienteModel
+from ..models.medico import Medico as MedicoModel
+from ..models.usuario import Usuario as UsuarioModel
+from ..models.job_lembrete import JobLembretes, StatusJob
+from .email_service import ConexaoSMTP, montar_email_lembrete
+
+logger = logging.getLogger("app.lembretes")
+
+# Threads de envio em execução neste processo, por job
+_execucoes = {}
+_execucoes_lock = threading.Lock()
+
+def filtro_candidatos(data_referencia: date):
+    return (
+        ConsultaModel.data_consulta == data_referencia,
+        ConsultaModel.status == StatusConsultaModel.CONFIRMADA,
+        ConsultaModel.lembrete_enviado == False
+    )
+
+def buscar_lote_candidatos(db: Session, data_referencia: date, apos_id: int, tamanho: int):
+    """Próximo lote de consultas a lembrar (por id), já com os dados do paciente e do médico."""
+    return db.query(
+        ConsultaModel.id,
+        ConsultaModel.data_consulta,
+        ConsultaModel.hora_consulta,
+        PacienteModel.nome.label("paciente_nome"),
+        PacienteModel.email.label("paciente_email"),
+        UsuarioModel.nome.label("medico_nome"),
+        MedicoModel.especialidade.label("medico_especialidade")
+    ).join(PacienteModel, ConsultaModel.paciente_id == PacienteModel.id).\
+        join(MedicoModel, ConsultaModel.medico_id == MedicoModel.id).\
+        join(UsuarioModel, MedicoModel.usuario_id == UsuarioModel.id).\
+        filter(*filtro_candidatos(data_referencia), ConsultaModel.id > apos_id).\
+        order_by(ConsultaModel.id).limit(tamanho).all()
+
+def buscar_job_em_andamento(db: Session, data_referencia: date):
+    return db.query(JobLembretes).filter(
+        JobLembretes.data_referencia == data_referencia,
+        JobLembretes.status == StatusJob.EM_ANDAMENTO
+    ).first()
+
+def criar_job_lembretes(db: Session, data_referencia: date) -> JobLembretes:
+    """Cria o job da data, ou devolve o que já está em andamento para ela."""
+    job = buscar_job_em_andamento(db, data_referencia)
+    if job:
+        return job
+
+    total = db.query(func.count(ConsultaModel.id)).filter(*filtro_candidatos(data_referencia)).scalar()
+    job = JobLembretes(data_referencia=data_referencia, total=total)
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Outra requisição criou o job da data entre a busca e o insert
+        # (uq_jobs_lembretes_data_em_andamento)
+        db.rollback()
+        return buscar_job_em_andamento(db, data_referencia)
+    db.refresh(job)
+    return job
+
+def progresso_job_lembretes(job: JobLembretes):
+    return {
+        "job_id": job.id,
+        "data_referencia": job.data_referencia.strftime("%Y-%m-%d"),
+        "status": job.status.value,
+        "total_consultas": job.total,
+        "lembretes_enviados": job.enviados,
+        "erros": job.erros,
+        "ultimo_erro": job.ultimo_erro
+    }
+
+class DespachanteLembretes:
+    """
+    Envia os lembretes de um job em lotes, por um pool limitado de conexões SMTP.
+    Cada lote é confirmado junto com o progresso do job, então uma queda reenvia
+    no máximo o lote em curso. Um envio que falha é repetido até
+    LEMBRETES_MAX_TENTATIVAS vezes antes de contar como erro do job.
+    """
+
+    def __init__(self, conexoes: int = None, tamanho_lote: int = None):
+        self.conexoes = conexoes or settings.LEMBRETES_CONEXOES_SMTP
+        self.tamanho_lote = tamanho_lote or settings.LEMBRETES_TAMANHO_LOTE
+        self._local = threading.local()
+        self._abertas = []
+        self._lock = threading.Lock()
+
+    def _conexao(self) -> ConexaoSMTP:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = ConexaoSMTP()
+            self._local.conexao = conexao
+            with self._lock:
+                self._abertas.append(conexao)
+        return conexao
+
+    def _enviar(self, candidato):
+        """Envia um lembrete, com novas tentativas (e backoff exponencial) em caso de falha."""
+        assunto, corpo = montar_email_lembrete(
+            candidato.paciente_nome,
+            candidato.medico_nome,
+            candidato.medico_especialidade,
+            candidato.data_consulta,
+            candidato.hora_consulta
+        )
+        for tentativa in range(1, settings.LEMBRETES_MAX_TENTATIVAS + 1):
+            try:
+                # Após uma falha a ConexaoSMTP já foi descartada; a nova tentativa reconecta
+                self._conexao().enviar(candidato.paciente_email, assunto, corpo)
+                return candidato.id, None
+            except Exception as e:
+                erro = f"consulta {candidato.id}: {e}"
+                if tentativa < settings.LEMBRETES_MAX_TENTATIVAS:
+                    time.sleep(settings.LEMBRETES_BACKOFF_SEGUNDOS * (2 ** (tentativa - 1)))
+        return candidato.id, erro
+
+    def _processar_lote(self, job_id: int, pool: ThreadPoolExecutor) -> bool:
+        """Processa um lote; retorna False quando não há mais nada a fazer."""
+        with SessionLocal() as db:
+            # Travar o job impede que outro processo envie o mesmo lote
+            job = db.query(JobLembretes).filter(JobLembretes.id == job_id).\
+                with_for_update(skip_locked=True).first()
+            if job is None or job.status != StatusJob.EM_ANDAMENTO:
+                return False
+
+            candidatos = buscar_lote_candidatos(db, job.data_referencia, job.ultimo_consulta_id, self.tamanho_lote)
+            if not candidatos:
+                job.status = StatusJob.CONCLUIDO
+                job.data_conclusao = func.now()
+                db.commit()
+                return False
+
+            enviados = []
+            for consulta_id, erro in pool.map(self._enviar, candidatos):
+                if erro is None:
+                    enviados.append(consulta_id)
+                else:
+                    job.erros += 1
+                    job.ultimo_erro = erro
+
+            if enviados:
+                db.query(ConsultaModel).filter(ConsultaModel.id.in_(enviados)).\
+                    update({ConsultaModel.lembrete_enviado: True}, synchronize_session=False)
+            job.enviados += len(enviados)
+            job.ultimo_consulta_id = candidatos[-1].id
+            db.commit()
+            return True
+
+    def executar(self, job_id: int):
+        try:
+            with ThreadPoolExecutor(max_workers=self.conexoes, thread_name_prefix="lembretes") as pool:
+                while self._processar_lote(job_id, pool):
+                    pass
+        except Exception as e:
+            logger.exception("Erro no envio de lembretes (job %s)", job_id)
+            with SessionLocal() as db:
+                db.query(JobLembretes).filter(JobLembretes.id == job_id).\
+                    update({JobLembretes.status: StatusJob.FALHOU, JobLembretes.ultimo_erro: str(e)})
+                db.commit()
+        finally:
+            with self._lock:
+                for conexao in self._abertas:
+                    conexao.fechar()
+                self._abertas.clear()
+
+def iniciar_job_lembretes(job_id: int):
+    """Inicia o envio do job em segundo plano; se ele já está em execução, devolve a thread atual."""
+    with _execucoes_lock:
+        thread = _execucoes.get(job_id)
+        if thread is not None and thread.is_alive():
+            return thread
+        thread = threading.Thread(
+            target=_executar_job, args=(job_id,), name=f"lembretes-{job_id}", daemon=True
+        )
+        _execucoes[job_id] = thread
+        thread.start()
+        return thread
+
+def _executar_job(job_id: int):
+    try:
+        DespachanteLembretes().executar(job_id)
+    finally:
+        with _execucoes_lock:
+            if _execucoes.get(job_id) is threading.current_thread():
+                del _execucoes[job_id]
+
+def retomar_jobs_lembretes():
+    """Retoma, a partir do último lote confirmado, os jobs interrompidos por um reinício."""
+    with SessionLocal() as db:
+        job_ids = [job_id for job_id, in db.query(JobLembretes.id).filter(JobLembretes.status == StatusJob.EM_ANDAMENTO)]
+    for job_id in job_ids:
+        iniciar_job_lembretes(job_id)
@@ -0,0 +1,254 @@
+# app/services/medico_service.py
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, time
+from functools import lru_cache
+from time import monotonic
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.medico import Medico as MedicoModel
+from ..models.usuario import Usuario as UsuarioModel
+from ..utils.helpers import normalizar_texto
+from ..utils.condicional import colunas_versao, calcular_etag
+
+@dataclass(frozen=True)
+class AgendaMedico:
+    """Agenda de atendimento já interpretada: máscara de dias da semana e horários em minutos do dia."""
+    dias_mascara: int
+    inicio: int
+    fim: int
+    tempo_consulta: int
+
+    def atende_em(self, dia: date) -> bool:
+        # date.weekday() usa 0=Seg; convertemos para 0=Dom
+        return bool(self.dias_mascara >> ((dia.weekday() + 1) % 7) & 1)
+
+    def horario_valido(self, inicio_consulta: int) -> bool:
+        """Se uma consulta iniciando em inicio_consulta (minutos) cabe no horário de atendimento."""
+        return self.inicio <= inicio_consulta and inicio_consulta + self.tempo_consulta <= self.fim
+
+def _minutos(horario: str) -> int:
+    try:
+        horas, minutos = horario.split(":")
+        valor = time(int(horas), int(minutos))
+    except (ValueError, AttributeError):
+        raise ValueError(f"Horário inválido: '{horario}' (use HH:MM)")
+    return valor.hour * 60 + valor.minute
+
+@lru_cache(maxsize=1024)
+def compilar_agenda(dias_atendimento: str, horario_inicio: str, horario_fim: str, tempo_consulta: int) -> AgendaMedico:
+    """
+    Interpreta e valida a configuração de atendimento do médico. Como a agenda é
+    imutável e indexada pelos próprios valores, o resultado fica em cache no processo
+    e só é recalculado quando o médico altera a configuração.
+    """
+    mascara = 0
+    try:
+        dias = [int(d) for d in dias_atendimento.split(",") if d.strip()]
+    except (ValueError, AttributeError):
+        raise ValueError(f"Dias de atendimento inválidos: '{dias_atendimento}' (use 0=Dom ... 6=Sáb, separados por vírgula)")
+    if not dias:
+        raise ValueError("Informe ao menos um dia de atendimento")
+    for dia in dias:
+        if not 0 <= dia <= 6:
+            raise ValueError(f"Dia de atendimento inválido: {dia} (use 0=Dom ... 6=Sáb)")
+        mascara |= 1 << dia
+
+    inicio = _minutos(horario_inicio)
+    fim = _minutos(horario_fim)
+    if fim <= inicio:
+        raise ValueError("O horário de fim do atendimento deve ser posterior ao de início")
+    if tempo_consulta is None or tempo_consulta <= 0:
+        raise ValueError("O tempo de consulta deve ser maior que zero")
+    if tempo_consulta > fim - inicio:
+        raise ValueError("O tempo de consulta não cabe no horário de atendimento")
+
+    return AgendaMedico(mascara, inicio, fim, tempo_consulta)
+
+def agenda_do_medico(medico) -> AgendaMedico:
+    return compilar_agenda(
+        medico.dias_atendimento,
+        medico.horario_inicio_atendimento,
+        medico.horario_fim_atendimento,
+        medico.tempo_consulta
+    )
+
+# Colunas do MedicoCompleto, lidas numa única consulta (sem carregar os objetos ORM)
+COLUNAS_MEDICO_COMPLETO = (
+    MedicoModel.id,
+    MedicoModel.usuario_id,
+    MedicoModel.crm,
+    MedicoModel.especialidade,
+    MedicoModel.telefone,
+    MedicoModel.data_nascimento,
+    MedicoModel.cpf,
+    MedicoModel.horario_inicio_atendimento,
+    MedicoModel.horario_fim_atendimento,
+    MedicoModel.dias_atendimento,
+    MedicoModel.tempo_consulta,
+    MedicoModel.data_criacao,
+    MedicoModel.data_atualizacao,
+    UsuarioModel.nome,
+    UsuarioModel.email,
+    UsuarioModel.foto_perfil,
+    UsuarioModel.ativo
+)
+
+COLUNAS_VERSAO_MEDICO = tuple(
+    versao.label(f"versao_{tabela}")
+    for tabela, versao in zip(("medico", "usuario"), colunas_versao(MedicoModel, UsuarioModel))
+)
+
+def query_medicos_versionados(db: Session):
+    """Colunas do MedicoCompleto com as versões do médico e do usuário, para o ETag."""
+    return db.query(*COLUNAS_MEDICO_COMPLETO, *COLUNAS_VERSAO_MEDICO).\
+        join(UsuarioModel, MedicoModel.usuario_id == UsuarioModel.id)
+
+def query_versoes_medicos(db: Session):
+    """Só o id e as versões das linhas de query_medicos_versionados (verificação do 304)."""
+    return db.query(MedicoModel.id, *COLUNAS_VERSAO_MEDICO).\
+        join(UsuarioModel, MedicoModel.usuario_id == UsuarioModel.id)
+
+def separar_versoes_medicos(linhas):
+    """Linhas versionadas -> (médicos como dicts, versões de cada um para o ETag)."""
+    medicos, versoes = [], []
+    for linha in linhas:
+        medico = dict(linha._mapping)
+        versoes.append((medico["id"], *(medico.pop(coluna.key) for coluna in COLUNAS_VERSAO_MEDICO)))
+        medicos.append(medico)
+    return medicos, versoes
+
+@dataclass(frozen=True)
+class SnapshotDiretorio:
+    """Diretório imutável dos médicos ativos, com índice ordenado para busca por prefixo."""
+    medicos: tuple
+    chaves: tuple  # (termo normalizado, posição em medicos), em ordem
+    etag: str
+    criado_em: float
+
+    def buscar(self, prefixo: str = None, especialidade: str = None):
+        medicos = self.medicos
+        if prefixo:
+            termo = normalizar_texto(prefixo)
+            posicoes = set()
+            i = bisect_left(self.chaves, (termo, -1))
+            while i < len(self.chaves) and self.chaves[i][0].startswith(termo):
+                posicoes.add(self.chaves[i][1])
+                i += 1
+            medicos = [medico for posicao, medico in enumerate(medicos) if posicao in posicoes]
+        if especialidade:
+            chave = normalizar_texto(especialidade)
+            medicos = [medico for medico in medicos if medico["especialidade_chave"] == chave]
+        return agrupar_por_especialidade(medicos)
+
+def agrupar_por_especialidade(medicos):
+    grupos = {}
+    for medico in medicos:
+        grupo = grupos.get(medico["especialidade_chave"])
+        if grupo is None:
+            grupo = grupos[medico["especialidade_chave"]] = {
+                "especialidade": medico["especialidade"],
+                "total": 0,
+                "medicos": []
+            }
+        grupo["total"] += 1
+        grupo["medicos"].append(medico)
+    return {
+        "total": len(medicos),
+        "especialidades": sorted(grupos.values(), key=lambda grupo: normalizar_texto(grupo["especialidade"]))
+    }
+
+def construir_diretorio(db: Session) -> SnapshotDiretorio:
+    linhas = db.query(
+        MedicoModel.id,
+        UsuarioModel.nome,
+        MedicoModel.crm,
+        MedicoModel.especialidade,
+        MedicoModel.tempo_consulta,
+        MedicoModel.dias_atendimento,
+        MedicoModel.horario_inicio_atendimento,
+        MedicoModel.horario_fim_atendimento,
+        UsuarioModel.foto_perfil
+    ).join(UsuarioModel, MedicoModel.usuario_id == UsuarioModel.id).\
+        filter(UsuarioModel.ativo == True).order_by(UsuarioModel.nome, MedicoModel.id).all()
+    
+    # Grafia exibida de cada especialidade: a mais usada entre as variações
+    # ("Cardiologia", "cardiologia ", "Cardiología" viram um único grupo)
+    grafias = defaultdict(Counter)
+    for linha in linhas:
+        grafias[normalizar_texto(linha.especialidade)][linha.especialidade.strip()] += 1
+    exibicao = {
+        chave: min(contagem.items(), key=lambda item: (-item[1], item[0]))[0]
+        for chave, contagem in grafias.items()
+    }
+    
+    medicos = []
+    chaves = []
+    for posicao, linha in enumerate(linhas):
+        especialidade_chave = normalizar_texto(linha.especialidade)
+        medicos.append({
+            "id": linha.id,
+            "nome": linha.nome,
+            "crm": linha.crm,
+            "especialidade": exibicao[especialidade_chave],
+            "especialidade_chave": especialidade_chave,
+            "tempo_consulta": linha.tempo_consulta,
+            "dias_atendimento": linha.dias_atendimento,
+            "horario_inicio_atendimento": linha.horario_inicio_atendimento,
+            "horario_fim_atendimento": linha.horario_fim_atendimento,
+            "foto_perfil": linha.foto_perfil
+        })
+        # Prefixos aceitos: nome completo, cada palavra do nome, especialidade e CRM
+        nome = normalizar_texto(linha.nome)
+        termos = {nome, especialidade_chave, normalizar_texto(linha.crm), *nome.split()}
+        chaves.extend((termo, posicao) for termo in termos if termo)
+    chaves.sort()
+    
+    return SnapshotDiretorio(
+        medicos=tuple(medicos),
+        chaves=tuple(chaves),
+        # Pelo conteúdo: um snapshot reconstruído sem mudanças mantém o ETag
+        etag=calcular_etag(tuple(medico.values()) for medico in medicos),
+        criado_em=monotonic()
+    )
+
+class DiretorioMedicos:
+    """
+    Mantém o snapshot do diretório em memória. É reconstruído na primeira leitura
+    depois de uma invalidação (ou do TTL); leituras concorrentes esperam uma única
+    reconstrução, e um snapshot montado durante uma invalidação é descartado.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._snapshot = None
+        self._versao = 0
+        self._lock = threading.Lock()
+        self._construcao = threading.Lock()
+
+    def _valido(self, snapshot):
+        return snapshot is not None and monotonic() - snapshot.criado_em < self.ttl
+
+    def obter(self, db: Session) -> SnapshotDiretorio:
+        snapshot = self._snapshot
+        if self._valido(snapshot):
+            return snapshot
+        with self._construcao:
+            snapshot = self._snapshot
+            if self._valido(snapshot):
+                return snapshot
+            versao = self._versao
+            snapshot = construir_diretorio(db)
+            with self._lock:
+                if self._versao == versao:
+                    self._snapshot = snapshot
+            return snapshot
+
+    def invalidar(self):
+        with self._lock:
+            self._versao += 1
+            self._snapshot = None
+
+diretorio_medicos = DiretorioMedicos(settings.DIRETORIO_MEDICOS_TTL_SEGUNDOS)
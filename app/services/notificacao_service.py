@@ -0,0 +1,130 @@
+# app/services/notificacao_service.py
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from ..config import settings
+from ..database import SessionLocal
+from ..models.consulta import Consulta as ConsultaModel
+from ..models.notificacao import NotificacaoEmail, TipoNotificacao, StatusNotificacao
+from .email_service import ConexaoSMTP, montar_email_notificacao
+
+logger = logging.getLogger("app.outbox")
+
+def enfileirar_notificacao_consulta(db: Session, consulta_detalhada: dict, paciente_email: str):
+    """
+    Grava a notificação de agendamento na outbox, sem commit: ela é confirmada na
+    mesma transação da consulta. O envio é feito depois pelo ProcessadorNotificacoes.
+    """
+    if not paciente_email:
+        return None
+
+    # Evitar duplicatas enquanto a notificação anterior ainda não foi enviada
+    pendente = db.query(NotificacaoEmail.id).filter(
+        NotificacaoEmail.consulta_id == consulta_detalhada["id"],
+        NotificacaoEmail.tipo == TipoNotificacao.NOTIFICACAO,
+        NotificacaoEmail.status == StatusNotificacao.PENDENTE
+    ).first()
+    if pendente:
+        return None
+
+    notificacao = criar_notificacao_consulta(consulta_detalhada, paciente_email)
+    db.add(notificacao)
+    return notificacao
+
+def criar_notificacao_consulta(consulta_detalhada: dict, paciente_email: str) -> NotificacaoEmail:
+    assunto, corpo = montar_email_notificacao(
+        consulta_detalhada["paciente_nome"],
+        consulta_detalhada["medico_nome"],
+        consulta_detalhada["medico_especialidade"],
+        consulta_detalhada["data_consulta"],
+        consulta_detalhada["hora_consulta"]
+    )
+    return NotificacaoEmail(
+        consulta_id=consulta_detalhada["id"],
+        tipo=TipoNotificacao.NOTIFICACAO,
+        destinatario=paciente_email,
+        assunto=assunto,
+        corpo=corpo
+    )
+
+def calcular_proxima_tentativa(tentativas: int) -> datetime:
+    # Backoff exponencial: 1x, 2x, 4x, ... o intervalo base
+    espera = settings.OUTBOX_BACKOFF_SEGUNDOS * (2 ** (tentativas - 1))
+    return datetime.now(timezone.utc) + timedelta(seconds=espera)
+
+def processar_lote(db: Session, conexao: ConexaoSMTP) -> int:
+    """
+    Envia um lote de notificações pendentes pela conexão informada e retorna quantas
+    foram processadas. As linhas são travadas com SKIP LOCKED, permitindo vários workers.
+    """
+    pendentes = db.query(NotificacaoEmail).filter(
+        NotificacaoEmail.status == StatusNotificacao.PENDENTE,
+        NotificacaoEmail.proxima_tentativa <= func.now()
+    ).order_by(NotificacaoEmail.proxima_tentativa, NotificacaoEmail.id).\
+        limit(settings.OUTBOX_TAMANHO_LOTE).with_for_update(skip_locked=True).all()
+
+    consultas_notificadas = []
+    for notificacao in pendentes:
+        try:
+            conexao.enviar(notificacao.destinatario, notificacao.assunto, notificacao.corpo)
+            notificacao.status = StatusNotificacao.ENVIADA
+            notificacao.data_envio = func.now()
+            notificacao.ultimo_erro = None
+            if notificacao.tipo == TipoNotificacao.NOTIFICACAO and notificacao.consulta_id:
+                consultas_notificadas.append(notificacao.consulta_id)
+        except Exception as e:
+            notificacao.tentativas += 1
+            notificacao.ultimo_erro = str(e)
+            if notificacao.tentativas >= settings.OUTBOX_MAX_TENTATIVAS:
+                notificacao.status = StatusNotificacao.FALHA
+            else:
+                notificacao.proxima_tentativa = calcular_proxima_tentativa(notificacao.tentativas)
+
+    if consultas_notificadas:
+        db.query(ConsultaModel).filter(ConsultaModel.id.in_(consultas_notificadas)).\
+            update({ConsultaModel.notificacao_enviada: True}, synchronize_session=False)
+
+    db.commit()
+    return len(pendentes)
+
+class ProcessadorNotificacoes:
+    """Worker em segundo plano que esvazia a outbox reaproveitando uma conexão SMTP."""
+
+    def __init__(self, intervalo: float = None):
+        self.intervalo = intervalo or settings.OUTBOX_INTERVALO_SEGUNDOS
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="outbox-email", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: float = 10):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        conexao = ConexaoSMTP()
+        try:
+            while not self._parar.is_set():
+                try:
+                    with SessionLocal() as db:
+                        processadas = processar_lote(db, conexao)
+                except Exception:
+                    logger.exception("Erro ao processar a outbox de e-mails")
+                    processadas = 0
+
+                if processadas < settings.OUTBOX_TAMANHO_LOTE:
+                    # Fila vazia: liberar a conexão SMTP enquanto espera
+                    conexao.fechar()
+                    self._parar.wait(self.intervalo)
+        finally:
+            conexao.fechar()
+
+processador_notificacoes = ProcessadorNotificacoes()
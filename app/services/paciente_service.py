@@ -0,0 +1,105 @@
+# app/services/paciente_service.py
+import re
+from fastapi import HTTPException
+from sqlalchemy import or_, and_, literal, update
+from sqlalchemy.orm import Session
+from ..models.paciente import Paciente as PacienteModel
+from ..utils.helpers import normalizar_texto, apenas_digitos
+from ..utils.condicional import colunas_versao
+
+# CPF ou telefone, com ou sem pontuação: "123.456", "(11) 9876-5"
+_NUMERICO = re.compile(r"[\d\s().+/-]*\d[\d\s().+/-]*")
+
+MIN_DIGITOS_BUSCA = 4
+
+# Chave de ordenação da listagem de pacientes (a última coluna é única)
+ORDENACAO_PACIENTES = (PacienteModel.nome, PacienteModel.id)
+COLUNA_VERSAO_PACIENTE = colunas_versao(PacienteModel)[0].label("versao_paciente")
+COLUNAS_VERSAO_PACIENTE = (PacienteModel.id, COLUNA_VERSAO_PACIENTE)
+
+def separar_versoes_pacientes(linhas):
+    """Linhas (Paciente, versão) -> (pacientes, versões de cada um para o ETag)."""
+    pacientes, versoes = [], []
+    for paciente, versao in linhas:
+        pacientes.append(paciente)
+        versoes.append((paciente.id, versao))
+    return pacientes, versoes
+
+def filtrar_pacientes(query, nome=None, cpf=None, email=None, telefone=None):
+    """Filtros da busca de pacientes; aceita Query (síncrona) ou select() (assíncrona)."""
+    if nome:
+        # Sem acentos e sem diferenciar maiúsculas; atendido pelo índice de trigramas
+        query = query.filter(PacienteModel.nome_busca.contains(normalizar_texto(nome), autoescape=True))
+    if cpf:
+        query = query.filter(PacienteModel.cpf.ilike(f"%{cpf}%"))
+    if email:
+        query = query.filter(PacienteModel.email.ilike(f"%{email}%"))
+    if telefone:
+        query = query.filter(PacienteModel.telefone.ilike(f"%{telefone}%"))
+    return query
+
+def aplicar_busca(query, busca: str, trigramas: bool = True):
+    """
+    Busca livre em um único campo, ordenada por relevância:
+    - só dígitos: prefixo do CPF ou do telefone (índices text_pattern_ops);
+    - texto: nome sem acentos, por substring ou similaridade de trigramas (pg_trgm),
+      do mais para o menos parecido com o termo.
+    Sem o pg_trgm (trigramas=False, ex.: SQLite), o texto é buscado só por substring.
+    """
+    if _NUMERICO.fullmatch(busca):
+        digitos = apenas_digitos(busca)
+        if len(digitos) < MIN_DIGITOS_BUSCA:
+            # Prefixos muito curtos (ex.: o DDD) casam com quase toda a tabela
+            raise HTTPException(
+                status_code=400,
+                detail=f"Informe ao menos {MIN_DIGITOS_BUSCA} dígitos para buscar por CPF ou telefone"
+            )
+        return query.filter(or_(
+            PacienteModel.cpf.startswith(digitos),
+            PacienteModel.telefone_digitos.startswith(digitos)
+        )).order_by(
+            # Correspondência no CPF primeiro
+            PacienteModel.cpf.startswith(digitos).desc(), PacienteModel.nome, PacienteModel.id
+        )
+    
+    termo = normalizar_texto(busca)
+    if not trigramas:
+        return query.filter(PacienteModel.nome_busca.contains(termo, autoescape=True)).\
+            order_by(PacienteModel.nome, PacienteModel.id)
+    return query.filter(or_(
+        PacienteModel.nome_busca.contains(termo, autoescape=True),
+        # termo <% nome_busca: o termo é parecido com alguma parte do nome
+        literal(termo).op("<%")(PacienteModel.nome_busca)
+    )).order_by(
+        # Distância de palavra (1 - word_similarity); com o índice GiST, o banco
+        # percorre os candidatos já em ordem e para ao atingir o limit
+        literal(termo).op("<<->")(PacienteModel.nome_busca), PacienteModel.id
+    )
+
+def preencher_colunas_busca(db: Session, tamanho_lote: int = 1000) -> int:
+    """
+    Preenche nome_busca e telefone_digitos dos pacientes gravados antes dessas colunas
+    existirem (ou inseridos sem passar pelo modelo). A normalização é a mesma dos
+    validadores do modelo, feita em Python; cada lote é confirmado separadamente, então
+    o comando pode ser interrompido e executado de novo. Retorna quantos foram atualizados.
+    """
+    pendentes = or_(
+        and_(PacienteModel.nome_busca.is_(None), PacienteModel.nome.isnot(None)),
+        and_(PacienteModel.telefone_digitos.is_(None), PacienteModel.telefone.isnot(None))
+    )
+    atualizados = 0
+    ultimo_id = 0
+    while True:
+        linhas = db.query(PacienteModel.id, PacienteModel.nome, PacienteModel.telefone).\
+            filter(pendentes, PacienteModel.id > ultimo_id).\
+            order_by(PacienteModel.id).limit(tamanho_lote).all()
+        if not linhas:
+            return atualizados
+        # UPDATE em lote pela chave primária (executemany)
+        db.execute(update(PacienteModel), [
+            {"id": linha.id, "nome_busca": normalizar_texto(linha.nome), "telefone_digitos": apenas_digitos(linha.telefone)}
+            for linha in linhas
+        ])
+        db.commit()
+        atualizados += len(linhas)
+        ultimo_id = linhas[-1].id
@@ -0,0 +1,106 @@
+# app/services/prontuario_service.py
+from sqlalchemy import select, union_all, literal, null, cast, type_coerce, tuple_, column, String, Integer, Text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.sqltypes import TIMESTAMP
+from ..models.consulta import Consulta as ConsultaModel, StatusConsulta as StatusConsultaModel
+from ..models.prontuario import Prontuario as ProntuarioModel
+from ..models.medico import Medico as MedicoModel
+from ..models.usuario import Usuario as UsuarioModel
+from ..utils.helpers import decodificar_cursor
+
+# Chave de ordenação da linha do tempo (mais recentes primeiro); usada também no cursor
+COLUNAS_TIMELINE = (
+    column("momento", TIMESTAMP(timezone=True)),
+    column("tipo", String),
+    column("id", Integer),
+)
+
+def _depois_do_cursor(colunas_momento, valores_momento, tipo: str, id_coluna, cursor_tipo: str, cursor_id: int):
+    """
+    Filtro de um ramo da UNION equivalente a (momento, tipo, id) < cursor. Como o
+    tipo é constante em cada ramo, a comparação se reduz a momento/id, escrita sobre
+    as próprias colunas do índice do paciente (e não sobre uma expressão calculada),
+    para que o banco possa posicionar a leitura no índice.
+    """
+    momento, cursor_momento = tuple_(*colunas_momento), tuple_(*valores_momento)
+    if tipo < cursor_tipo:
+        return momento <= cursor_momento
+    if tipo > cursor_tipo:
+        return momento < cursor_momento
+    return tuple_(*colunas_momento, id_coluna) < tuple_(*valores_momento, cursor_id)
+
+def _momento_consulta(dialeto: str):
+    """Data e hora da consulta como um único timestamp, para ordenar a UNION."""
+    if dialeto == "sqlite":
+        # O SQLite guarda datas e horas como texto ISO: "AAAA-MM-DD" || " " || "HH:MM:SS"
+        texto = cast(ConsultaModel.data_consulta, String) + " " + cast(ConsultaModel.hora_consulta, String)
+        return type_coerce(texto, TIMESTAMP(timezone=True))
+    return cast(ConsultaModel.data_consulta + ConsultaModel.hora_consulta, TIMESTAMP(timezone=True))
+
+def timeline_paciente(db: Session, paciente_id: int, limit: int, cursor: str = None):
+    """
+    Consultas e prontuários do paciente em uma única instrução (UNION ALL), do mais
+    recente para o mais antigo. Cada ramo já é filtrado, ordenado e limitado pelo
+    índice do paciente, então uma página custa O(limit) mesmo com muitas visitas.
+    """
+    cursor_valores = decodificar_cursor(cursor, COLUNAS_TIMELINE) if cursor else None
+    
+    momento_consulta = _momento_consulta(db.get_bind().dialect.name)
+    consultas = select(
+        literal("consulta", String).label("tipo"),
+        ConsultaModel.id.label("id"),
+        momento_consulta.label("momento"),
+        ConsultaModel.id.label("consulta_id"),
+        ConsultaModel.medico_id.label("medico_id"),
+        UsuarioModel.nome.label("medico_nome"),
+        cast(ConsultaModel.status, String).label("status"),
+        ConsultaModel.problema_saude.label("problema_saude"),
+        cast(null(), Text).label("diagnostico"),
+        cast(null(), Text).label("tratamento"),
+        ConsultaModel.observacoes.label("observacoes"),
+    ).join(MedicoModel, ConsultaModel.medico_id == MedicoModel.id).\
+        join(UsuarioModel, MedicoModel.usuario_id == UsuarioModel.id).\
+        where(ConsultaModel.paciente_id == paciente_id)
+    if cursor_valores:
+        cursor_momento, cursor_tipo, cursor_id = cursor_valores
+        consultas = consultas.where(_depois_do_cursor(
+            (ConsultaModel.data_consulta, ConsultaModel.hora_consulta), (cursor_momento.date(), cursor_momento.time()),
+            "consulta", ConsultaModel.id, cursor_tipo, cursor_id
+        ))
+    consultas = consultas.order_by(
+        ConsultaModel.data_consulta.desc(), ConsultaModel.hora_consulta.desc(), ConsultaModel.id.desc()
+    ).limit(limit)
+    
+    prontuarios = select(
+        literal("prontuario", String).label("tipo"),
+        ProntuarioModel.id.label("id"),
+        ProntuarioModel.data_criacao.label("momento"),
+        ProntuarioModel.consulta_id.label("consulta_id"),
+        ProntuarioModel.medico_id.label("medico_id"),
+        UsuarioModel.nome.label("medico_nome"),
+        cast(null(), String).label("status"),
+        cast(null(), Text).label("problema_saude"),
+        ProntuarioModel.diagnostico.label("diagnostico"),
+        ProntuarioModel.tratamento.label("tratamento"),
+        ProntuarioModel.observacoes.label("observacoes"),
+    ).join(MedicoModel, ProntuarioModel.medico_id == MedicoModel.id).\
+        join(UsuarioModel, MedicoModel.usuario_id == UsuarioModel.id).\
+        where(ProntuarioModel.paciente_id == paciente_id)
+    if cursor_valores:
+        prontuarios = prontuarios.where(_depois_do_cursor(
+            (ProntuarioModel.data_criacao,), (cursor_momento,), "prontuario", ProntuarioModel.id, cursor_tipo, cursor_id
+        ))
+    prontuarios = prontuarios.order_by(ProntuarioModel.data_criacao.desc(), ProntuarioModel.id.desc()).limit(limit)
+    
+    eventos = union_all(consultas.subquery().select(), prontuarios.subquery().select()).subquery()
+    linhas = db.execute(
+        select(eventos).order_by(eventos.c.momento.desc(), eventos.c.tipo.desc(), eventos.c.id.desc()).limit(limit)
+    ).all()
+    
+    itens = []
+    for linha in linhas:
+        item = dict(linha._mapping)
+        if item["status"] is not None:
+            item["status"] = StatusConsultaModel[item["status"]].value
+        itens.append(item)
+    return itens
@@ -0,0 +1,251 @@
+# app/utils/cache.py
+import json
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """Cache LRU em memória, thread-safe, com TTL opcional e contadores de uso."""
+
+    def __init__(self, tamanho_maximo: int = 1024, ttl: float = None):
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, chave):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                self.misses += 1
+                return None
+            valor, expira_em = item
+            if expira_em is not None and expira_em < time.monotonic():
+                del self._dados[chave]
+                self.misses += 1
+                return None
+            self._dados.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def set(self, chave, valor):
+        expira_em = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._dados[chave] = (valor, expira_em)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho_maximo:
+                self._dados.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, chave):
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def delete_where(self, condicao):
+        """Remove todas as chaves para as quais condicao(chave) é verdadeira."""
+        with self._lock:
+            for chave in [c for c in self._dados if condicao(c)]:
+                del self._dados[chave]
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "backend": "memoria",
+                "itens": len(self._dados),
+                "tamanho_maximo": self.tamanho_maximo,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+class CacheDisponibilidade:
+    """Horários livres já calculados, indexados por (medico_id, data)."""
+
+    def __init__(self, tamanho_maximo: int = 4096, ttl: float = None):
+        self._cache = LRUCache(tamanho_maximo, ttl)
+
+    def obter(self, medico_id: int, dia):
+        return self._cache.get((medico_id, dia))
+
+    def guardar(self, medico_id: int, dia, horarios):
+        self._cache.set((medico_id, dia), tuple(horarios))
+
+    def invalidar(self, medico_id: int, dia):
+        self._cache.delete((medico_id, dia))
+
+    def invalidar_medico(self, medico_id: int):
+        self._cache.delete_where(lambda chave: chave[0] == medico_id)
+
+    def limpar(self):
+        self._cache.clear()
+
+    def estatisticas(self):
+        return self._cache.estatisticas()
+
+class CacheDisponibilidadeRedis:
+    """
+    Mesma interface de CacheDisponibilidade, compartilhada entre processos via Redis.
+    Cada médico ocupa um hash (dia -> horários), então invalidar um médico é um único DEL.
+    """
+
+    def __init__(self, url: str, ttl: float = None, prefixo: str = "disponibilidade"):
+        import redis  # dependência opcional, só necessária neste modo
+
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = int(ttl) if ttl else None
+        self.prefixo = prefixo
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _chave(self, medico_id: int):
+        return f"{self.prefixo}:{medico_id}"
+
+    def obter(self, medico_id: int, dia):
+        valor = self._redis.hget(self._chave(medico_id), dia.isoformat())
+        with self._lock:
+            if valor is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return tuple(json.loads(valor))
+
+    def guardar(self, medico_id: int, dia, horarios):
+        pipe = self._redis.pipeline()
+        pipe.hset(self._chave(medico_id), dia.isoformat(), json.dumps(list(horarios)))
+        if self.ttl:
+            pipe.expire(self._chave(medico_id), self.ttl)
+        pipe.execute()
+
+    def invalidar(self, medico_id: int, dia):
+        self._redis.hdel(self._chave(medico_id), dia.isoformat())
+
+    def invalidar_medico(self, medico_id: int):
+        self._redis.delete(self._chave(medico_id))
+
+    def limpar(self):
+        for chave in self._redis.scan_iter(f"{self.prefixo}:*"):
+            self._redis.delete(chave)
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "backend": "redis",
+                "hits": self.hits,
+                "misses": self.misses,
+                # As remoções por memória são feitas pelo próprio Redis (maxmemory-policy)
+                "evictions": None
+            }
+
+class CachePrincipais:
+    """
+    Usuários autenticados já resolvidos, indexados pelo subject do token. Uma busca no
+    banco iniciada antes de uma invalidação não volta a guardar o valor antigo: quem
+    busca lê geracao() antes da consulta, e guardar() descarta o resultado se a chave
+    foi invalidada depois disso.
+    """
+
+    # Por quanto tempo uma invalidação é lembrada; muito mais que a duração de uma busca
+    PRAZO_INVALIDACAO_SEGUNDOS = 60
+
+    def __init__(self, tamanho_maximo: int = 1024, ttl: float = None):
+        self._cache = LRUCache(tamanho_maximo, ttl)
+        self._invalidacoes = LRUCache(tamanho_maximo, ttl=self.PRAZO_INVALIDACAO_SEGUNDOS)
+        self._geracao = 0
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        return self._cache.get(chave)
+
+    def geracao(self, chave) -> int:
+        with self._lock:
+            return self._geracao
+
+    def guardar(self, chave, valor, geracao: int) -> bool:
+        with self._lock:
+            invalidada_em = self._invalidacoes.get(chave)
+            if invalidada_em is not None and invalidada_em > geracao:
+                return False
+            self._cache.set(chave, valor)
+            return True
+
+    def invalidar(self, chave):
+        with self._lock:
+            self._geracao += 1
+            self._invalidacoes.set(chave, self._geracao)
+            self._cache.delete(chave)
+
+    def limpar(self):
+        with self._lock:
+            self._cache.clear()
+            self._invalidacoes.clear()
+
+    def estatisticas(self):
+        return self._cache.estatisticas()
+
+class CachePrincipaisRedis:
+    """
+    Mesma interface de CachePrincipais, compartilhada entre processos via Redis, então
+    uma invalidação feita por qualquer processo vale para todos. Cada chave tem um
+    contador de geração: o valor é guardado com a geração lida antes da busca no banco
+    e só é aceito na leitura (um único MGET) se ela ainda for a atual.
+    """
+
+    def __init__(self, url: str, ttl: float = None, codificar=None, decodificar=None, prefixo: str = "principais"):
+        import redis  # dependência opcional, só necessária neste modo
+
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = int(ttl) if ttl else None
+        self.codificar = codificar or (lambda valor: valor)
+        self.decodificar = decodificar or (lambda valor: valor)
+        self.prefixo = prefixo
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _chave(self, chave):
+        return f"{self.prefixo}:valor:{chave}"
+
+    def _chave_geracao(self, chave):
+        return f"{self.prefixo}:geracao:{chave}"
+
+    def obter(self, chave):
+        valor, geracao = self._redis.mget(self._chave(chave), self._chave_geracao(chave))
+        item = json.loads(valor) if valor is not None else None
+        with self._lock:
+            if item is None or item["geracao"] != int(geracao or 0):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self.decodificar(item["valor"])
+
+    def geracao(self, chave) -> int:
+        return int(self._redis.get(self._chave_geracao(chave)) or 0)
+
+    def guardar(self, chave, valor, geracao: int) -> bool:
+        # Se a chave foi invalidada entre geracao() e aqui, o valor nunca será aceito
+        self._redis.set(self._chave(chave), json.dumps({"geracao": geracao, "valor": self.codificar(valor)}), ex=self.ttl)
+        return True
+
+    def invalidar(self, chave):
+        pipe = self._redis.pipeline()
+        pipe.incr(self._chave_geracao(chave))
+        # O contador precisa sobreviver aos valores guardados com a geração anterior
+        pipe.expire(self._chave_geracao(chave), 2 * max(self.ttl or 0, CachePrincipais.PRAZO_INVALIDACAO_SEGUNDOS))
+        pipe.delete(self._chave(chave))
+        pipe.execute()
+
+    def limpar(self):
+        for chave in self._redis.scan_iter(f"{self.prefixo}:*"):
+            self._redis.delete(chave)
+
+    def estatisticas(self):
+        with self._lock:
+            return {"backend": "redis", "hits": self.hits, "misses": self.misses, "evictions": None}
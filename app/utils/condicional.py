@@ -0,0 +1,80 @@
+# app/utils/condicional.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response, status
+from sqlalchemy import func
+
+def colunas_versao(*modelos):
+    """
+    Versão de cada linha nos modelos informados: data_atualizacao, ou data_criacao
+    para linhas nunca alteradas. Junto com o id, identifica a representação servida.
+    """
+    return tuple(func.coalesce(modelo.data_atualizacao, modelo.data_criacao) for modelo in modelos)
+
+def _valor(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+def calcular_etag(versoes) -> str:
+    """ETag forte a partir das linhas de versão (id e datas), na ordem em que serão servidas."""
+    resumo = hashlib.blake2b(digest_size=16)
+    for linha in versoes:
+        resumo.update(repr(tuple(_valor(valor) for valor in linha)).encode())
+    return f'"{resumo.hexdigest()}"'
+
+def ultima_modificacao(versoes):
+    datas = [valor for linha in versoes for valor in linha if isinstance(valor, datetime)]
+    if not datas:
+        return None
+    # O SQLite devolve as datas sem fuso; elas são gravadas em UTC
+    return max(data if data.tzinfo else data.replace(tzinfo=timezone.utc) for data in datas)
+
+def _sem_prefixo_fraco(etag: str) -> str:
+    return etag.strip().removeprefix("W/")
+
+def etag_confere(request: Request, etag: str) -> bool:
+    """Se o If-None-Match do cliente inclui o ETag (comparação fraca, como pede a RFC 9110)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _sem_prefixo_fraco(etag) in [_sem_prefixo_fraco(valor) for valor in if_none_match.split(",")]
+
+def nao_modificado_desde(request: Request, modificacao: datetime) -> bool:
+    """Se a representação não mudou desde o If-Modified-Since do cliente (resolução de segundos)."""
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or modificacao is None:
+        return False
+    try:
+        desde = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False  # data inválida: o cabeçalho é ignorado
+    if desde.tzinfo is None:
+        desde = desde.replace(tzinfo=timezone.utc)
+    return modificacao.replace(microsecond=0) <= desde
+
+def verificar_condicional(request: Request, response: Response, versoes, lista: bool = False):
+    """
+    Define ETag (e Last-Modified, para uma entidade) a partir das linhas de versão e,
+    se o cliente já tem essa representação, devolve a resposta 304 que a rota deve
+    retornar no lugar do conteúdo. If-None-Match tem precedência; sem ele, vale o
+    If-Modified-Since (RFC 9110, 13.2.2).
+
+    Listas (lista=True) usam só o ETag: a data mais recente da página não muda quando
+    uma linha sai dela (exclusão, mudança de status fora do filtro), e um 304 pela
+    data serviria a página antiga.
+    """
+    cabecalhos = {"ETag": calcular_etag(versoes), "Cache-Control": "private, no-cache"}
+    modificacao = None if lista else ultima_modificacao(versoes)
+    if modificacao is not None:
+        cabecalhos["Last-Modified"] = format_datetime(modificacao.astimezone(timezone.utc), usegmt=True)
+
+    if "if-none-match" in request.headers:
+        atual = etag_confere(request, cabecalhos["ETag"])
+    else:
+        atual = nao_modificado_desde(request, modificacao)
+    if atual:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    response.headers.update(cabecalhos)
+    return None
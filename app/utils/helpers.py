@@ -0,0 +1,69 @@
+# app/utils/helpers.py
+import base64
+import json
+import re
+import unicodedata
+from datetime import date, time, datetime
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+def codificar_cursor(valores):
+    """Gera um cursor opaco a partir dos valores da chave de ordenação da última linha."""
+    bruto = json.dumps([v.isoformat() if isinstance(v, (date, time, datetime)) else v for v in valores])
+    return base64.urlsafe_b64encode(bruto.encode()).decode()
+
+def decodificar_cursor(cursor: str, colunas):
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if len(valores) != len(colunas):
+            raise ValueError("tamanho do cursor inválido")
+        convertidos = []
+        for coluna, valor in zip(colunas, valores):
+            tipo = coluna.type.python_type
+            if tipo in (date, time, datetime):
+                valor = tipo.fromisoformat(valor)
+            elif valor is not None:
+                valor = tipo(valor)
+            convertidos.append(valor)
+        return convertidos
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+def aplicar_paginacao(query, colunas, skip: int, limit: int, cursor: str = None):
+    """
+    Ordena a query (ou select) por uma chave estável (a última coluna deve ser única,
+    ex.: id). Com cursor, busca as linhas após a chave codificada (keyset); sem cursor,
+    mantém o comportamento antigo de skip/limit.
+    """
+    query = query.order_by(*colunas)
+    if cursor:
+        query = query.filter(tuple_(*colunas) > tuple_(*decodificar_cursor(cursor, colunas)))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+def paginar(query, colunas, skip: int, limit: int, cursor: str = None):
+    return aplicar_paginacao(query, colunas, skip, limit, cursor).all()
+
+def proximo_cursor(linhas, colunas, limit: int):
+    """Cursor para a próxima página, ou None se esta for a última."""
+    if not linhas or len(linhas) < limit:
+        return None
+    ultima = linhas[-1]
+    if isinstance(ultima, dict):
+        return codificar_cursor([ultima[coluna.key] for coluna in colunas])
+    return codificar_cursor([getattr(ultima, coluna.key) for coluna in colunas])
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sem acentos e com espaços simples: 'João  da Silva' -> 'joao da silva'."""
+    if texto is None:
+        return None
+    sem_acentos = "".join(
+        c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c)
+    )
+    return " ".join(sem_acentos.lower().split())
+
+def apenas_digitos(texto: str) -> str:
+    if texto is None:
+        return None
+    return re.sub(r"\D", "", texto)
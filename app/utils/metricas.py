@@ -0,0 +1,241 @@
+# app/utils/metricas.py
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from ..config import settings
+
+logger = logging.getLogger("app.sql")
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def rotulos_prometheus(**rotulos) -> str:
+    if not rotulos:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos.items()) + "}"
+
+def linhas_histograma(nome: str, limites, contagens, soma: float, total: int, **rotulos):
+    """Histograma no formato do Prometheus a partir de contagens por faixa (não acumuladas)."""
+    acumulado = 0
+    for limite, contagem in zip(limites, contagens):
+        acumulado += contagem
+        yield f"{nome}_bucket{rotulos_prometheus(**rotulos, le=limite)} {acumulado}"
+    yield f"{nome}_bucket{rotulos_prometheus(**rotulos, le='+Inf')} {total}"
+    yield f"{nome}_sum{rotulos_prometheus(**rotulos)} {soma}"
+    yield f"{nome}_count{rotulos_prometheus(**rotulos)} {total}"
+
+class Histograma:
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        indice = next((i for i, limite in enumerate(self.limites) if valor <= limite), len(self.limites))
+        self.contagens[indice] += 1
+        self.soma += valor
+        self.total += 1
+
+    def linhas_prometheus(self, nome: str, **rotulos):
+        return linhas_histograma(nome, self.limites, self.contagens, self.soma, self.total, **rotulos)
+
+# ---------------------------------------------------------------------------
+# Contexto da requisição: acumulado pelos eventos do engine (app/database.py)
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ContextoRequisicao:
+    metodo: str
+    caminho: str
+    instrucoes: int = 0
+    tempo_sql: float = 0.0
+    linhas: int = 0
+    formatos: Counter = field(default_factory=Counter)
+    alertas_n_mais_um: int = 0
+
+_contexto_requisicao: ContextVar = ContextVar("contexto_requisicao", default=None)
+
+# Listas expandidas de parâmetros (IN (...)) e literais não mudam o formato da instrução
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_LISTAS_PARAMETROS = re.compile(r"\(\s*(?:(?:%\(\w+\)s|\?|\$\d+|:\w+)\s*,\s*)*(?:%\(\w+\)s|\?|\$\d+|:\w+)\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+def formato_instrucao(sql: str) -> str:
+    sql = _LITERAIS.sub("?", sql)
+    sql = _LISTAS_PARAMETROS.sub("(?)", sql)
+    return _ESPACOS.sub(" ", sql).strip()
+
+class MetricasRequisicoes:
+    """
+    Latência por rota e o trabalho de banco de cada requisição: número de instruções
+    SQL, tempo gasto nelas e linhas retornadas. Também soma todas as instruções do
+    processo, inclusive as dos workers em segundo plano.
+    """
+
+    LIMITES_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    LIMITES_INSTRUCOES = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._duracao = {}     # (metodo, rota) -> Histograma
+        self._instrucoes = {}  # (metodo, rota) -> Histograma de instruções por requisição
+        self._tempo_sql = Counter()
+        self._linhas = Counter()
+        self._respostas = Counter()  # (metodo, rota, status)
+        self._alertas_n_mais_um = Counter()
+        self.instrucoes_total = 0
+        self.tempo_sql_total = 0.0
+        self.linhas_total = 0
+
+    def registrar_instrucao(self, sql: str, duracao: float, linhas: int):
+        with self._lock:
+            self.instrucoes_total += 1
+            self.tempo_sql_total += duracao
+            self.linhas_total += linhas
+
+        contexto = _contexto_requisicao.get()
+        if contexto is None:
+            return
+        contexto.instrucoes += 1
+        contexto.tempo_sql += duracao
+        contexto.linhas += linhas
+        if settings.SQL_N_MAIS_UM_LIMITE:
+            formato = formato_instrucao(sql)
+            contexto.formatos[formato] += 1
+            if contexto.formatos[formato] == settings.SQL_N_MAIS_UM_LIMITE + 1:
+                contexto.alertas_n_mais_um += 1
+                logger.warning(
+                    "Possível N+1 em %s %s: a mesma instrução foi executada mais de %d vezes: %s",
+                    contexto.metodo, contexto.caminho, settings.SQL_N_MAIS_UM_LIMITE, formato[:500]
+                )
+
+    def registrar_requisicao(self, rota: str, status: int, duracao: float, contexto: ContextoRequisicao):
+        chave = (contexto.metodo, rota)
+        with self._lock:
+            if chave not in self._duracao:
+                self._duracao[chave] = Histograma(self.LIMITES_DURACAO)
+                self._instrucoes[chave] = Histograma(self.LIMITES_INSTRUCOES)
+            self._duracao[chave].observar(duracao)
+            self._instrucoes[chave].observar(contexto.instrucoes)
+            self._tempo_sql[chave] += contexto.tempo_sql
+            self._linhas[chave] += contexto.linhas
+            self._respostas[(contexto.metodo, rota, status)] += 1
+            if contexto.alertas_n_mais_um:
+                self._alertas_n_mais_um[chave] += contexto.alertas_n_mais_um
+
+    def linhas_prometheus(self):
+        with self._lock:
+            linhas = [
+                "# HELP clinica_requisicoes_total Requisições HTTP atendidas.",
+                "# TYPE clinica_requisicoes_total counter",
+            ]
+            for (metodo, rota, status), total in sorted(self._respostas.items()):
+                linhas.append(f"clinica_requisicoes_total{rotulos_prometheus(metodo=metodo, rota=rota, status=status)} {total}")
+
+            linhas += [
+                "# HELP clinica_requisicao_duracao_segundos Latência das requisições HTTP.",
+                "# TYPE clinica_requisicao_duracao_segundos histogram",
+            ]
+            for (metodo, rota), histograma in sorted(self._duracao.items()):
+                linhas.extend(histograma.linhas_prometheus("clinica_requisicao_duracao_segundos", metodo=metodo, rota=rota))
+
+            linhas += [
+                "# HELP clinica_requisicao_sql_instrucoes Instruções SQL executadas por requisição.",
+                "# TYPE clinica_requisicao_sql_instrucoes histogram",
+            ]
+            for (metodo, rota), histograma in sorted(self._instrucoes.items()):
+                linhas.extend(histograma.linhas_prometheus("clinica_requisicao_sql_instrucoes", metodo=metodo, rota=rota))
+
+            linhas += [
+                "# HELP clinica_requisicao_sql_segundos_total Tempo gasto em instruções SQL pelas requisições.",
+                "# TYPE clinica_requisicao_sql_segundos_total counter",
+            ]
+            for (metodo, rota), total in sorted(self._tempo_sql.items()):
+                linhas.append(f"clinica_requisicao_sql_segundos_total{rotulos_prometheus(metodo=metodo, rota=rota)} {total}")
+
+            linhas += [
+                "# HELP clinica_requisicao_sql_linhas_total Linhas retornadas pelo banco às requisições.",
+                "# TYPE clinica_requisicao_sql_linhas_total counter",
+            ]
+            for (metodo, rota), total in sorted(self._linhas.items()):
+                linhas.append(f"clinica_requisicao_sql_linhas_total{rotulos_prometheus(metodo=metodo, rota=rota)} {total}")
+
+            linhas += [
+                "# HELP clinica_n_mais_um_alertas_total Instruções repetidas acima de SQL_N_MAIS_UM_LIMITE em uma requisição.",
+                "# TYPE clinica_n_mais_um_alertas_total counter",
+            ]
+            for (metodo, rota), total in sorted(self._alertas_n_mais_um.items()):
+                linhas.append(f"clinica_n_mais_um_alertas_total{rotulos_prometheus(metodo=metodo, rota=rota)} {total}")
+
+            linhas += [
+                "# HELP clinica_sql_instrucoes_total Instruções SQL executadas pelo processo.",
+                "# TYPE clinica_sql_instrucoes_total counter",
+                f"clinica_sql_instrucoes_total {self.instrucoes_total}",
+                "# HELP clinica_sql_segundos_total Tempo total gasto em instruções SQL pelo processo.",
+                "# TYPE clinica_sql_segundos_total counter",
+                f"clinica_sql_segundos_total {self.tempo_sql_total}",
+                "# HELP clinica_sql_linhas_total Linhas retornadas pelo banco ao processo.",
+                "# TYPE clinica_sql_linhas_total counter",
+                f"clinica_sql_linhas_total {self.linhas_total}",
+            ]
+            return linhas
+
+metricas_requisicoes = MetricasRequisicoes()
+
+def registrar_instrucao(sql: str, duracao: float, linhas: int):
+    metricas_requisicoes.registrar_instrucao(sql, duracao, linhas)
+
+# Rota (modelo do caminho, ex.: /api/pacientes/{paciente_id}) por endpoint, para
+# que os rótulos não cresçam com cada id acessado
+_rotas_por_endpoint = {}
+
+def _rota(scope) -> str:
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "(sem rota)"
+    rota = _rotas_por_endpoint.get(endpoint)
+    if rota is None:
+        app = scope.get("app")
+        rota = next(
+            (r.path for r in getattr(app, "routes", []) if getattr(r, "endpoint", None) is endpoint),
+            getattr(endpoint, "__name__", "(sem rota)")
+        )
+        _rotas_por_endpoint[endpoint] = rota
+    return rota
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mede cada requisição HTTP até o fim do envio da resposta
+    (inclusive respostas em streaming, como a exportação de consultas).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        contexto = ContextoRequisicao(metodo=scope["method"], caminho=scope["path"])
+        token = _contexto_requisicao.set(contexto)
+        status_resposta = 500
+
+        async def enviar(mensagem):
+            nonlocal status_resposta
+            if mensagem["type"] == "http.response.start":
+                status_resposta = mensagem["status"]
+            await send(mensagem)
+
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            _contexto_requisicao.reset(token)
+            metricas_requisicoes.registrar_requisicao(_rota(scope), status_resposta, duracao, contexto)
@@ -0,0 +1,84 @@
+# app/utils/replicas.py
+import hashlib
+import math
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie, CookieError
+from ..config import settings
+from .cache import LRUCache
+
+# Cookie com o instante (epoch) até o qual o cliente lê do primário; vale entre
+# processos e instâncias, enquanto o registro em memória cobre clientes sem cookies
+COOKIE_PRIMARIO = "db_primario_ate"
+METODOS_LEITURA = {"GET", "HEAD", "OPTIONS"}
+
+_ler_do_primario: ContextVar = ContextVar("ler_do_primario", default=False)
+
+# Clientes que escreveram há pouco; a entrada expira junto com a janela
+_escritas_recentes = LRUCache(10000, ttl=settings.DB_LEITURA_PRIMARIO_SEGUNDOS)
+
+def ler_do_primario() -> bool:
+    """Se a requisição atual deve ler do primário (ela escreve ou o cliente escreveu há pouco)."""
+    return _ler_do_primario.get()
+
+def _cabecalho(scope, nome: bytes):
+    for chave, valor in scope["headers"]:
+        if chave == nome:
+            return valor
+    return None
+
+def chave_cliente(scope) -> str:
+    """Token de acesso (resumido) ou, sem ele, o endereço do cliente."""
+    autorizacao = _cabecalho(scope, b"authorization")
+    if autorizacao:
+        return hashlib.sha256(autorizacao).hexdigest()
+    cliente = scope.get("client")
+    return cliente[0] if cliente else ""
+
+def _cookie_valido(scope) -> bool:
+    valor = _cabecalho(scope, b"cookie")
+    if not valor:
+        return False
+    try:
+        cookie = SimpleCookie(valor.decode("latin-1"))
+        return float(cookie[COOKIE_PRIMARIO].value) > time.time()
+    except (KeyError, ValueError, CookieError):
+        return False
+
+def _set_cookie() -> bytes:
+    janela = settings.DB_LEITURA_PRIMARIO_SEGUNDOS
+    return (
+        f"{COOKIE_PRIMARIO}={time.time() + janela:.3f}; Max-Age={math.ceil(janela)}; "
+        f"Path=/; HttpOnly; SameSite=Lax"
+    ).encode("latin-1")
+
+class MiddlewareLeituraPrimario:
+    """
+    Middleware ASGI de read-your-writes: depois de uma escrita bem-sucedida, as
+    leituras do mesmo cliente vão ao primário por DB_LEITURA_PRIMARIO_SEGUNDOS, para
+    que ele não consulte uma réplica que ainda não recebeu a alteração (por exemplo,
+    a recepcionista abrindo a consulta que acabou de marcar).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        chave = chave_cliente(scope)
+        escrita = scope["method"] not in METODOS_LEITURA
+        token = _ler_do_primario.set(escrita or bool(_escritas_recentes.get(chave)) or _cookie_valido(scope))
+
+        async def enviar(mensagem):
+            if escrita and mensagem["type"] == "http.response.start" and mensagem["status"] < 400:
+                _escritas_recentes.set(chave, True)
+                mensagem["headers"] = list(mensagem.get("headers", [])) + [(b"set-cookie", _set_cookie())]
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _ler_do_primario.reset(token)
@@ -0,0 +1,174 @@
+# app/utils/security.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as TempoEsgotado
+from passlib.context import CryptContext
+from ..config import settings
+
+def criar_contexto_senhas(rounds: int) -> CryptContext:
+    # min = max = rounds: hashes com qualquer outro custo são marcados para atualização
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds
+    )
+
+_contextos = {}
+
+def _contexto(rounds: int) -> CryptContext:
+    contexto = _contextos.get(rounds)
+    if contexto is None:
+        contexto = _contextos[rounds] = criar_contexto_senhas(rounds)
+    return contexto
+
+# Funções executadas nos processos do pool (precisam ser de nível de módulo)
+def _gerar_hash(senha: str, rounds: int) -> str:
+    return _contexto(rounds).hash(senha)
+
+def _verificar_e_atualizar(senha: str, senha_hash: str, rounds: int):
+    return _contexto(rounds).verify_and_update(senha, senha_hash)
+
+class PoolHashingSaturado(Exception):
+    """A fila do pool de hashing está cheia; a requisição deve ser recusada (503)."""
+
+class PoolHashingTempoEsgotado(PoolHashingSaturado):
+    """A operação não terminou em HASH_TIMEOUT_SEGUNDOS; também recusada com 503."""
+
+class PoolHashing:
+    """
+    Executa o bcrypt em um pool de processos separado do threadpool do FastAPI.
+    A fila é limitada: quando há `fila_maxima` operações em andamento, novas
+    chamadas falham imediatamente em vez de ocupar mais threads de requisição.
+    Uma operação que esgota o timeout continua ocupando sua vaga até o processo
+    terminá-la, então a fila nunca passa de `fila_maxima`.
+    """
+
+    LIMITES_HISTOGRAMA = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, processos: int, fila_maxima: int, rounds: int, timeout: float):
+        self.processos = processos
+        self.fila_maxima = fila_maxima
+        self.rounds = rounds
+        self.timeout = timeout
+        self._vagas = threading.BoundedSemaphore(fila_maxima)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.em_andamento = 0
+        self.operacoes = 0
+        self.rejeicoes = 0
+        self.timeouts = 0
+        self.tempo_total = 0.0
+        self.histograma = [0] * (len(self.LIMITES_HISTOGRAMA) + 1)
+
+    def _obter_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.processos)
+            return self._executor
+
+    def _reservar(self) -> float:
+        if not self._vagas.acquire(blocking=False):
+            with self._lock:
+                self.rejeicoes += 1
+            raise PoolHashingSaturado()
+        with self._lock:
+            self.em_andamento += 1
+        return time.perf_counter()
+
+    def _liberar(self, inicio: float):
+        duracao = time.perf_counter() - inicio
+        with self._lock:
+            self.em_andamento -= 1
+            self.operacoes += 1
+            self.tempo_total += duracao
+            indice = next(
+                (i for i, limite in enumerate(self.LIMITES_HISTOGRAMA) if duracao <= limite),
+                len(self.LIMITES_HISTOGRAMA)
+            )
+            self.histograma[indice] += 1
+        self._vagas.release()
+
+    def _submeter(self, funcao, *args):
+        """Envia ao pool; a vaga é liberada quando o processo termina, e não no timeout."""
+        inicio = self._reservar()
+        try:
+            futuro = self._obter_executor().submit(funcao, *args)
+        except Exception:
+            self._liberar(inicio)
+            raise
+        futuro.add_done_callback(lambda _: self._liberar(inicio))
+        return futuro
+
+    def _tempo_esgotado(self):
+        with self._lock:
+            self.timeouts += 1
+        return PoolHashingTempoEsgotado()
+
+    def _executar(self, funcao, *args):
+        if self.processos <= 0:
+            # Sem pool (desenvolvimento): executa na própria thread
+            inicio = self._reservar()
+            try:
+                return funcao(*args)
+            finally:
+                self._liberar(inicio)
+        try:
+            return self._submeter(funcao, *args).result(timeout=self.timeout)
+        except TempoEsgotado:
+            raise self._tempo_esgotado()
+
+    async def _executar_async(self, funcao, *args):
+        """Como _executar, mas aguarda o resultado sem bloquear o event loop."""
+        if self.processos <= 0:
+            inicio = self._reservar()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(None, funcao, *args)
+            finally:
+                self._liberar(inicio)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(self._submeter(funcao, *args)), self.timeout)
+        except asyncio.TimeoutError:
+            raise self._tempo_esgotado()
+
+    def gerar_hash(self, senha: str) -> str:
+        return self._executar(_gerar_hash, senha, self.rounds)
+
+    def verificar_e_atualizar(self, senha: str, senha_hash: str):
+        """Retorna (valida, novo_hash); novo_hash só é preenchido se o custo do hash mudou."""
+        return self._executar(_verificar_e_atualizar, senha, senha_hash, self.rounds)
+
+    async def verificar_e_atualizar_async(self, senha: str, senha_hash: str):
+        return await self._executar_async(_verificar_e_atualizar, senha, senha_hash, self.rounds)
+
+    def encerrar(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "processos": self.processos,
+                "fila_maxima": self.fila_maxima,
+                "rounds": self.rounds,
+                "em_andamento": self.em_andamento,
+                "operacoes": self.operacoes,
+                "rejeicoes": self.rejeicoes,
+                "timeouts": self.timeouts,
+                "tempo_medio_segundos": self.tempo_total / self.operacoes if self.operacoes else 0.0,
+                "histograma_segundos": {
+                    **{str(limite): total for limite, total in zip(self.LIMITES_HISTOGRAMA, self.histograma)},
+                    "+Inf": self.histograma[-1]
+                }
+            }
+
+pool_hashing = PoolHashing(
+    processos=settings.HASH_PROCESSOS,
+    fila_maxima=settings.HASH_FILA_MAXIMA,
+    rounds=settings.BCRYPT_ROUNDS,
+    timeout=settings.HASH_TIMEOUT_SEGUNDOS
+)
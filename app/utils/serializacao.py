@@ -0,0 +1,22 @@
+# app/utils/serializacao.py
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from ..config import settings
+
+try:
+    import orjson
+except ImportError:  # dependência opcional: sem ela, o caminho padrão do FastAPI é usado
+    orjson = None
+
+def resposta_lista(linhas, response: Response):
+    """
+    Com SERIALIZACAO_RAPIDA, as linhas (dicts montados a partir das tuplas do SQL, já
+    no formato do schema) são codificadas direto com orjson, sem a segunda validação
+    do response_model. Sem ela, devolve as linhas para o fluxo normal do FastAPI.
+    """
+    if not settings.SERIALIZACAO_RAPIDA or orjson is None:
+        return linhas
+    # Uma Response devolvida pela rota ignora os cabeçalhos definidos no parâmetro
+    # `response` (ex.: X-Next-Cursor), então eles são copiados aqui
+    cabecalhos = {chave: valor for chave, valor in response.headers.items() if chave != "content-length"}
+    return ORJSONResponse(linhas, headers=cabecalhos)
@@ -0,0 +1,85 @@
+"""
+Custo por chamada da validação de um horário na agenda do médico (criação e
+remarcação de consultas), nos dois caminhos:
+
+- texto: como antes da AgendaMedico, dias_atendimento é separado com split e os
+  horários de atendimento interpretados com strptime a cada chamada
+- compilado: a AgendaMedico compilada em cache por processo (máscara de dias +
+  minutos do dia), como usam as rotas
+
+Não usa banco nem HTTP; os médicos são objetos simples com as colunas da agenda:
+
+    python benchmarks/agenda_medico.py --medicos 50 --chamadas 200000
+"""
+import argparse
+import sys
+import timeit
+from datetime import date, datetime, time as hora, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.consulta_service import hora_para_minutos
+from app.services.medico_service import agenda_do_medico, compilar_agenda
+
+def medicos(quantidade: int):
+    return [
+        SimpleNamespace(
+            id=i,
+            dias_atendimento="1,2,3,4,5" if i % 2 else "1,3,5",
+            horario_inicio_atendimento=f"{7 + i % 3:02d}:00",
+            horario_fim_atendimento=f"{17 + i % 3:02d}:00",
+            tempo_consulta=(20, 30, 45)[i % 3]
+        )
+        for i in range(quantidade)
+    ]
+
+def validar_texto(medico, data_consulta: date, hora_consulta: hora) -> bool:
+    """A validação como era feita nas rotas, relendo as strings da agenda a cada chamada."""
+    hora_fim = (datetime.combine(datetime.today(), hora_consulta) + timedelta(minutes=medico.tempo_consulta)).time()
+    dias_atendimento = [int(d) for d in medico.dias_atendimento.split(",")]
+    if (data_consulta.weekday() + 1) % 7 not in dias_atendimento:
+        return False
+    horario_inicio_medico = datetime.strptime(medico.horario_inicio_atendimento, "%H:%M").time()
+    horario_fim_medico = datetime.strptime(medico.horario_fim_atendimento, "%H:%M").time()
+    return not (hora_consulta < horario_inicio_medico or hora_fim > horario_fim_medico)
+
+def validar_compilado(medico, data_consulta: date, hora_consulta: hora) -> bool:
+    agenda = agenda_do_medico(medico)
+    return agenda.atende_em(data_consulta) and agenda.horario_valido(hora_para_minutos(hora_consulta))
+
+def pedidos(lista_medicos, quantidade: int):
+    """Combinações (médico, dia, hora) variadas, metade fora da agenda."""
+    segunda = date(2026, 10, 19)
+    return [
+        (lista_medicos[i % len(lista_medicos)], segunda + timedelta(days=i % 7), hora(6 + i % 14, 15 * (i % 4)))
+        for i in range(quantidade)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--medicos", type=int, default=50)
+    parser.add_argument("--chamadas", type=int, default=200000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    lista = pedidos(medicos(args.medicos), 1000)
+    # Os dois caminhos precisam concordar antes de serem comparados
+    assert [validar_texto(*p) for p in lista] == [validar_compilado(*p) for p in lista]
+
+    voltas = max(args.chamadas // len(lista), 1)
+    print(f"{'caminho':<12}{'ns/chamada':>12}")
+    resultados = {}
+    for caminho, funcao in (("texto", validar_texto), ("compilado", validar_compilado)):
+        compilar_agenda.cache_clear()
+        melhor = min(timeit.repeat(
+            lambda: [funcao(*p) for p in lista], number=voltas, repeat=args.repeticoes
+        ))
+        resultados[caminho] = melhor / (voltas * len(lista))
+        print(f"{caminho:<12}{resultados[caminho] * 1e9:>12.0f}")
+    print(f"{'ganho':<12}{resultados['texto'] / resultados['compilado']:>11.1f}x")
+    print(f"\nAgendas compiladas em cache: {compilar_agenda.cache_info().currsize}")
+
+if __name__ == "__main__":
+    main()
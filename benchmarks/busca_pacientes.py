@@ -0,0 +1,116 @@
+"""
+Mede a busca de pacientes (parâmetro `busca`) sobre uma base sintética grande.
+
+Usa o PostgreSQL configurado em POSTGRES_* (as mesmas variáveis da aplicação):
+
+    python benchmarks/busca_pacientes.py --pacientes 1000000 --repeticoes 50
+
+Os pacientes sintéticos usam CPFs a partir de 50000000000 e são inseridos só uma
+vez (ON CONFLICT DO NOTHING). Para cada termo são informados p50, p95 e máximo da
+consulta completa (mesma função usada pela rota) e, com --explain, o plano.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.database import engine, SessionLocal
+from app.main import Base
+from app.models.paciente import Paciente as PacienteModel
+from app.services.paciente_service import aplicar_busca
+
+TERMOS_PADRAO = ["joao", "Conceicao", "maria sil", "antonio goncal", "Sergio Simoes", "5000001", "(11) 9123"]
+
+PRIMEIROS_NOMES = [
+    "João", "José", "Maria", "Ana", "Antônio", "Francisco", "Luís", "Márcia", "Cecília", "Sérgio",
+    "Fábio", "Mônica", "Lúcia", "Inês", "Vitória", "Paulo", "Pedro", "Helena", "Raí", "Tânia",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Conceição", "Araújo", "Gonçalves", "Simões", "Lima", "Pereira",
+    "Magalhães", "Brandão", "Lopes", "Ribeiro", "Gusmão", "Falcão", "Carvalho", "Assunção", "Barbosa", "Mendonça",
+]
+
+def popular(quantidade: int):
+    sql = text("""
+        INSERT INTO pacientes (nome, nome_busca, cpf, data_nascimento, sexo, telefone, telefone_digitos, tipo_contato)
+        SELECT
+            dados.nome,
+            translate(lower(dados.nome), 'áàâãéêíóôõúüç', 'aaaaeeiooouuc'),
+            (50000000000 + g)::text,
+            DATE '1940-01-01' + (g % 25000),
+            (ARRAY['MASCULINO', 'FEMININO', 'OUTRO'])[1 + g % 3]::sexo,
+            '(11) 9' || substr(dados.fone, 1, 4) || '-' || substr(dados.fone, 5, 4),
+            '119' || dados.fone,
+            'CELULAR'::tipocontato
+        FROM generate_series(1, :quantidade) AS g
+        CROSS JOIN LATERAL (
+            SELECT
+                (CAST(:primeiros AS text[]))[1 + (g * 31) % :n_primeiros] || ' ' ||
+                (CAST(:sobrenomes AS text[]))[1 + (g * 17) % :n_sobrenomes] || ' ' ||
+                (CAST(:sobrenomes AS text[]))[1 + (g * 13) % :n_sobrenomes] AS nome,
+                lpad(((g::bigint * 7919) % 100000000)::text, 8, '0') AS fone
+        ) AS dados
+        ON CONFLICT (cpf) DO NOTHING
+    """)
+    with engine.begin() as conexao:
+        conexao.execute(sql, {
+            "quantidade": quantidade,
+            "primeiros": PRIMEIROS_NOMES,
+            "sobrenomes": SOBRENOMES,
+            "n_primeiros": len(PRIMEIROS_NOMES),
+            "n_sobrenomes": len(SOBRENOMES),
+        })
+        conexao.execute(text("ANALYZE pacientes"))
+
+def medir(termo: str, repeticoes: int, limite: int):
+    tempos = []
+    with SessionLocal() as db:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resultados = aplicar_busca(db.query(PacienteModel.id, PacienteModel.nome), termo).limit(limite).all()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "resultados": len(resultados),
+        "p50_ms": statistics.median(tempos),
+        "p95_ms": tempos[max(int(len(tempos) * 0.95) - 1, 0)],
+        "max_ms": tempos[-1],
+    }
+
+def explicar(termo: str, limite: int):
+    with SessionLocal() as db:
+        consulta = aplicar_busca(db.query(PacienteModel.id, PacienteModel.nome), termo).limit(limite)
+        compilada = consulta.statement.compile(engine, compile_kwargs={"literal_binds": True})
+        for linha, in db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compilada}")):
+            print(f"    {linha}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, default=1000000)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    parser.add_argument("--limite", type=int, default=20)
+    parser.add_argument("--termos", nargs="*", default=TERMOS_PADRAO)
+    parser.add_argument("--sem-popular", action="store_true", help="usar os dados já existentes")
+    parser.add_argument("--explain", action="store_true")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    if not args.sem_popular:
+        inicio = time.perf_counter()
+        popular(args.pacientes)
+        print(f"Base sintética pronta em {time.perf_counter() - inicio:.1f}s")
+
+    print(f"{'termo':<20}{'resultados':>12}{'p50 (ms)':>12}{'p95 (ms)':>12}{'máx (ms)':>12}")
+    for termo in args.termos:
+        r = medir(termo, args.repeticoes, args.limite)
+        print(f"{termo:<20}{r['resultados']:>12}{r['p50_ms']:>12.1f}{r['p95_ms']:>12.1f}{r['max_ms']:>12.1f}")
+        if args.explain:
+            explicar(termo, args.limite)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Teste de carga roteirizado dos fluxos principais: login, busca de pacientes,
+disponibilidade, agendamento, listagem de consultas e envio de lembretes.
+
+Usa a clínica gerada por gerador_clinica.py no banco configurado (POSTGRES_* ou
+DATABASE_URL). Por padrão a aplicação roda no próprio processo (ASGI, sem rede);
+com --url, as requisições vão para um servidor já em execução no mesmo banco.
+
+    python benchmarks/carga.py --usuarios 8 --duracao 60 --salvar-baseline postgres-local
+    python benchmarks/carga.py --usuarios 8 --duracao 60 --comparar postgres-local
+
+Para cada rota são informados requisições, vazão, p50/p95/p99 e erros. As
+baselines ficam em benchmarks/baselines/<nome>.json; --comparar mostra a
+diferença para a baseline e termina com código 1 se p95/p99 piorarem ou a vazão
+cair mais que --tolerancia por cento.
+
+A baseline versionada sqlite-ci foi medida no SQLite (o banco do CI), com a
+clínica e os parâmetros padrão. Para comparar, gere os mesmos dados e use a mesma
+carga; regrave-a quando uma mudança alterar o desempenho de propósito:
+
+    DATABASE_URL=sqlite:///clinica.db python benchmarks/gerador_clinica.py --pacientes 2000 --limpar
+    DATABASE_URL=sqlite:///clinica.db python benchmarks/carga.py --comparar sqlite-ci
+
+Efeito do cache do usuário autenticado (cada rota protegida deixa de buscar o
+usuário no banco): compare uma execução normal com outra sem o cache. Com --url,
+inicie o servidor com AUTH_CACHE_TTL_SEGUNDOS=0 em vez de usar a opção.
+
+    python benchmarks/carga.py --salvar-baseline com-cache-autenticacao
+    python benchmarks/carga.py --sem-cache-autenticacao --comparar com-cache-autenticacao
+
+Tempestade de logins (troca de turno): --tempestade-login N soma N usuários que só
+fazem login, sem pausa. Com o bcrypt no pool de processos, as outras rotas devem
+manter a latência da baseline e o excesso de logins é recusado com 503 (contado
+em "confl." na linha "POST /auth/login (tempestade)").
+
+    python benchmarks/carga.py --salvar-baseline sem-tempestade
+    python benchmarks/carga.py --tempestade-login 32 --comparar sem-tempestade
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Sem worker da outbox e com um SMTP inexistente: os envios falham na hora, sem sair da máquina
+os.environ.setdefault("OUTBOX_WORKER_HABILITADO", "false")
+os.environ.setdefault("SMTP_SERVER", "127.0.0.1")
+os.environ.setdefault("SMTP_PORT", "9")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from sqlalchemy import select, func
+
+from app.config import settings
+from app.database import engine, SessionLocal
+from app.models.medico import Medico
+from app.models.paciente import Paciente
+from app.services.medico_service import agenda_do_medico
+from gerador_clinica import USUARIOS_BENCHMARK, SENHA_BENCHMARK
+
+DIRETORIO_BASELINES = Path(__file__).resolve().parent / "baselines"
+API = settings.API_PREFIX
+
+def percentil(valores, p: float) -> float:
+    """Percentil pelo método do posto mais próximo (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    posicao = max(int(round(p / 100 * len(valores) + 0.5)) - 1, 0)
+    return valores[min(posicao, len(valores) - 1)]
+
+class Resultados:
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.erros = defaultdict(int)
+        self.conflitos = defaultdict(int)
+
+    async def medir(self, nome: str, requisicao, esperados=(200,), conflito=()):
+        inicio = time.perf_counter()
+        try:
+            resposta = await requisicao
+        except httpx.HTTPError:
+            self.erros[nome] += 1
+            return None
+        self.latencias[nome].append(time.perf_counter() - inicio)
+        if resposta.status_code in conflito:
+            # Resultado legítimo sob concorrência (ex.: horário tomado por outro usuário)
+            self.conflitos[nome] += 1
+        elif resposta.status_code not in esperados:
+            self.erros[nome] += 1
+        return resposta
+
+    def resumo(self, duracao: float):
+        resumo = {}
+        for nome in sorted(set(self.latencias) | set(self.erros)):
+            valores = sorted(self.latencias[nome])
+            resumo[nome] = {
+                "requisicoes": len(valores),
+                "vazao_rps": round(len(valores) / duracao, 2),
+                "p50_ms": round(percentil(valores, 50) * 1000, 2),
+                "p95_ms": round(percentil(valores, 95) * 1000, 2),
+                "p99_ms": round(percentil(valores, 99) * 1000, 2),
+                "erros": self.erros[nome],
+                "conflitos": self.conflitos[nome],
+            }
+        return resumo
+
+def carregar_dados():
+    """Médicos (com a agenda), termos de busca e faixa de ids dos pacientes gerados."""
+    with SessionLocal() as db:
+        medicos = [
+            (medico.id, agenda_do_medico(medico))
+            for medico in db.query(Medico).order_by(Medico.id)
+        ]
+        nomes = db.execute(select(Paciente.nome).order_by(Paciente.id).limit(500)).scalars().all()
+        primeiro, ultimo = db.execute(select(func.min(Paciente.id), func.max(Paciente.id))).one()
+    if not medicos or primeiro is None:
+        sys.exit("Banco sem dados: rode antes benchmarks/gerador_clinica.py")
+    termos = sorted({nome.split()[0] for nome in nomes} | {nome.split()[-1][:5] for nome in nomes})
+    # Prefixos de CPF dos pacientes sintéticos (80000000000 em diante)
+    termos += ["8000000", "80000012", "800000"]
+    return {"medicos": medicos, "termos": termos, "pacientes": (primeiro, ultimo)}
+
+class UsuarioVirtual:
+    def __init__(self, indice: int, cliente: httpx.AsyncClient, dados: dict, resultados: Resultados, semente: int):
+        self.cliente = cliente
+        self.dados = dados
+        self.resultados = resultados
+        self.aleatorio = random.Random(semente + indice)
+        self.cabecalhos = {}
+
+    def _dia_de_atendimento(self, agenda):
+        hoje = date.today()
+        while True:
+            dia = hoje + timedelta(days=self.aleatorio.randint(1, 30))
+            if agenda.atende_em(dia):
+                return dia
+
+    async def login(self, nome="POST /auth/login"):
+        # 503 é a recusa rápida com o pool de hashing cheio, não uma falha
+        resposta = await self.resultados.medir(nome, self.cliente.post(
+            f"{API}/auth/login",
+            data={"username": USUARIOS_BENCHMARK["recepcionista"], "password": SENHA_BENCHMARK}
+        ), conflito=(503,))
+        if resposta is not None and resposta.status_code == 200:
+            self.cabecalhos = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+    async def buscar_pacientes(self):
+        await self.resultados.medir("GET /pacientes?busca", self.cliente.get(
+            f"{API}/pacientes/", params={"busca": self.aleatorio.choice(self.dados["termos"]), "limit": 20},
+            headers=self.cabecalhos
+        ))
+
+    async def disponibilidade(self):
+        medico_id, agenda = self.aleatorio.choice(self.dados["medicos"])
+        dia = self._dia_de_atendimento(agenda)
+        return medico_id, dia, await self.resultados.medir("GET /consultas/agenda/disponibilidade", self.cliente.get(
+            f"{API}/consultas/agenda/disponibilidade",
+            params={"medico_id": medico_id, "data_consulta": dia.isoformat()}, headers=self.cabecalhos
+        ))
+
+    async def agendar(self):
+        medico_id, dia, resposta = await self.disponibilidade()
+        if resposta is None or resposta.status_code != 200 or not resposta.json()["disponibilidade"]:
+            return
+        horario = self.aleatorio.choice(resposta.json()["disponibilidade"])
+        await self.resultados.medir("POST /consultas", self.cliente.post(
+            f"{API}/consultas/",
+            json={
+                "paciente_id": self.aleatorio.randint(*self.dados["pacientes"]),
+                "medico_id": medico_id,
+                "data_consulta": dia.isoformat(),
+                "hora_consulta": horario["hora_inicio"],
+                "problema_saude": "Benchmark"
+            },
+            headers=self.cabecalhos
+        ), conflito=(400,))
+
+    async def listar_consultas(self):
+        medico_id, _ = self.aleatorio.choice(self.dados["medicos"])
+        inicio = date.today() + timedelta(days=self.aleatorio.randint(-60, 30))
+        await self.resultados.medir("GET /consultas", self.cliente.get(
+            f"{API}/consultas/",
+            params={"medico_id": medico_id, "data_inicio": inicio.isoformat(),
+                    "data_fim": (inicio + timedelta(days=7)).isoformat(), "limit": 100},
+            headers=self.cabecalhos
+        ))
+
+    async def lembretes(self):
+        resposta = await self.resultados.medir("POST /consultas/enviar-lembretes", self.cliente.post(
+            f"{API}/consultas/enviar-lembretes", headers=self.cabecalhos
+        ), esperados=(202,))
+        if resposta is not None and resposta.status_code == 202:
+            await self.resultados.medir("GET /consultas/enviar-lembretes/{job_id}", self.cliente.get(
+                f"{API}/consultas/enviar-lembretes/{resposta.json()['job_id']}", headers=self.cabecalhos
+            ))
+
+    async def executar(self, fim: float):
+        # Como um cliente real, respeita o Retry-After quando o login é recusado (503)
+        while not self.cabecalhos and time.perf_counter() < fim:
+            await self.login()
+            if not self.cabecalhos:
+                await asyncio.sleep(1)
+        # Peso de cada fluxo na mistura (recepção típica: muita consulta, pouca escrita)
+        fluxos = [
+            (self.buscar_pacientes, 30),
+            (self.disponibilidade, 25),
+            (self.listar_consultas, 25),
+            (self.agendar, 12),
+            (self.login, 5),
+            (self.lembretes, 3),
+        ]
+        acoes, pesos = zip(*fluxos)
+        while time.perf_counter() < fim:
+            await self.aleatorio.choices(acoes, pesos)[0]()
+
+    async def tempestade_login(self, fim: float):
+        while time.perf_counter() < fim:
+            await self.login("POST /auth/login (tempestade)")
+
+async def executar_carga(args, dados):
+    if args.url:
+        transporte = httpx.AsyncHTTPTransport()
+        base_url = args.url
+    else:
+        from app.main import app
+        transporte = httpx.ASGITransport(app=app)
+        base_url = "http://benchmark"
+
+    resultados = Resultados()
+    async with httpx.AsyncClient(transport=transporte, base_url=base_url, timeout=60) as cliente:
+        # Aquecimento (caches, pool de conexões, pool de hashing) fora da medição
+        aquecimento = UsuarioVirtual(-1, cliente, dados, Resultados(), args.semente)
+        await aquecimento.executar(time.perf_counter() + args.aquecimento)
+
+        inicio = time.perf_counter()
+        fim = inicio + args.duracao
+        await asyncio.gather(
+            *(UsuarioVirtual(i, cliente, dados, resultados, args.semente).executar(fim) for i in range(args.usuarios)),
+            *(UsuarioVirtual(args.usuarios + i, cliente, dados, resultados, args.semente).tempestade_login(fim)
+              for i in range(args.tempestade_login))
+        )
+        duracao = time.perf_counter() - inicio
+    return resultados.resumo(duracao), duracao
+
+def imprimir(resumo):
+    print(f"{'rota':<42}{'req':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'erros':>7}{'confl.':>7}")
+    for nome, r in resumo.items():
+        print(f"{nome:<42}{r['requisicoes']:>7}{r['vazao_rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+              f"{r['p99_ms']:>9.1f}{r['erros']:>7}{r['conflitos']:>7}")
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar(resumo, baseline, tolerancia: float) -> bool:
+    """Imprime a diferença para a baseline e retorna True se houve regressão."""
+    regressao = False
+    print(f"\nComparação com a baseline (commit {baseline.get('commit')}, {baseline.get('criado_em')}):")
+    print(f"{'rota':<42}{'p95 ms':>16}{'p99 ms':>16}{'req/s':>16}")
+    for nome, atual in resumo.items():
+        anterior = baseline["rotas"].get(nome)
+        if anterior is None:
+            print(f"{nome:<42}{'(nova rota)':>16}")
+            continue
+        colunas = []
+        for chave, pior_se_maior in (("p95_ms", True), ("p99_ms", True), ("vazao_rps", False)):
+            base, valor = anterior[chave], atual[chave]
+            variacao = (valor - base) / base * 100 if base else 0.0
+            piorou = variacao > tolerancia if pior_se_maior else variacao < -tolerancia
+            regressao |= piorou
+            colunas.append(f"{variacao:+.0f}%{' !' if piorou else '  '}")
+        print(f"{nome:<42}" + "".join(f"{coluna:>16}" for coluna in colunas))
+    return regressao
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--usuarios", type=int, default=8, help="usuários virtuais simultâneos")
+    parser.add_argument("--duracao", type=float, default=30, help="segundos de medição")
+    parser.add_argument("--aquecimento", type=float, default=5, help="segundos de aquecimento (não medidos)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--url", help="servidor em execução (ex.: http://localhost:8000); padrão: no processo")
+    parser.add_argument("--salvar-baseline", metavar="NOME")
+    parser.add_argument("--comparar", metavar="NOME")
+    parser.add_argument("--tolerancia", type=float, default=20, help="piora máxima aceita, em %%")
+    parser.add_argument("--sem-cache-autenticacao", action="store_true",
+                        help="busca o usuário autenticado no banco a cada requisição (só no processo)")
+    parser.add_argument("--tempestade-login", type=int, default=0, metavar="N",
+                        help="usuários extras que só fazem login, sem pausa")
+    args = parser.parse_args()
+
+    if args.sem_cache_autenticacao:
+        settings.AUTH_CACHE_TTL_SEGUNDOS = 0
+
+    dados = carregar_dados()
+    resumo, duracao = asyncio.run(executar_carga(args, dados))
+    print(f"{args.usuarios} usuários virtuais por {duracao:.0f}s ({engine.url.get_backend_name()}, "
+          f"{'servidor ' + args.url if args.url else 'no processo'})\n")
+    imprimir(resumo)
+
+    if args.salvar_baseline:
+        DIRETORIO_BASELINES.mkdir(exist_ok=True)
+        destino = DIRETORIO_BASELINES / f"{args.salvar_baseline}.json"
+        destino.write_text(json.dumps({
+            "criado_em": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit_atual(),
+            "banco": engine.url.get_backend_name(),
+            "parametros": {"usuarios": args.usuarios, "duracao": args.duracao, "semente": args.semente,
+                           "url": args.url, "medicos": len(dados["medicos"]),
+                           "cache_autenticacao": not args.sem_cache_autenticacao,
+                           "tempestade_login": args.tempestade_login},
+            "rotas": resumo,
+        }, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nBaseline salva em {destino}")
+
+    if args.comparar:
+        baseline = json.loads((DIRETORIO_BASELINES / f"{args.comparar}.json").read_text(encoding="utf-8"))
+        if comparar(resumo, baseline, args.tolerancia):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Gera uma clínica sintética e reprodutível no banco configurado (POSTGRES_* ou
+DATABASE_URL, que aceita um arquivo SQLite para o CI):
+
+    python benchmarks/gerador_clinica.py --medicos 30 --pacientes 20000 --limpar
+    DATABASE_URL=sqlite:///clinica.db python benchmarks/gerador_clinica.py --pacientes 2000 --limpar
+
+São criados um administrador e uma recepcionista (USUARIOS_BENCHMARK), médicos com
+dias de atendimento, horários e durações variados, pacientes e um ano de consultas
+(cerca de dez meses de histórico e dois meses de agenda futura), com prontuários
+para as consultas concluídas. A mesma semente gera sempre os mesmos dados.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, time as hora, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert, select, func
+
+from app.config import settings
+from app.database import engine, SessionLocal
+from app.main import Base
+from app.models.usuario import Usuario, TipoUsuario
+from app.models.medico import Medico
+from app.models.paciente import Paciente, Sexo, TipoContato
+from app.models.consulta import Consulta, StatusConsulta
+from app.models.prontuario import Prontuario
+from app.services.dashboard_service import reconstruir_estatisticas
+from app.services.medico_service import compilar_agenda
+from app.utils.helpers import normalizar_texto, apenas_digitos
+from app.utils.security import criar_contexto_senhas
+
+SENHA_BENCHMARK = "benchmark123"
+USUARIOS_BENCHMARK = {
+    "administrador": "admin@benchmark.com.br",
+    "recepcionista": "recepcao@benchmark.com.br",
+}
+
+# Histórico e agenda futura, em dias a partir de hoje
+DIAS_HISTORICO = 300
+DIAS_FUTUROS = 65
+
+TAMANHO_LOTE = 5000
+
+PRIMEIROS_NOMES = [
+    "João", "José", "Maria", "Ana", "Antônio", "Francisco", "Luís", "Márcia", "Cecília", "Sérgio",
+    "Fábio", "Mônica", "Lúcia", "Inês", "Vitória", "Paulo", "Pedro", "Helena", "Raí", "Tânia",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Conceição", "Araújo", "Gonçalves", "Simões", "Lima", "Pereira",
+    "Magalhães", "Brandão", "Lopes", "Ribeiro", "Gusmão", "Falcão", "Carvalho", "Assunção", "Barbosa", "Mendonça",
+]
+ESPECIALIDADES = ["Cardiologia", "Clínica Geral", "Dermatologia", "Ginecologia", "Ortopedia", "Pediatria", "Psiquiatria"]
+# (dias_atendimento, início, fim): semana cheia, meio período, plantões de fim de semana
+AGENDAS = [
+    ("1,2,3,4,5", "08:00", "18:00"),
+    ("1,3,5", "08:00", "12:00"),
+    ("2,4", "13:00", "19:00"),
+    ("1,2,3,4,5,6", "07:00", "13:00"),
+    ("0,6", "09:00", "15:00"),
+]
+DURACOES = [15, 20, 30, 30, 40, 60]
+PROBLEMAS = ["Dor de cabeça", "Retorno", "Check-up anual", "Dor nas costas", "Exames de rotina", None]
+
+def _inserir_em_lotes(conexao, modelo, linhas):
+    for inicio in range(0, len(linhas), TAMANHO_LOTE):
+        conexao.execute(insert(modelo), linhas[inicio:inicio + TAMANHO_LOTE])
+
+def _nome(aleatorio: random.Random) -> str:
+    return f"{aleatorio.choice(PRIMEIROS_NOMES)} {aleatorio.choice(SOBRENOMES)} {aleatorio.choice(SOBRENOMES)}"
+
+def gerar_clinica(medicos: int, pacientes: int, ocupacao: float, semente: int, hoje: date = None):
+    aleatorio = random.Random(semente)
+    hoje = hoje or date.today()
+    # Um único hash para todos os usuários sintéticos: o bcrypt domina o tempo de geração
+    senha_hash = criar_contexto_senhas(settings.BCRYPT_ROUNDS).hash(SENHA_BENCHMARK)
+
+    with engine.begin() as conexao:
+        conexao.execute(insert(Usuario), [
+            {"nome": "Administrador Benchmark", "email": USUARIOS_BENCHMARK["administrador"],
+             "senha_hash": senha_hash, "tipo": TipoUsuario.ADMINISTRADOR, "ativo": True},
+            {"nome": "Recepção Benchmark", "email": USUARIOS_BENCHMARK["recepcionista"],
+             "senha_hash": senha_hash, "tipo": TipoUsuario.RECEPCIONISTA, "ativo": True},
+        ])
+        conexao.execute(insert(Usuario), [
+            {"nome": f"Dr(a). {_nome(aleatorio)}", "email": f"medico{i}@benchmark.com.br",
+             "senha_hash": senha_hash, "tipo": TipoUsuario.MEDICO, "ativo": True}
+            for i in range(medicos)
+        ])
+        usuarios_medicos = conexao.execute(
+            select(Usuario.id).where(Usuario.tipo == TipoUsuario.MEDICO, Usuario.email.like("medico%@benchmark.com.br")).
+            order_by(Usuario.id)
+        ).scalars().all()
+
+        linhas_medicos = []
+        for i, usuario_id in enumerate(usuarios_medicos):
+            dias, inicio, fim = AGENDAS[i % len(AGENDAS)]
+            linhas_medicos.append({
+                "usuario_id": usuario_id,
+                "crm": f"CRM/SP {200000 + i}",
+                "especialidade": ESPECIALIDADES[i % len(ESPECIALIDADES)],
+                "telefone": f"(11) 3{i:03d}-0000",
+                "data_nascimento": date(1960 + i % 30, 1 + i % 12, 1 + i % 28),
+                "cpf": str(90000000000 + i),
+                "horario_inicio_atendimento": inicio,
+                "horario_fim_atendimento": fim,
+                "dias_atendimento": dias,
+                "tempo_consulta": DURACOES[i % len(DURACOES)],
+            })
+        conexao.execute(insert(Medico), linhas_medicos)
+        medicos_gerados = conexao.execute(
+            select(Medico.id, Medico.dias_atendimento, Medico.horario_inicio_atendimento,
+                   Medico.horario_fim_atendimento, Medico.tempo_consulta).
+            where(Medico.usuario_id.in_(usuarios_medicos)).order_by(Medico.id)
+        ).all()
+
+        linhas_pacientes = []
+        for i in range(pacientes):
+            nome = _nome(aleatorio)
+            telefone = f"(11) 9{aleatorio.randrange(10000):04d}-{aleatorio.randrange(10000):04d}"
+            linhas_pacientes.append({
+                "nome": nome,
+                "nome_busca": normalizar_texto(nome),
+                "cpf": str(80000000000 + i),
+                "data_nascimento": date(1940, 1, 1) + timedelta(days=aleatorio.randrange(30000)),
+                "sexo": aleatorio.choice(list(Sexo)),
+                "telefone": telefone,
+                "telefone_digitos": apenas_digitos(telefone),
+                "tipo_contato": aleatorio.choice(list(TipoContato)),
+                "email": f"paciente{i}@benchmark.com.br" if aleatorio.random() < 0.7 else None,
+                "cidade": "São Paulo",
+                "estado": "SP",
+            })
+        _inserir_em_lotes(conexao, Paciente, linhas_pacientes)
+        primeiro_paciente, ultimo_paciente = conexao.execute(
+            select(func.min(Paciente.id), func.max(Paciente.id)).where(Paciente.cpf.like("8%"))
+        ).one()
+
+        linhas_consultas = []
+        for medico in medicos_gerados:
+            agenda = compilar_agenda(
+                medico.dias_atendimento, medico.horario_inicio_atendimento,
+                medico.horario_fim_atendimento, medico.tempo_consulta
+            )
+            for deslocamento in range(-DIAS_HISTORICO, DIAS_FUTUROS):
+                dia = hoje + timedelta(days=deslocamento)
+                if not agenda.atende_em(dia):
+                    continue
+                # A agenda futura fica mais vazia quanto mais distante
+                chance = ocupacao if deslocamento <= 0 else ocupacao * (1 - deslocamento / DIAS_FUTUROS)
+                for inicio in range(agenda.inicio, agenda.fim - agenda.tempo_consulta + 1, agenda.tempo_consulta):
+                    if aleatorio.random() >= chance:
+                        continue
+                    if deslocamento < 0:
+                        status = StatusConsulta.CANCELADA if aleatorio.random() < 0.08 else StatusConsulta.CONCLUIDA
+                    elif deslocamento == 1:
+                        # Amanhã: a maioria confirmada, para o envio de lembretes ter trabalho
+                        status = StatusConsulta.CONFIRMADA if aleatorio.random() < 0.8 else StatusConsulta.AGENDADA
+                    else:
+                        status = aleatorio.choice([StatusConsulta.AGENDADA, StatusConsulta.CONFIRMADA])
+                    linhas_consultas.append({
+                        "paciente_id": aleatorio.randint(primeiro_paciente, ultimo_paciente),
+                        "medico_id": medico.id,
+                        "data_consulta": dia,
+                        "hora_consulta": hora(inicio // 60, inicio % 60),
+                        "problema_saude": aleatorio.choice(PROBLEMAS),
+                        "status": status,
+                        "notificacao_enviada": deslocamento < 0,
+                        "lembrete_enviado": deslocamento < 0,
+                    })
+        _inserir_em_lotes(conexao, Consulta, linhas_consultas)
+
+        concluidas = conexao.execute(
+            select(Consulta.id, Consulta.paciente_id, Consulta.medico_id).
+            where(Consulta.status == StatusConsulta.CONCLUIDA, Consulta.medico_id.in_([m.id for m in medicos_gerados]))
+        ).all()
+        _inserir_em_lotes(conexao, Prontuario, [
+            {
+                "paciente_id": consulta.paciente_id,
+                "consulta_id": consulta.id,
+                "medico_id": consulta.medico_id,
+                "diagnostico": aleatorio.choice(["Sem alterações", "Hipertensão leve", "Lombalgia", "Enxaqueca"]),
+                "tratamento": aleatorio.choice(["Acompanhamento", "Analgésico", "Fisioterapia", None]),
+            }
+            for consulta in concluidas
+        ])
+
+    # As inserções em lote não passam pelo flush do ORM, que mantém o dashboard
+    with SessionLocal() as db:
+        reconstruir_estatisticas(db)
+
+    return {
+        "medicos": len(medicos_gerados),
+        "pacientes": len(linhas_pacientes),
+        "consultas": len(linhas_consultas),
+        "prontuarios": len(concluidas),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--medicos", type=int, default=30)
+    parser.add_argument("--pacientes", type=int, default=20000)
+    parser.add_argument("--ocupacao", type=float, default=0.6, help="fração dos horários passados ocupados")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--limpar", action="store_true", help="apaga e recria todas as tabelas antes de gerar")
+    args = parser.parse_args()
+
+    if args.limpar:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    inicio = time.perf_counter()
+    totais = gerar_clinica(args.medicos, args.pacientes, args.ocupacao, args.semente)
+    print(
+        f"{totais['medicos']} médicos, {totais['pacientes']} pacientes, {totais['consultas']} consultas e "
+        f"{totais['prontuarios']} prontuários gerados em {time.perf_counter() - inicio:.1f}s ({engine.url.get_backend_name()})"
+    )
+    print(f"Usuários: {', '.join(USUARIOS_BENCHMARK.values())} (senha: {SENHA_BENCHMARK})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Mede a importação de pacientes em lote (COPY + INSERT ... SELECT) a partir de um CSV sintético.
+
+Usa o PostgreSQL configurado em POSTGRES_* (as mesmas variáveis da aplicação):
+
+    python benchmarks/importacao_pacientes.py --pacientes 100000
+
+Os CPFs sintéticos começam em 70000000000. Por padrão a transação é desfeita ao
+final, então a medição pode ser repetida; use --manter para confirmar os dados.
+"""
+import argparse
+import csv
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import engine, SessionLocal
+from app.main import Base
+from app.services.importacao_service import ImportadorPacientes
+
+NOMES = ["João Silva", "Maria Conceição", "José Gonçalves", "Ana Simões", "Cecília Araújo", "Sérgio Magalhães"]
+SEXOS = ["masculino", "feminino", "outro"]
+
+def gerar_csv(destino, quantidade: int, repetidos: int):
+    escritor = csv.writer(destino)
+    escritor.writerow(["nome", "cpf", "data_nascimento", "sexo", "telefone", "tipo_contato", "email", "cidade", "estado"])
+    for i in range(quantidade):
+        # As últimas `repetidos` linhas repetem CPFs já presentes no arquivo
+        numero = i if i < quantidade - repetidos else i - (quantidade - repetidos)
+        escritor.writerow([
+            f"{NOMES[i % len(NOMES)]} {i}",
+            str(70000000000 + numero),
+            f"{1940 + i % 80}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            SEXOS[i % 3],
+            f"(11) 9{i % 10000:04d}-{i // 10000 % 10000:04d}",
+            "celular",
+            f"paciente{i}@exemplo.com" if i % 2 else "",
+            "São Paulo",
+            "SP"
+        ])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pacientes", type=int, default=100000)
+    parser.add_argument("--repetidos", type=int, default=100, help="linhas com CPF repetido no arquivo")
+    parser.add_argument("--manter", action="store_true", help="confirma a importação em vez de desfazê-la")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with tempfile.TemporaryFile("w+", encoding="utf-8", newline="") as arquivo:
+        inicio = time.perf_counter()
+        gerar_csv(arquivo, args.pacientes, args.repetidos)
+        arquivo.seek(0)
+        print(f"CSV gerado em {time.perf_counter() - inicio:.1f}s")
+
+        with SessionLocal() as db:
+            inicio = time.perf_counter()
+            resultado = ImportadorPacientes(db).importar(arquivo)
+            duracao = time.perf_counter() - inicio
+            if args.manter:
+                db.commit()
+            else:
+                db.rollback()
+
+    print(f"{resultado['importados']} importados, {resultado['rejeitados']} rejeitados de {resultado['total']} "
+          f"em {duracao:.1f}s ({resultado['total'] / duracao:,.0f} linhas/s)")
+
+if __name__ == "__main__":
+    main()
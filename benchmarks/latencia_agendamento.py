@@ -0,0 +1,189 @@
+"""
+Latência do agendamento (POST /consultas) com um servidor SMTP lento, nos dois
+modos de notificação:
+
+- na requisição: o e-mail é entregue ao SMTP antes de a rota responder, como era
+  antes da outbox
+- outbox: a notificação é gravada na transação da consulta e enviada depois, em
+  lote e por uma única conexão (processar_lote)
+
+A aplicação roda no próprio processo (ASGI, sem rede) sobre DATABASE_URL ou, se
+não definida, um SQLite temporário; o SMTP é o servidor local de
+benchmarks/servidor_smtp.py, com --atraso segundos por mensagem. As tabelas do
+banco são recriadas a cada modo.
+
+    python benchmarks/latencia_agendamento.py --agendamentos 200 --concorrencia 8 --atraso 0.2
+
+Para cada modo são informados vazão e p50/p95/p99; no modo outbox, também o
+tempo para esvaziar a fila e quantas conexões SMTP foram abertas. No SQLite há um
+único escritor por vez: com concorrência, a cauda do modo outbox passa a ser a
+espera pelo lock de escrita do banco, e não mais o SMTP.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+_diretorio = tempfile.mkdtemp(prefix="latencia-agendamento-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_diretorio}/clinica.db")
+os.environ["OUTBOX_WORKER_HABILITADO"] = "false"
+os.environ["HASH_PROCESSOS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["SMTP_USERNAME"] = ""
+os.environ.setdefault("EMAIL_FROM", "clinica@benchmark.com.br")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from sqlalchemy import event
+
+from app.main import app
+from app.auth import create_user_token
+from app.config import settings
+from app.database import engine, SessionLocal
+from app.models.usuario import Base, Usuario, TipoUsuario
+from app.models.medico import Medico
+from app.models.paciente import Paciente, Sexo, TipoContato
+from app.routes import consultas as rotas_consultas
+from app.services.consulta_service import cache_disponibilidade
+from app.services.email_service import ConexaoSMTP, enviar_notificacao_consulta
+from app.services.notificacao_service import processar_lote
+from servidor_smtp import ServidorSMTP
+
+API = settings.API_PREFIX
+
+def percentil(valores, p: float) -> float:
+    """Percentil pelo método do posto mais próximo (valores já ordenados)."""
+    if not valores:
+        return 0.0
+    posicao = max(int(round(p / 100 * len(valores) + 0.5)) - 1, 0)
+    return valores[min(posicao, len(valores) - 1)]
+
+def enviar_na_requisicao(db, consulta_detalhada: dict, paciente_email: str):
+    """Substitui enfileirar_notificacao_consulta: como antes da outbox, o e-mail é
+    entregue logo após o commit, dentro da requisição."""
+    if not paciente_email:
+        return
+
+    def enviar(sessao):
+        enviar_notificacao_consulta(
+            paciente_email,
+            consulta_detalhada["paciente_nome"],
+            consulta_detalhada["medico_nome"],
+            consulta_detalhada["medico_especialidade"],
+            consulta_detalhada["data_consulta"],
+            consulta_detalhada["hora_consulta"]
+        )
+
+    event.listen(db, "after_commit", enviar, once=True)
+
+def preparar_clinica(medicos: int, agendamentos: int):
+    """Recria o banco com um administrador, os médicos e um paciente por agendamento."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    cache_disponibilidade.limpar()
+    with SessionLocal() as db:
+        admin = Usuario(nome="Administrador", email="admin@benchmark.com.br", senha_hash="-", tipo=TipoUsuario.ADMINISTRADOR)
+        db.add(admin)
+        for i in range(medicos):
+            usuario = Usuario(nome=f"Médico {i}", email=f"medico{i}@benchmark.com.br", senha_hash="-", tipo=TipoUsuario.MEDICO)
+            db.add(usuario)
+            db.flush()
+            db.add(Medico(
+                usuario_id=usuario.id, crm=f"{i:06d}-SP", especialidade="Clínica Geral", telefone="11999990000",
+                data_nascimento=date(1980, 1, 1), cpf=f"{i:011d}", horario_inicio_atendimento="08:00",
+                horario_fim_atendimento="18:00", dias_atendimento="1,2,3,4,5", tempo_consulta=30
+            ))
+        for i in range(agendamentos):
+            db.add(Paciente(
+                nome=f"Paciente {i}", cpf=f"{80000000000 + i:011d}", data_nascimento=date(1990, 1, 1),
+                sexo=Sexo.FEMININO, telefone="11988880000", tipo_contato=TipoContato.CELULAR,
+                email=f"paciente{i}@benchmark.com.br"
+            ))
+        db.commit()
+        medico_ids = [medico.id for medico in db.query(Medico.id).order_by(Medico.id)]
+        paciente_ids = [paciente.id for paciente in db.query(Paciente.id).order_by(Paciente.id)]
+        return create_user_token(admin)["access_token"], medico_ids, paciente_ids
+
+def horarios_livres(medico_ids):
+    """Horários distintos (médico, dia útil, hora) a partir de amanhã, sem repetição."""
+    dia = date.today() + timedelta(days=1)
+    while True:
+        if dia.weekday() < 5:
+            for minutos in range(8 * 60, 18 * 60, 30):
+                for medico_id in medico_ids:
+                    yield medico_id, dia, f"{minutos // 60:02d}:{minutos % 60:02d}:00"
+        dia += timedelta(days=1)
+
+async def agendar(token: str, medico_ids, paciente_ids, concorrencia: int):
+    cabecalhos = {"Authorization": f"Bearer {token}"}
+    corpos = [
+        {"medico_id": medico_id, "paciente_id": paciente_id, "data_consulta": dia.isoformat(), "hora_consulta": hora}
+        for paciente_id, (medico_id, dia, hora) in zip(paciente_ids, horarios_livres(medico_ids))
+    ]
+    latencias = []
+    erros = 0
+    vagas = asyncio.Semaphore(concorrencia)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as cliente:
+        async def enviar(corpo):
+            nonlocal erros
+            async with vagas:
+                inicio = time.perf_counter()
+                resposta = await cliente.post(f"{API}/consultas/", json=corpo, headers=cabecalhos)
+                latencias.append(time.perf_counter() - inicio)
+                erros += resposta.status_code != 200
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(enviar(corpo) for corpo in corpos))
+        duracao = time.perf_counter() - inicio
+    return sorted(latencias), erros, duracao
+
+def esvaziar_outbox():
+    inicio = time.perf_counter()
+    with SessionLocal() as db, ConexaoSMTP() as conexao:
+        while processar_lote(db, conexao) == settings.OUTBOX_TAMANHO_LOTE:
+            pass
+    return time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agendamentos", type=int, default=200)
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--medicos", type=int, default=20)
+    parser.add_argument("--atraso", type=float, default=0.2, help="segundos que o SMTP leva por mensagem")
+    args = parser.parse_args()
+
+    enfileirar = rotas_consultas.enfileirar_notificacao_consulta
+    modos = (("na requisição", enviar_na_requisicao), ("outbox", enfileirar))
+    print(f"{args.agendamentos} agendamentos, concorrência {args.concorrencia}, SMTP com {args.atraso * 1000:.0f} ms por mensagem\n")
+    print(f"{'modo':15} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erros':>6}")
+
+    with ServidorSMTP(atraso=args.atraso) as servidor:
+        settings.SMTP_SERVER, settings.SMTP_PORT = servidor.host, servidor.porta
+        for nome, notificar in modos:
+            token, medico_ids, paciente_ids = preparar_clinica(args.medicos, args.agendamentos)
+            rotas_consultas.enfileirar_notificacao_consulta = notificar
+            try:
+                latencias, erros, duracao = asyncio.run(agendar(token, medico_ids, paciente_ids, args.concorrencia))
+            finally:
+                rotas_consultas.enfileirar_notificacao_consulta = enfileirar
+            print(
+                f"{nome:15} {len(latencias) / duracao:8.1f} {percentil(latencias, 50) * 1000:9.1f} "
+                f"{percentil(latencias, 95) * 1000:9.1f} {percentil(latencias, 99) * 1000:9.1f} {erros:6d}"
+            )
+
+        conexoes = servidor.conexoes
+        enviadas = len(servidor.mensagens)
+        duracao = esvaziar_outbox()
+        print(
+            f"\nOutbox esvaziada em {duracao:.1f}s: {len(servidor.mensagens) - enviadas} mensagens "
+            f"em {servidor.conexoes - conexoes} conexão(ões) SMTP"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Confere com EXPLAIN o plano das consultas mais frequentes da aplicação e falha
+(código de saída 1) se alguma delas ler uma tabela grande inteira (Seq Scan no
+PostgreSQL, SCAN no SQLite). As mesmas verificações rodam nos testes
+(tests/test_planos.py, sobre uma clínica pequena no SQLite); aqui elas servem para
+conferir os planos com volume real, sobre a clínica de benchmarks/gerador_clinica.py.
+
+    python benchmarks/gerador_clinica.py --limpar
+    python benchmarks/planos_consultas.py
+    python benchmarks/planos_consultas.py --verbose   # mostra os planos completos
+
+As instruções não são reescritas aqui: cada verificação chama a função da
+aplicação, captura o SQL enviado ao banco (com os parâmetros) e pede o plano de
+cada instrução capturada.
+"""
+import argparse
+import json
+import re
+import sys
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, func, text
+
+from app.config import settings
+from app.database import engine, SessionLocal
+from app.models.consulta import Consulta as ConsultaModel, StatusConsulta
+from app.models.medico import Medico as MedicoModel
+from app.models.prontuario import Prontuario as ProntuarioModel
+from app.services.consulta_service import (
+    query_consultas_detalhadas, filtrar_consultas, ORDENACAO_CONSULTAS, existe_conflito_horario,
+    horarios_livres_dia, calcular_disponibilidade_periodo, invalidar_disponibilidade
+)
+from app.services.lembrete_service import buscar_lote_candidatos, filtro_candidatos
+from app.services.medico_service import agenda_do_medico
+from app.services.prontuario_service import timeline_paciente
+
+TAMANHO_PAGINA = 50
+
+def _listagem(db, **filtros):
+    return filtrar_consultas(query_consultas_detalhadas(db), **filtros).\
+        order_by(*ORDENACAO_CONSULTAS).limit(TAMANHO_PAGINA).all()
+
+def _horarios_livres(db, amostra):
+    medico = db.get(MedicoModel, amostra["medico_id"])
+    invalidar_disponibilidade(medico.id, amostra["dia"])
+    return horarios_livres_dia(db, medico.id, agenda_do_medico(medico), amostra["dia"])
+
+def _grade_disponibilidade(db, amostra):
+    medico = db.get(MedicoModel, amostra["medico_id"])
+    dias = [amostra["dia"] + timedelta(days=i) for i in range(7)]
+    invalidar_disponibilidade(medico.id, *dias)
+    return calcular_disponibilidade_periodo(db, [medico], dias[0], dias[-1])
+
+# (nome, tabelas que não podem ser lidas inteiras, chamada da aplicação)
+CONSULTAS_QUENTES = (
+    ("conflito de horário", {"consultas"}, lambda db, a: existe_conflito_horario(
+        db, a["medico_id"], a["dia"], a["hora"], a["tempo_consulta"])),
+    ("horários livres do dia", {"consultas"}, _horarios_livres),
+    ("grade de disponibilidade da semana", {"consultas"}, _grade_disponibilidade),
+    ("consultas do médico no período", {"consultas"}, lambda db, a: _listagem(
+        db, data_inicio=a["dia"], data_fim=a["dia"] + timedelta(days=30), medico_id=a["medico_id"])),
+    ("consultas do período", {"consultas"}, lambda db, a: _listagem(
+        db, data_inicio=a["dia"], data_fim=a["dia"] + timedelta(days=7))),
+    ("consultas do paciente", {"consultas"}, lambda db, a: _listagem(db, paciente_id=a["paciente_id"])),
+    ("linha do tempo do paciente", {"consultas", "prontuarios"}, lambda db, a: timeline_paciente(
+        db, a["paciente_id"], TAMANHO_PAGINA)),
+    ("lembretes pendentes (lote)", {"consultas"}, lambda db, a: buscar_lote_candidatos(
+        db, a["amanha"], 0, settings.LEMBRETES_TAMANHO_LOTE)),
+    ("lembretes pendentes (total)", {"consultas"}, lambda db, a: db.query(func.count(ConsultaModel.id)).
+        filter(*filtro_candidatos(a["amanha"])).scalar()),
+    ("médico do usuário", {"medicos"}, lambda db, a: db.query(MedicoModel.id).
+        filter(MedicoModel.usuario_id == a["usuario_id"]).scalar()),
+    ("prontuário da consulta", {"prontuarios"}, lambda db, a: db.query(ProntuarioModel.id).
+        filter(ProntuarioModel.consulta_id == a["consulta_com_prontuario"]).first()),
+)
+
+@contextmanager
+def capturar_instrucoes():
+    instrucoes = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            instrucoes.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        yield instrucoes
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+
+def _nos_postgresql(no):
+    yield no
+    for filho in no.get("Plans", []):
+        yield from _nos_postgresql(filho)
+
+def leituras_completas(db, statement, parameters, tabelas):
+    """Tabelas de `tabelas` lidas inteiras pela instrução, e o plano em texto."""
+    conexao = db.connection()
+    if conexao.dialect.name == "postgresql":
+        plano = conexao.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        if isinstance(plano, str):
+            plano = json.loads(plano)
+        nos = list(_nos_postgresql(plano[0]["Plan"]))
+        completas = {no["Relation Name"] for no in nos if no["Node Type"] == "Seq Scan"} & tabelas
+        descricao = [f"{no['Node Type']} {no.get('Relation Name', '')} {no.get('Index Name', '')}".strip() for no in nos]
+    else:
+        linhas = conexao.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        descricao = [linha[-1] for linha in linhas]
+        completas = {
+            encontrado.group(1) for encontrado in (re.match(r"SCAN (\w+)", detalhe) for detalhe in descricao)
+            if encontrado
+        } & tabelas
+    return completas, descricao
+
+def amostrar(db):
+    """Valores reais da clínica gerada para os parâmetros das consultas."""
+    hoje = date.today()
+    consulta = db.query(ConsultaModel).filter(
+        ConsultaModel.data_consulta >= hoje, ConsultaModel.status != StatusConsulta.CANCELADA
+    ).order_by(ConsultaModel.data_consulta, ConsultaModel.id).first()
+    if consulta is None:
+        return None
+    medico = db.get(MedicoModel, consulta.medico_id)
+    return {
+        "medico_id": medico.id,
+        "usuario_id": medico.usuario_id,
+        "tempo_consulta": medico.tempo_consulta,
+        "paciente_id": consulta.paciente_id,
+        "dia": consulta.data_consulta,
+        "hora": consulta.hora_consulta,
+        "amanha": hoje + timedelta(days=1),
+        "consulta_com_prontuario": db.query(ProntuarioModel.consulta_id).order_by(ProntuarioModel.id.desc()).limit(1).scalar(),
+    }
+
+def verificar_planos(db, amostra):
+    """
+    Para cada consulta quente: (nome, tabelas lidas inteiras, planos de cada instrução
+    capturada). Sem instruções capturadas, a lista de planos vem vazia.
+    """
+    for nome, tabelas, chamada in CONSULTAS_QUENTES:
+        with capturar_instrucoes() as instrucoes:
+            chamada(db, amostra)
+        completas = set()
+        planos = []
+        for statement, parameters in instrucoes:
+            lidas, descricao = leituras_completas(db, statement, parameters, tabelas)
+            completas |= lidas
+            planos.append(descricao)
+        yield nome, completas, planos
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="mostra o plano de cada instrução")
+    args = parser.parse_args()
+
+    falhas = 0
+    with SessionLocal() as db:
+        # Estatísticas atualizadas: logo após a geração, o planejador ainda não conhece as tabelas
+        db.execute(text("ANALYZE"))
+        amostra = amostrar(db)
+        if amostra is None:
+            sys.exit("Nenhuma consulta futura encontrada; gere os dados com benchmarks/gerador_clinica.py")
+
+        for nome, completas, planos in verificar_planos(db, amostra):
+            if not planos:
+                print(f"??    {nome}: nenhuma instrução capturada")
+                falhas += 1
+                continue
+
+            situacao = "FALHA" if completas else "ok"
+            falhas += bool(completas)
+            print(f"{situacao:5} {nome}" + (f": leitura completa de {', '.join(sorted(completas))}" if completas else ""))
+            if args.verbose or completas:
+                for descricao in planos:
+                    for linha in descricao:
+                        print(f"        {linha}")
+        db.rollback()
+
+    print(f"\n{len(CONSULTAS_QUENTES) - falhas}/{len(CONSULTAS_QUENTES)} consultas com planos indexados ({engine.url.get_backend_name()})")
+    sys.exit(1 if falhas else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compara o custo de CPU por requisição das listas grandes nos dois caminhos de resposta:
+
+- padrão: validação pelo response_model (pydantic) + jsonable_encoder + JSONResponse
+- rápido (SERIALIZACAO_RAPIDA): os dicts das linhas codificados direto com ORJSONResponse
+
+Não usa banco nem HTTP, só as linhas no formato devolvido pelas consultas:
+
+    python benchmarks/serializacao.py --linhas 100 --repeticoes 2000
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import date, datetime, time as hora
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import parse_obj_as
+
+from app.schemas.consulta import ConsultaDetalhada
+from app.schemas.medico import MedicoCompleto
+
+def linhas_consultas(quantidade: int):
+    return [
+        {
+            "id": i,
+            "paciente_id": 1000 + i,
+            "medico_id": 1 + i % 20,
+            "data_consulta": date(2026, 10, 1 + i % 28),
+            "hora_consulta": hora(8 + i % 10, 30 * (i % 2)),
+            "problema_saude": "Dor no peito" if i % 2 else None,
+            "status": "agendada",
+            "observacoes": "Retorno com exames" if i % 3 else None,
+            "lembrete_enviado": False,
+            "notificacao_enviada": bool(i % 2),
+            "data_criacao": datetime(2026, 9, 1, 10, 0, i % 60),
+            "data_atualizacao": None,
+            "paciente_nome": f"Paciente {i}",
+            "paciente_cpf": f"{20000000000 + i}",
+            "medico_nome": f"Dr. Médico {i % 20}",
+            "medico_especialidade": "Cardiologia"
+        }
+        for i in range(quantidade)
+    ]
+
+def linhas_medicos(quantidade: int):
+    return [
+        {
+            "id": i,
+            "usuario_id": 500 + i,
+            "crm": f"CRM/SP {100000 + i}",
+            "especialidade": "Cardiologia",
+            "telefone": "(11) 91234-5678",
+            "data_nascimento": date(1980, 1, 1 + i % 28),
+            "cpf": f"{10000000000 + i}",
+            "horario_inicio_atendimento": "08:00",
+            "horario_fim_atendimento": "18:00",
+            "dias_atendimento": "1,2,3,4,5",
+            "tempo_consulta": 30,
+            "data_criacao": datetime(2026, 1, 1, 9, 0),
+            "data_atualizacao": None,
+            "nome": f"Dr. Médico {i}",
+            "email": f"medico{i}@clinica.com",
+            "foto_perfil": None,
+            "ativo": True
+        }
+        for i in range(quantidade)
+    ]
+
+def padrao(schema, linhas):
+    validadas = parse_obj_as(List[schema], linhas)
+    return JSONResponse(jsonable_encoder(validadas)).body
+
+def rapido(schema, linhas):
+    return ORJSONResponse(linhas).body
+
+def medir(funcao, schema, linhas, repeticoes: int):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.process_time()
+        funcao(schema, linhas)
+        tempos.append(time.process_time() - inicio)
+    tempos.sort()
+    return statistics.mean(tempos), tempos[int(len(tempos) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100, help="linhas por página")
+    parser.add_argument("--repeticoes", type=int, default=2000)
+    args = parser.parse_args()
+
+    casos = [
+        ("ConsultaDetalhada", ConsultaDetalhada, linhas_consultas(args.linhas)),
+        ("MedicoCompleto", MedicoCompleto, linhas_medicos(args.linhas)),
+    ]
+    print(f"{'lista':<20}{'caminho':<10}{'média (ms)':>12}{'p95 (ms)':>12}")
+    for nome, schema, linhas in casos:
+        resultados = {}
+        for caminho, funcao in (("padrão", padrao), ("rápido", rapido)):
+            funcao(schema, linhas)  # aquecimento
+            media, p95 = medir(funcao, schema, linhas, args.repeticoes)
+            resultados[caminho] = media
+            print(f"{nome:<20}{caminho:<10}{media * 1000:>12.3f}{p95 * 1000:>12.3f}")
+        print(f"{'':<20}{'ganho':<10}{resultados['padrão'] / resultados['rápido']:>11.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Servidor SMTP local para testes e benchmarks: aceita as mensagens sem entregá-las e
+as guarda em memória. Simula um servidor lento (--atraso, por mensagem) e, nos
+testes, falhas de sessão: destinatários em `fora_de_ordem` recebem um erro seguido
+de uma resposta extra, que dessincroniza a conexão do cliente; em `falhas`, um
+destinatário mapeado para N recebe um erro temporário nas N primeiras mensagens.
+
+    python benchmarks/servidor_smtp.py --porta 2525 --atraso 0.2
+    SMTP_SERVER=127.0.0.1 SMTP_PORT=2525 uvicorn app.main:app
+"""
+import argparse
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from email.policy import default as politica_padrao
+
+class _SessaoSMTP(socketserver.StreamRequestHandler):
+    def _responder(self, *linhas: str):
+        self.wfile.write("".join(f"{linha}\r\n" for linha in linhas).encode())
+
+    def _ler_dados(self) -> bytes:
+        linhas = []
+        while True:
+            linha = self.rfile.readline()
+            if not linha or linha == b".\r\n":
+                return b"".join(linhas)
+            # Transparência do SMTP: linhas iniciadas por "." chegam com um ponto a mais
+            linhas.append(linha[1:] if linha.startswith(b"..") else linha)
+
+    def handle(self):
+        servidor = self.server.smtp
+        servidor.registrar_conexao()
+        self._responder("220 smtp-local ESMTP")
+        destinatarios = []
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode("latin-1").strip()
+            verbo = comando[:4].upper()
+            if verbo == "EHLO":
+                self._responder("250-smtp-local", "250 8BITMIME")
+            elif verbo in ("HELO", "NOOP"):
+                self._responder("250 OK")
+            elif verbo in ("MAIL", "RSET"):
+                destinatarios = []
+                self._responder("250 OK")
+            elif verbo == "RCPT":
+                destinatarios.append(comando.split(":", 1)[1].strip().strip("<>"))
+                self._responder("250 OK")
+            elif verbo == "DATA":
+                self._responder("354 Termine com <CRLF>.<CRLF>")
+                dados = self._ler_dados()
+                if servidor.atraso:
+                    time.sleep(servidor.atraso)
+                if set(destinatarios) & servidor.fora_de_ordem:
+                    self._responder("451 4.3.0 Falha temporaria", "250 2.0.0 Resposta fora de ordem")
+                elif servidor.consumir_falha(destinatarios):
+                    self._responder("451 4.3.0 Tente novamente")
+                else:
+                    servidor.guardar(destinatarios, dados)
+                    self._responder("250 2.0.0 Aceita")
+                destinatarios = []
+            elif verbo == "QUIT":
+                self._responder("221 Ate logo")
+                return
+            else:
+                self._responder("502 Comando nao implementado")
+
+class _ServidorTCP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class ServidorSMTP:
+    """Servidor SMTP em uma thread; use como context manager ou com iniciar()/parar()."""
+
+    def __init__(self, host: str = "127.0.0.1", porta: int = 0, atraso: float = 0.0):
+        self.atraso = atraso
+        self.fora_de_ordem = set()
+        self.falhas = {}
+        self.mensagens = []
+        self.conexoes = 0
+        self._lock = threading.Lock()
+        self._tcp = _ServidorTCP((host, porta), _SessaoSMTP)
+        self._tcp.smtp = self
+        self.host, self.porta = self._tcp.server_address
+        self._thread = None
+
+    def registrar_conexao(self):
+        with self._lock:
+            self.conexoes += 1
+
+    def consumir_falha(self, destinatarios) -> bool:
+        with self._lock:
+            for destinatario in destinatarios:
+                if self.falhas.get(destinatario, 0) > 0:
+                    self.falhas[destinatario] -= 1
+                    return True
+        return False
+
+    def guardar(self, destinatarios, dados: bytes):
+        mensagem = message_from_bytes(dados, policy=politica_padrao)
+        with self._lock:
+            self.mensagens.append((tuple(destinatarios), mensagem))
+
+    def destinatarios(self):
+        with self._lock:
+            return [destinatario for destinatarios, _ in self.mensagens for destinatario in destinatarios]
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._tcp.serve_forever, name="smtp-local", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._tcp.shutdown()
+        self._tcp.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *args):
+        self.parar()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=2525)
+    parser.add_argument("--atraso", type=float, default=0.0, help="segundos de espera por mensagem")
+    args = parser.parse_args()
+
+    with ServidorSMTP(args.host, args.porta, args.atraso) as servidor:
+        print(f"SMTP local em {servidor.host}:{servidor.porta} (atraso de {args.atraso}s por mensagem); Ctrl+C encerra")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"{len(servidor.mensagens)} mensagens recebidas em {servidor.conexoes} conexões")
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
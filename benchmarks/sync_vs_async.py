@@ -0,0 +1,118 @@
+"""
+Compara o modo síncrono e o assíncrono (DB_ASYNC) da API sob alta concorrência.
+
+Suba duas instâncias apontando para o mesmo banco, por exemplo:
+
+    DB_ASYNC=false uvicorn app.main:app --port 8001 --workers 1
+    DB_ASYNC=true  uvicorn app.main:app --port 8002 --workers 1
+
+e execute:
+
+    python benchmarks/sync_vs_async.py \\
+        --url http://localhost:8001 --url http://localhost:8002 \\
+        --email admin@clinica.com --senha admin --medico-id 1 \\
+        --concorrencia 200 --requisicoes 5000
+
+Para cada instância e rota são informados requisições/s, p50, p99 e erros.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method="inclusive")[p - 1]
+
+def rotas_padrao(args):
+    dia = date.today() + timedelta(days=1)
+    return {
+        "consultas": ("GET", "/consultas/?limit=50", None),
+        "disponibilidade": ("GET", f"/consultas/agenda/disponibilidade?medico_id={args.medico_id}&data_consulta={dia}", None),
+        "pacientes": ("GET", "/pacientes/?nome=a&limit=50", None),
+        "login": ("POST", "/auth/login", {"username": args.email, "password": args.senha}),
+    }
+
+async def autenticar(cliente: httpx.AsyncClient, prefixo: str, email: str, senha: str) -> str:
+    resposta = await cliente.post(f"{prefixo}/auth/login", data={"username": email, "password": senha})
+    resposta.raise_for_status()
+    return resposta.json()["access_token"]
+
+async def medir_rota(cliente, prefixo, metodo, caminho, formulario, cabecalhos, concorrencia, total):
+    latencias = []
+    erros = 0
+    fila = iter(range(total))
+
+    async def trabalhador():
+        nonlocal erros
+        for _ in fila:
+            inicio = time.perf_counter()
+            try:
+                if metodo == "POST":
+                    resposta = await cliente.post(f"{prefixo}{caminho}", data=formulario)
+                else:
+                    resposta = await cliente.get(f"{prefixo}{caminho}", headers=cabecalhos)
+                if resposta.status_code >= 400:
+                    erros += 1
+            except httpx.HTTPError:
+                erros += 1
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    return {
+        "requisicoes_por_segundo": total / duracao,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "erros": erros,
+    }
+
+async def medir_instancia(url, args):
+    limites = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=args.timeout) as cliente:
+        token = await autenticar(cliente, args.prefixo, args.email, args.senha)
+        cabecalhos = {"Authorization": f"Bearer {token}"}
+        resultados = {}
+        for nome, (metodo, caminho, formulario) in rotas_padrao(args).items():
+            if args.rotas and nome not in args.rotas:
+                continue
+            # Aquecimento: pools de conexão e caches preenchidos antes da medição
+            await medir_rota(cliente, args.prefixo, metodo, caminho, formulario, cabecalhos, args.concorrencia, args.concorrencia)
+            total = args.requisicoes if metodo == "GET" else max(args.requisicoes // 10, 1)
+            resultados[nome] = await medir_rota(
+                cliente, args.prefixo, metodo, caminho, formulario, cabecalhos, args.concorrencia, total
+            )
+        return resultados
+
+def imprimir(url, resultados):
+    print(f"\n{url}")
+    print(f"{'rota':<18}{'req/s':>10}{'p50 (ms)':>12}{'p99 (ms)':>12}{'erros':>8}")
+    for nome, r in resultados.items():
+        print(f"{nome:<18}{r['requisicoes_por_segundo']:>10.1f}{r['p50_ms']:>12.1f}{r['p99_ms']:>12.1f}{r['erros']:>8}")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", required=True, help="URL base de uma instância (repita para comparar)")
+    parser.add_argument("--prefixo", default="/api")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--senha", required=True)
+    parser.add_argument("--medico-id", type=int, default=1)
+    parser.add_argument("--concorrencia", type=int, default=200)
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--rotas", nargs="*", help="consultas, disponibilidade, pacientes, login")
+    args = parser.parse_args()
+
+    for url in args.url:
+        imprimir(url, await medir_instancia(url, args))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+# tests/conftest.py
+"""
+Os testes usam um banco SQLite temporário (ou TESTES_DATABASE_URL, para rodar contra
+um PostgreSQL descartável) e chamam a aplicação pelo httpx, sem servidor. O esquema
+é recriado a cada teste.
+
+    python -m pytest -q
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+_diretorio = tempfile.mkdtemp(prefix="clinica-testes-")
+# As configurações são lidas na importação de app.config, então vêm antes dela
+os.environ["DATABASE_URL"] = os.getenv("TESTES_DATABASE_URL", f"sqlite:///{_diretorio}/testes.db")
+os.environ["OUTBOX_WORKER_HABILITADO"] = "false"
+os.environ["HASH_PROCESSOS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["DB_REPLICAS_URLS"] = ""
+os.environ["DB_ASYNC"] = "false"
+
+from datetime import date, time, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.main import app
+from app.config import settings
+from app.auth import cache_principais, create_user_token
+from app.database import engine, SessionLocal
+from app.models.usuario import Base, Usuario as UsuarioModel, TipoUsuario
+from app.models.medico import Medico as MedicoModel
+from app.models.consulta import Consulta as ConsultaModel, StatusConsulta
+from app.models.paciente import Paciente as PacienteModel, Sexo, TipoContato
+from app.services.consulta_service import cache_disponibilidade
+from app.services.medico_service import diretorio_medicos
+from app.utils.security import pool_hashing
+from benchmarks.servidor_smtp import ServidorSMTP
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+def banco():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    cache_principais.limpar()
+    cache_disponibilidade.limpar()
+    diretorio_medicos.invalidar()
+    yield
+    engine.dispose()
+
+@pytest.fixture
+def db():
+    with SessionLocal() as sessao:
+        yield sessao
+
+@pytest.fixture
+def contar_instrucoes():
+    """Context manager que acumula as instruções SQL enviadas ao banco enquanto está aberto."""
+    @contextmanager
+    def contar():
+        instrucoes = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            instrucoes.append(statement)
+
+        event.listen(engine, "before_cursor_execute", registrar)
+        try:
+            yield instrucoes
+        finally:
+            event.remove(engine, "before_cursor_execute", registrar)
+    return contar
+
+@pytest.fixture
+async def cliente():
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://testes") as cliente:
+        yield cliente
+
+@pytest.fixture
+def servidor_smtp(monkeypatch):
+    """SMTP local (benchmarks/servidor_smtp.py) configurado como servidor da aplicação."""
+    with ServidorSMTP() as servidor:
+        monkeypatch.setattr(settings, "SMTP_SERVER", servidor.host)
+        monkeypatch.setattr(settings, "SMTP_PORT", servidor.porta)
+        monkeypatch.setattr(settings, "SMTP_USERNAME", "")
+        monkeypatch.setattr(settings, "EMAIL_FROM", "clinica@testes.com.br")
+        yield servidor
+
+def proxima_segunda() -> date:
+    hoje = date.today()
+    return hoje + timedelta(days=7 - hoje.weekday())
+
+@pytest.fixture
+def criar_usuario(db):
+    def criar(nome="Administrador", email="admin@testes.com.br", tipo=TipoUsuario.ADMINISTRADOR, senha="senha123"):
+        usuario = UsuarioModel(
+            nome=nome, email=email, tipo=tipo, ativo=True, senha_hash=pool_hashing.gerar_hash(senha)
+        )
+        db.add(usuario)
+        db.commit()
+        return usuario
+    return criar
+
+def cabecalhos(usuario) -> dict:
+    return {"Authorization": f"Bearer {create_user_token(usuario)['access_token']}"}
+
+@pytest.fixture
+def admin(criar_usuario):
+    """Cabeçalhos de autenticação de um administrador."""
+    return cabecalhos(criar_usuario())
+
+@pytest.fixture
+def criar_medico(db, criar_usuario):
+    contador = iter(range(1, 10000))
+
+    def criar(nome=None, tempo_consulta=30, dias_atendimento="1,2,3,4,5", inicio="08:00", fim="18:00"):
+        numero = next(contador)
+        usuario = criar_usuario(
+            nome=nome or f"Médico {numero}", email=f"medico{numero}@testes.com.br", tipo=TipoUsuario.MEDICO
+        )
+        medico = MedicoModel(
+            usuario_id=usuario.id,
+            crm=f"{numero:06d}-SP",
+            especialidade="Clínica Geral",
+            telefone="11999990000",
+            data_nascimento=date(1980, 1, 1),
+            cpf=f"{numero:011d}",
+            horario_inicio_atendimento=inicio,
+            horario_fim_atendimento=fim,
+            dias_atendimento=dias_atendimento,
+            tempo_consulta=tempo_consulta
+        )
+        db.add(medico)
+        db.commit()
+        return medico
+    return criar
+
+@pytest.fixture
+def criar_paciente(db):
+    contador = iter(range(1, 100000))
+
+    def criar(nome=None, email=None, telefone="(11) 98888-0000"):
+        numero = next(contador)
+        paciente = PacienteModel(
+            nome=nome or f"Paciente {numero}",
+            cpf=f"{90000000000 + numero:011d}",
+            data_nascimento=date(1990, 1, 1),
+            sexo=Sexo.FEMININO,
+            telefone=telefone,
+            tipo_contato=TipoContato.CELULAR,
+            email=email
+        )
+        db.add(paciente)
+        db.commit()
+        return paciente
+    return criar
+
+@pytest.fixture
+def criar_consulta(db):
+    def criar(medico, paciente, data_consulta, hora_consulta=time(9, 0), status=StatusConsulta.AGENDADA):
+        consulta = ConsultaModel(
+            paciente_id=paciente.id,
+            medico_id=medico.id,
+            data_consulta=data_consulta,
+            hora_consulta=hora_consulta,
+            status=status
+        )
+        db.add(consulta)
+        db.commit()
+        return consulta
+    return criar
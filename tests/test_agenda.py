@@ -0,0 +1,49 @@
+# tests/test_agenda.py
+from datetime import time, timedelta
+
+import pytest
+
+from app.services.consulta_service import hora_para_minutos
+from app.services.medico_service import agenda_do_medico, compilar_agenda
+
+from conftest import proxima_segunda
+
+# Segunda a domingo, a partir da próxima segunda-feira
+SEMANA = [proxima_segunda() + timedelta(days=n) for n in range(7)]
+
+@pytest.mark.parametrize("dias_atendimento, atende", [
+    ("1,2,3,4,5", [True, True, True, True, True, False, False]),
+    ("0,6", [False, False, False, False, False, True, True]),
+    ("1,3,5", [True, False, True, False, True, False, False]),
+])
+def test_dias_gravados_usam_0_para_domingo(criar_medico, dias_atendimento, atende):
+    medico = criar_medico(dias_atendimento=dias_atendimento)
+
+    agenda = agenda_do_medico(medico)
+
+    assert [agenda.atende_em(dia) for dia in SEMANA] == atende
+
+def test_consulta_precisa_caber_no_horario_de_atendimento():
+    agenda = compilar_agenda("1,2,3,4,5", "08:00", "18:00", 30)
+
+    assert agenda.horario_valido(hora_para_minutos(time(8, 0)))
+    assert agenda.horario_valido(hora_para_minutos(time(17, 30)))
+    assert not agenda.horario_valido(hora_para_minutos(time(17, 45)))
+    assert not agenda.horario_valido(hora_para_minutos(time(7, 59)))
+
+@pytest.mark.parametrize("dias_atendimento, inicio, fim", [
+    ("1,7", "08:00", "18:00"),
+    ("", "08:00", "18:00"),
+    ("1,2", "18:00", "08:00"),
+    ("1,2", "8h", "18:00"),
+])
+def test_configuracao_invalida_e_rejeitada(dias_atendimento, inicio, fim):
+    with pytest.raises(ValueError):
+        compilar_agenda(dias_atendimento, inicio, fim, 30)
+
+def test_agenda_compilada_fica_em_cache(criar_medico):
+    primeiro = criar_medico()
+    segundo = criar_medico()
+
+    assert agenda_do_medico(primeiro) is agenda_do_medico(segundo)
+    assert compilar_agenda("1,2", "08:00", "12:00", 30) is not compilar_agenda("1,2", "08:00", "12:00", 20)
@@ -0,0 +1,125 @@
+# tests/test_agendamento.py
+import asyncio
+from collections import Counter
+from datetime import time
+
+import pytest
+
+from app.models.consulta import Consulta as ConsultaModel, StatusConsulta
+from conftest import proxima_segunda
+
+pytestmark = pytest.mark.anyio
+
+REQUISICOES_SIMULTANEAS = 200
+
+def _agendamento(medico, paciente, dia, hora="09:00:00"):
+    return {"medico_id": medico.id, "paciente_id": paciente.id, "data_consulta": dia.isoformat(), "hora_consulta": hora}
+
+async def test_agendamentos_simultaneos_no_mesmo_horario_so_um_vence(
+    cliente, admin, db, criar_medico, criar_paciente
+):
+    medico = criar_medico()
+    pacientes = [criar_paciente() for _ in range(REQUISICOES_SIMULTANEAS)]
+    dia = proxima_segunda()
+    corpos = [_agendamento(medico, paciente, dia) for paciente in pacientes]
+    await cliente.get("/api/consultas/?limit=1", headers=admin)
+
+    respostas = await asyncio.gather(*(cliente.post("/api/consultas/", json=corpo, headers=admin) for corpo in corpos))
+
+    assert Counter(resposta.status_code for resposta in respostas) == {200: 1, 400: REQUISICOES_SIMULTANEAS - 1}
+    assert db.query(ConsultaModel).filter(
+        ConsultaModel.medico_id == medico.id, ConsultaModel.status != StatusConsulta.CANCELADA
+    ).count() == 1
+
+async def test_horarios_sobrepostos_sao_recusados(cliente, admin, criar_medico, criar_paciente):
+    medico = criar_medico(tempo_consulta=30)
+    dia = proxima_segunda()
+
+    primeira = await cliente.post("/api/consultas/", json=_agendamento(medico, criar_paciente(), dia, "09:00:00"), headers=admin)
+    sobreposta = await cliente.post("/api/consultas/", json=_agendamento(medico, criar_paciente(), dia, "09:15:00"), headers=admin)
+    seguinte = await cliente.post("/api/consultas/", json=_agendamento(medico, criar_paciente(), dia, "09:30:00"), headers=admin)
+
+    assert [primeira.status_code, sobreposta.status_code, seguinte.status_code] == [200, 400, 200]
+
+async def test_reativar_consulta_cujo_horario_foi_remarcado_e_recusado(
+    cliente, admin, criar_medico, criar_paciente
+):
+    medico = criar_medico()
+    dia = proxima_segunda()
+    antiga = (await cliente.post("/api/consultas/", json=_agendamento(medico, criar_paciente(), dia), headers=admin)).json()
+    assert (await cliente.delete(f"/api/consultas/{antiga['id']}", headers=admin)).status_code == 204
+    nova = await cliente.post("/api/consultas/", json=_agendamento(medico, criar_paciente(), dia), headers=admin)
+    assert nova.status_code == 200
+
+    por_status = await cliente.patch(f"/api/consultas/{antiga['id']}/status?status=agendada", headers=admin)
+    por_edicao = await cliente.put(f"/api/consultas/{antiga['id']}", json={"status": "agendada"}, headers=admin)
+
+    assert por_status.status_code == 400
+    assert por_edicao.status_code == 400
+    atual = await cliente.get(f"/api/consultas/{antiga['id']}", headers=admin)
+    assert atual.json()["status"] == "cancelada"
+
+async def test_reativar_consulta_com_horario_livre(cliente, admin, criar_medico, criar_paciente):
+    medico = criar_medico()
+    consulta = (await cliente.post(
+        "/api/consultas/", json=_agendamento(medico, criar_paciente(), proxima_segunda()), headers=admin
+    )).json()
+    await cliente.delete(f"/api/consultas/{consulta['id']}", headers=admin)
+
+    resposta = await cliente.patch(f"/api/consultas/{consulta['id']}/status?status=agendada", headers=admin)
+
+    assert resposta.status_code == 200
+    assert resposta.json()["status"] == "agendada"
+
+async def test_trocar_de_medico_verifica_a_agenda_do_novo_medico(
+    cliente, admin, criar_medico, criar_paciente
+):
+    medico, outro_medico = criar_medico(), criar_medico()
+    dia = proxima_segunda()
+    consulta = (await cliente.post("/api/consultas/", json=_agendamento(medico, criar_paciente(), dia), headers=admin)).json()
+    ocupada = await cliente.post("/api/consultas/", json=_agendamento(outro_medico, criar_paciente(), dia), headers=admin)
+    assert ocupada.status_code == 200
+
+    conflito = await cliente.put(f"/api/consultas/{consulta['id']}", json={"medico_id": outro_medico.id}, headers=admin)
+    remarcada = await cliente.put(
+        f"/api/consultas/{consulta['id']}", json={"medico_id": outro_medico.id, "hora_consulta": "10:00:00"}, headers=admin
+    )
+
+    assert conflito.status_code == 400
+    assert remarcada.status_code == 200
+    assert remarcada.json()["medico_id"] == outro_medico.id
+    assert remarcada.json()["hora_consulta"] == time(10, 0).isoformat()
+
+async def test_lote_rejeita_so_os_itens_com_problema(cliente, admin, db, criar_medico, criar_paciente, criar_consulta):
+    medico, outro_medico = criar_medico(), criar_medico()
+    paciente = criar_paciente()
+    dia = proxima_segunda()
+    criar_consulta(medico, paciente, dia, time(9, 0))
+    itens = [
+        _agendamento(medico, paciente, dia, "08:00:00"),
+        _agendamento(medico, paciente, dia, "09:15:00"),   # sobrepõe a consulta das 09:00
+        _agendamento(medico, paciente, dia, "10:00:00"),
+        _agendamento(medico, paciente, dia, "10:15:00"),   # sobrepõe o item anterior do lote
+        {**_agendamento(medico, paciente, dia), "medico_id": 9999},
+        _agendamento(outro_medico, paciente, dia, "09:00:00"),
+        _agendamento(medico, paciente, dia, "10:30:00"),
+    ]
+
+    resposta = await cliente.post("/api/consultas/batch", json={"consultas": itens}, headers=admin)
+
+    assert resposta.status_code == 200
+    resultado = resposta.json()
+    assert (resultado["total"], resultado["criadas"], resultado["rejeitadas"]) == (7, 4, 3)
+    assert [item["indice"] for item in resultado["itens"]] == list(range(7))
+    assert [item["sucesso"] for item in resultado["itens"]] == [True, False, True, False, False, True, True]
+    assert [item["erro"] for item in resultado["itens"] if not item["sucesso"]] == [
+        "Horário não disponível para este médico",
+        "Horário não disponível para este médico",
+        "Médico não encontrado",
+    ]
+    # Cada consulta criada corresponde ao item de mesmo índice
+    for indice in (0, 2, 5, 6):
+        item = resultado["itens"][indice]
+        consulta = db.get(ConsultaModel, item["consulta_id"])
+        assert (consulta.medico_id, consulta.hora_consulta.isoformat()) == (itens[indice]["medico_id"], itens[indice]["hora_consulta"])
+    assert db.query(ConsultaModel).count() == 5
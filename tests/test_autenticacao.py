@@ -0,0 +1,63 @@
+# tests/test_autenticacao.py
+import os
+
+import pytest
+
+from app.auth import Principal, _codificar_principal, _decodificar_principal, cache_principais
+from app.models.usuario import TipoUsuario
+from app.utils.cache import CachePrincipais, CachePrincipaisRedis
+from conftest import cabecalhos
+
+REDIS_URL = os.environ.get("TESTES_REDIS_URL")
+
+def _principal(ativo=True):
+    return Principal(1, "ana@testes.com.br", "Ana", TipoUsuario.RECEPCIONISTA, ativo)
+
+def _cache_redis(prefixo="testes-principais"):
+    pytest.importorskip("redis")
+    cache = CachePrincipaisRedis(
+        REDIS_URL, ttl=60, codificar=_codificar_principal, decodificar=_decodificar_principal, prefixo=prefixo
+    )
+    cache.limpar()
+    return cache
+
+@pytest.fixture(params=["memoria", pytest.param("redis", marks=pytest.mark.skipif(
+    not REDIS_URL, reason="defina TESTES_REDIS_URL para testar o backend Redis"
+))])
+def cache(request):
+    if request.param == "redis":
+        return _cache_redis()
+    return CachePrincipais(100, ttl=60)
+
+def test_busca_iniciada_antes_da_invalidacao_nao_guarda_o_valor_antigo(cache):
+    geracao = cache.geracao("ana@testes.com.br")
+    # Enquanto a busca estava no banco, o usuário foi desativado
+    cache.invalidar("ana@testes.com.br")
+
+    cache.guardar("ana@testes.com.br", _principal(), geracao)
+
+    assert cache.obter("ana@testes.com.br") is None
+    cache.guardar("ana@testes.com.br", _principal(ativo=False), cache.geracao("ana@testes.com.br"))
+    assert cache.obter("ana@testes.com.br") == _principal(ativo=False)
+
+@pytest.mark.skipif(not REDIS_URL, reason="defina TESTES_REDIS_URL para testar o backend Redis")
+def test_invalidacao_vale_para_os_outros_processos():
+    processo_a, processo_b = _cache_redis(), _cache_redis()
+    processo_a.guardar("ana@testes.com.br", _principal(), processo_a.geracao("ana@testes.com.br"))
+    assert processo_b.obter("ana@testes.com.br") == _principal()
+
+    processo_b.invalidar("ana@testes.com.br")
+
+    assert processo_a.obter("ana@testes.com.br") is None
+
+@pytest.mark.anyio
+async def test_usuario_desativado_perde_o_acesso_imediatamente(cliente, admin, criar_usuario):
+    usuario = criar_usuario(nome="Ana", email="ana@testes.com.br", tipo=TipoUsuario.RECEPCIONISTA)
+    headers = cabecalhos(usuario)
+    assert (await cliente.get("/api/consultas/?limit=1", headers=headers)).status_code == 200
+    assert cache_principais.obter("ana@testes.com.br") is not None
+
+    resposta = await cliente.put(f"/api/usuarios/{usuario.id}", json={"ativo": False}, headers=admin)
+
+    assert resposta.status_code == 200
+    assert (await cliente.get("/api/consultas/?limit=1", headers=headers)).status_code == 403
@@ -0,0 +1,139 @@
+# tests/test_consultas.py
+from datetime import time, timedelta
+
+import pytest
+
+from app.models.consulta import StatusConsulta
+from conftest import cabecalhos, proxima_segunda
+
+pytestmark = pytest.mark.anyio
+
+def _horario(indice: int) -> time:
+    return time(8 + indice // 2 % 10, 30 * (indice % 2))
+
+async def _instrucoes_por_requisicao(cliente, contar_instrucoes, url, headers):
+    with contar_instrucoes() as instrucoes:
+        resposta = await cliente.get(url, headers=headers)
+    assert resposta.status_code == 200
+    return len(instrucoes), resposta.json()
+
+async def test_listagem_de_consultas_nao_cresce_em_instrucoes_com_a_pagina(
+    cliente, admin, contar_instrucoes, criar_medico, criar_paciente, criar_consulta
+):
+    medico = criar_medico()
+    segunda = proxima_segunda()
+    for indice in range(60):
+        criar_consulta(medico, criar_paciente(), segunda + timedelta(days=indice // 20), _horario(indice))
+    # A primeira requisição resolve o usuário autenticado, que depois fica em cache
+    await cliente.get("/api/consultas/?limit=1", headers=admin)
+
+    pequena, consultas_pequena = await _instrucoes_por_requisicao(cliente, contar_instrucoes, "/api/consultas/?limit=5", admin)
+    grande, consultas_grande = await _instrucoes_por_requisicao(cliente, contar_instrucoes, "/api/consultas/?limit=50", admin)
+
+    assert len(consultas_pequena) == 5 and len(consultas_grande) == 50
+    assert pequena == grande
+    assert consultas_grande[0]["paciente_nome"] and consultas_grande[0]["medico_nome"]
+
+async def test_detalhe_de_consulta_usa_um_numero_fixo_de_instrucoes(
+    cliente, admin, contar_instrucoes, criar_medico, criar_paciente, criar_consulta
+):
+    medico = criar_medico()
+    url = f"/api/consultas/{criar_consulta(medico, criar_paciente(), proxima_segunda()).id}"
+    await cliente.get("/api/consultas/?limit=1", headers=admin)
+
+    contagens = []
+    for _ in range(2):
+        with contar_instrucoes() as instrucoes:
+            resposta = await cliente.get(url, headers=admin)
+        assert resposta.status_code == 200
+        contagens.append(len(instrucoes))
+    # Projeção da consulta, com as versões do ETag na mesma instrução
+    assert contagens == [1, 1]
+
+async def test_listagem_de_consultas_responde_304_pelo_etag(
+    cliente, admin, contar_instrucoes, criar_medico, criar_paciente, criar_consulta
+):
+    medico = criar_medico()
+    segunda = proxima_segunda()
+    criar_consulta(medico, criar_paciente(), segunda)
+    primeira = await cliente.get("/api/consultas/", headers=admin)
+    # Lista: só o ETag, a data mais recente não percebe linhas que saem da página
+    assert "last-modified" not in primeira.headers
+
+    with contar_instrucoes() as instrucoes:
+        repetida = await cliente.get("/api/consultas/", headers={**admin, "If-None-Match": primeira.headers["etag"]})
+    assert repetida.status_code == 304 and repetida.content == b""
+    assert len(instrucoes) == 1
+
+    criar_consulta(medico, criar_paciente(), segunda, time(10, 0))
+    alterada = await cliente.get("/api/consultas/", headers={**admin, "If-None-Match": primeira.headers["etag"]})
+    assert alterada.status_code == 200 and len(alterada.json()) == 2
+    assert alterada.headers["etag"] != primeira.headers["etag"]
+
+async def test_detalhe_de_consulta_honra_if_modified_since(
+    cliente, admin, criar_medico, criar_paciente, criar_consulta
+):
+    url = f"/api/consultas/{criar_consulta(criar_medico(), criar_paciente(), proxima_segunda()).id}"
+    primeira = await cliente.get(url, headers=admin)
+    ultima_modificacao = primeira.headers["last-modified"]
+
+    repetida = await cliente.get(url, headers={**admin, "If-Modified-Since": ultima_modificacao})
+    assert repetida.status_code == 304
+    assert repetida.headers["etag"] == primeira.headers["etag"]
+
+    anterior = await cliente.get(url, headers={**admin, "If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+    invalida = await cliente.get(url, headers={**admin, "If-Modified-Since": "ontem"})
+    # If-None-Match tem precedência sobre a data
+    etag_diferente = await cliente.get(
+        url, headers={**admin, "If-Modified-Since": ultima_modificacao, "If-None-Match": '"outro"'}
+    )
+    assert [r.status_code for r in (anterior, invalida, etag_diferente)] == [200, 200, 200]
+
+async def test_atualizar_consulta_troca_paciente_e_horario(
+    cliente, admin, criar_medico, criar_paciente, criar_consulta
+):
+    medico = criar_medico()
+    consulta = criar_consulta(medico, criar_paciente(), proxima_segunda())
+    outro_paciente = criar_paciente(nome="Outra Paciente")
+
+    resposta = await cliente.put(
+        f"/api/consultas/{consulta.id}",
+        json={"paciente_id": outro_paciente.id, "hora_consulta": "10:00:00", "observacoes": "Retorno"},
+        headers=admin
+    )
+
+    assert resposta.status_code == 200, resposta.text
+    corpo = resposta.json()
+    assert corpo["paciente_nome"] == "Outra Paciente"
+    assert corpo["hora_consulta"] == "10:00:00"
+    assert corpo["observacoes"] == "Retorno"
+
+async def test_consultas_do_medico_filtram_por_status(
+    cliente, criar_medico, criar_paciente, criar_consulta, contar_instrucoes
+):
+    medico = criar_medico()
+    segunda = proxima_segunda()
+    paciente = criar_paciente()
+    for indice in range(6):
+        status = StatusConsulta.CONCLUIDA if indice % 2 else StatusConsulta.AGENDADA
+        criar_consulta(medico, paciente, segunda, _horario(indice), status)
+    headers = cabecalhos(medico.usuario)
+
+    concluidas = await cliente.get("/api/consultas/medico/minhas-consultas?status=concluida", headers=headers)
+    todas = await cliente.get("/api/consultas/medico/minhas-consultas", headers=headers)
+
+    assert concluidas.status_code == 200
+    assert [c["status"] for c in concluidas.json()] == ["concluida"] * 3
+    assert len(todas.json()) == 6
+
+    # Mais consultas não significam mais instruções
+    for indice in range(6, 30):
+        criar_consulta(medico, paciente, segunda + timedelta(days=1 + indice // 20), _horario(indice))
+    antes, _ = await _instrucoes_por_requisicao(
+        cliente, contar_instrucoes, f"/api/consultas/medico/minhas-consultas?data_final={segunda}", headers
+    )
+    depois, lista = await _instrucoes_por_requisicao(
+        cliente, contar_instrucoes, "/api/consultas/medico/minhas-consultas", headers
+    )
+    assert len(lista) == 30
+    assert antes == depois
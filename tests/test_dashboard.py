@@ -0,0 +1,108 @@
+# tests/test_dashboard.py
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.models.consulta import Consulta as ConsultaModel, StatusConsulta
+from app.models.estatistica import EstatisticaConsultasDia, EstatisticaPacientesDia
+from app.services.dashboard_service import reconstruir_estatisticas
+from conftest import proxima_segunda
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def chaves_estrangeiras():
+    """O SQLite só verifica as FKs com PRAGMA foreign_keys, como o PostgreSQL sempre faz."""
+    if engine.dialect.name != "sqlite":
+        yield
+        return
+
+    def ativar(conexao, registro):
+        conexao.execute("PRAGMA foreign_keys=ON")
+
+    engine.dispose()
+    event.listen(engine, "connect", ativar)
+    yield
+    event.remove(engine, "connect", ativar)
+    engine.dispose()
+
+def _estatisticas(db):
+    """Linhas das duas tabelas; linhas zeradas equivalem a linhas ausentes."""
+    db.expire_all()
+    consultas = {
+        (linha.data, linha.medico_id, linha.status): linha.total
+        for linha in db.query(EstatisticaConsultasDia).all() if linha.total
+    }
+    pacientes = {linha.data: linha.novos for linha in db.query(EstatisticaPacientesDia).all() if linha.novos}
+    return consultas, pacientes
+
+async def _agendar(cliente, headers, medico, paciente, dia, hora):
+    resposta = await cliente.post("/api/consultas/", json={
+        "medico_id": medico.id, "paciente_id": paciente.id,
+        "data_consulta": dia.isoformat(), "hora_consulta": hora
+    }, headers=headers)
+    assert resposta.status_code == 200
+    return resposta.json()["id"]
+
+async def test_remover_medico_remove_suas_estatisticas(cliente, admin, db, criar_medico, criar_paciente):
+    medico, substituto = criar_medico(), criar_medico()
+    medico_id = medico.id
+    dia = proxima_segunda()
+    consulta_id = await _agendar(cliente, admin, medico, criar_paciente(), dia, "09:00:00")
+    # A consulta passa para outro médico; a linha do médico original fica zerada
+    resposta = await cliente.put(f"/api/consultas/{consulta_id}", json={"medico_id": substituto.id}, headers=admin)
+    assert resposta.status_code == 200
+
+    resposta = await cliente.delete(f"/api/medicos/{medico_id}", headers=admin)
+
+    assert resposta.status_code == 204
+    assert _estatisticas(db)[0] == {(dia, substituto.id, StatusConsulta.AGENDADA): 1}
+    assert db.query(EstatisticaConsultasDia).filter(EstatisticaConsultasDia.medico_id == medico_id).count() == 0
+
+async def test_estatisticas_incrementais_coincidem_com_a_reconstrucao(
+    cliente, admin, db, criar_medico, criar_paciente
+):
+    medicos = [criar_medico() for _ in range(3)]
+    pacientes = [criar_paciente() for _ in range(4)]
+    antigo = criar_paciente()
+    antigo.data_criacao = datetime.now() - timedelta(days=40)
+    db.commit()
+    # Ponto de partida: o paciente antigo contado no dia em que foi cadastrado
+    reconstruir_estatisticas(db)
+    segunda = proxima_segunda()
+
+    ids = []
+    for numero in range(8):
+        ids.append(await _agendar(
+            cliente, admin, medicos[numero % 2], pacientes[numero % 4],
+            segunda + timedelta(days=numero % 3), f"{9 + numero}:00:00"
+        ))
+    # Mudanças de status, cancelamento e remarcações (dia, horário e médico)
+    assert (await cliente.patch(f"/api/consultas/{ids[0]}/status?status=confirmada", headers=admin)).status_code == 200
+    assert (await cliente.patch(f"/api/consultas/{ids[1]}/status?status=concluida", headers=admin)).status_code == 200
+    assert (await cliente.delete(f"/api/consultas/{ids[2]}", headers=admin)).status_code == 204
+    assert (await cliente.put(f"/api/consultas/{ids[3]}", json={
+        "data_consulta": (segunda + timedelta(days=7)).isoformat(), "hora_consulta": "15:30:00"
+    }, headers=admin)).status_code == 200
+    assert (await cliente.put(f"/api/consultas/{ids[4]}", json={
+        "medico_id": medicos[2].id, "status": "remarcada"
+    }, headers=admin)).status_code == 200
+    # Remoções: consultas pelo ORM, um paciente de hoje, o paciente antigo e um médico sem consultas
+    for consulta in db.query(ConsultaModel).filter(ConsultaModel.id.in_([ids[5], ids[6]])).all():
+        db.delete(consulta)
+    db.commit()
+    novo_sem_consultas = criar_paciente()
+    assert (await cliente.delete(f"/api/pacientes/{novo_sem_consultas.id}", headers=admin)).status_code == 204
+    assert (await cliente.delete(f"/api/pacientes/{antigo.id}", headers=admin)).status_code == 204
+    for consulta_id in (ids[1], ids[3], ids[7]):
+        assert (await cliente.put(f"/api/consultas/{consulta_id}", json={"medico_id": medicos[0].id}, headers=admin)).status_code == 200
+    assert (await cliente.delete(f"/api/medicos/{medicos[1].id}", headers=admin)).status_code == 204
+
+    incrementais = _estatisticas(db)
+    reconstruir_estatisticas(db)
+
+    assert incrementais == _estatisticas(db)
+    assert sum(incrementais[1].values()) == 4
+    assert sum(incrementais[0].values()) == 6
@@ -0,0 +1,103 @@
+# tests/test_disponibilidade.py
+from datetime import time, timedelta
+
+import pytest
+
+from app.models.consulta import StatusConsulta
+from app.services.consulta_service import cache_disponibilidade
+from conftest import proxima_segunda
+
+pytestmark = pytest.mark.anyio
+
+async def _livres(cliente, headers, medico, dia):
+    resposta = await cliente.get(
+        f"/api/consultas/agenda/disponibilidade?medico_id={medico.id}&data_consulta={dia}", headers=headers
+    )
+    assert resposta.status_code == 200
+    return {horario["hora_inicio"] for horario in resposta.json()["disponibilidade"]}
+
+async def test_trocar_de_medico_libera_o_horario_no_cache_do_medico_anterior(
+    cliente, admin, criar_medico, criar_paciente
+):
+    medico, outro_medico = criar_medico(), criar_medico()
+    dia = proxima_segunda()
+    consulta = (await cliente.post("/api/consultas/", json={
+        "medico_id": medico.id, "paciente_id": criar_paciente().id,
+        "data_consulta": dia.isoformat(), "hora_consulta": "09:00:00"
+    }, headers=admin)).json()
+    # Os dois dias ficam no cache
+    assert "09:00" not in await _livres(cliente, admin, medico, dia)
+    assert "09:00" in await _livres(cliente, admin, outro_medico, dia)
+
+    resposta = await cliente.put(f"/api/consultas/{consulta['id']}", json={"medico_id": outro_medico.id}, headers=admin)
+
+    assert resposta.status_code == 200
+    assert "09:00" in await _livres(cliente, admin, medico, dia)
+    assert "09:00" not in await _livres(cliente, admin, outro_medico, dia)
+
+async def test_cancelar_consulta_libera_o_horario_em_cache(cliente, admin, criar_medico, criar_paciente):
+    medico = criar_medico()
+    dia = proxima_segunda()
+    consulta = (await cliente.post("/api/consultas/", json={
+        "medico_id": medico.id, "paciente_id": criar_paciente().id,
+        "data_consulta": dia.isoformat(), "hora_consulta": "09:00:00"
+    }, headers=admin)).json()
+    assert "09:00" not in await _livres(cliente, admin, medico, dia)
+
+    await cliente.delete(f"/api/consultas/{consulta['id']}", headers=admin)
+
+    assert "09:00" in await _livres(cliente, admin, medico, dia)
+
+async def test_periodo_responde_como_a_disponibilidade_de_cada_dia(
+    cliente, admin, criar_medico, criar_paciente, criar_consulta
+):
+    semanal = criar_medico()
+    alternado = criar_medico(tempo_consulta=20, dias_atendimento="1,3,5", inicio="09:00", fim="12:00")
+    paciente = criar_paciente()
+    segunda = proxima_segunda()
+    dias = [segunda + timedelta(days=n) for n in range(9)]
+    # Horários fora da grade sobrepõem dois horários; a consulta cancelada não ocupa nada
+    for medico, dia, hora, status in [
+        (semanal, dias[0], time(9, 0), StatusConsulta.AGENDADA),
+        (semanal, dias[0], time(10, 15), StatusConsulta.CONFIRMADA),
+        (semanal, dias[0], time(10, 45), StatusConsulta.AGENDADA),
+        (semanal, dias[1], time(14, 0), StatusConsulta.CANCELADA),
+        (semanal, dias[2], time(17, 30), StatusConsulta.AGENDADA),
+        (semanal, dias[7], time(8, 0), StatusConsulta.REMARCADA),
+        (alternado, dias[0], time(9, 10), StatusConsulta.AGENDADA),
+        (alternado, dias[2], time(11, 40), StatusConsulta.AGENDADA),
+        (alternado, dias[2], time(10, 0), StatusConsulta.CANCELADA),
+    ]:
+        criar_consulta(medico, paciente, dia, hora, status)
+
+    async def periodo():
+        resposta = await cliente.get("/api/consultas/agenda/disponibilidade/periodo", params={
+            "data_inicio": dias[0].isoformat(), "data_fim": dias[-1].isoformat(),
+            "medico_ids": [semanal.id, alternado.id]
+        }, headers=admin)
+        assert resposta.status_code == 200
+        return {medico["medico_id"]: medico["dias"] for medico in resposta.json()["medicos"]}
+
+    async def dia_a_dia():
+        return {
+            medico.id: {dia.isoformat(): sorted(await _livres(cliente, admin, medico, dia)) for dia in dias}
+            for medico in (semanal, alternado)
+        }
+
+    # Os dois caminhos calculados do banco, e depois cada um lendo o que o outro deixou no cache
+    grade = await periodo()
+    cache_disponibilidade.limpar()
+    individual = await dia_a_dia()
+    assert await periodo() == grade
+    cache_disponibilidade.limpar()
+    await periodo()
+    assert await dia_a_dia() == individual
+
+    for medico_id, por_dia in individual.items():
+        # Dias em que o médico não atende ficam fora da grade e vêm vazios na consulta de um dia
+        assert grade[medico_id] == {dia: livres for dia, livres in por_dia.items() if livres}
+    assert "09:00" not in grade[semanal.id][dias[0].isoformat()]
+    assert {"10:00", "10:30", "11:00"}.isdisjoint(grade[semanal.id][dias[0].isoformat()])
+    assert "14:00" in grade[semanal.id][dias[1].isoformat()]
+    assert dias[5].isoformat() not in grade[semanal.id] and dias[1].isoformat() not in grade[alternado.id]
+    assert grade[alternado.id][dias[2].isoformat()][-1] == "11:20"
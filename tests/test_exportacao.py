@@ -0,0 +1,103 @@
+# tests/test_exportacao.py
+import csv
+import io
+import json
+from datetime import time, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.consulta import Consulta as ConsultaModel, StatusConsulta
+from app.services.consulta_service import TAMANHO_BLOCO_EXPORTACAO, exportar_consultas
+from conftest import proxima_segunda
+
+pytestmark = pytest.mark.anyio
+
+CAMPOS = ("id", "paciente_id", "medico_id", "data_consulta", "hora_consulta", "status",
+          "observacoes", "paciente_nome", "paciente_cpf", "medico_nome", "medico_especialidade")
+
+def _esperado(consulta, paciente, medico):
+    return {
+        "id": consulta.id, "paciente_id": paciente.id, "medico_id": medico.id,
+        "data_consulta": consulta.data_consulta.isoformat(), "hora_consulta": consulta.hora_consulta.isoformat(),
+        "status": consulta.status.value, "observacoes": consulta.observacoes,
+        "paciente_nome": paciente.nome, "paciente_cpf": paciente.cpf,
+        "medico_nome": medico.usuario.nome, "medico_especialidade": medico.especialidade
+    }
+
+async def _exportar(cliente, headers, formato, **filtros):
+    """Resposta e corpo decodificado da exportação."""
+    async with cliente.stream("GET", "/api/consultas/export", params={"format": formato, **filtros}, headers=headers) as resposta:
+        assert resposta.status_code == 200
+        corpo = b"".join([bloco async for bloco in resposta.aiter_raw()])
+    return resposta, corpo.decode()
+
+@pytest.fixture
+def consultas_exportadas(db, criar_medico, criar_paciente, criar_consulta):
+    medico, outro_medico = criar_medico(nome="Dra. Ângela"), criar_medico()
+    # Vírgula, aspas e acentos, que o CSV e o JSON precisam escapar
+    paciente = criar_paciente(nome='Silva, José "Zé"')
+    segunda = proxima_segunda()
+    consultas = [
+        criar_consulta(medico, paciente, segunda + timedelta(days=1), time(9, 0)),
+        criar_consulta(medico, paciente, segunda, time(14, 30), StatusConsulta.CANCELADA),
+        criar_consulta(medico, criar_paciente(), segunda, time(8, 0)),
+    ]
+    consultas[0].observacoes = "Trazer exames;\nlinha 2"
+    db.commit()
+    criar_consulta(outro_medico, paciente, segunda)
+    # Na ordem da exportação: data, hora, id
+    consultas.sort(key=lambda consulta: (consulta.data_consulta, consulta.hora_consulta))
+    return medico, [_esperado(consulta, consulta.paciente, medico) for consulta in consultas]
+
+async def test_exportacao_csv_traz_cabecalho_e_linhas_do_banco(cliente, admin, consultas_exportadas):
+    medico, esperadas = consultas_exportadas
+
+    resposta, corpo = await _exportar(cliente, admin, "csv", medico_id=medico.id)
+
+    assert resposta.headers["content-type"].startswith("text/csv")
+    assert resposta.headers["content-disposition"] == 'attachment; filename="consultas.csv"'
+    leitor = csv.DictReader(io.StringIO(corpo))
+    assert leitor.fieldnames[:3] == ["id", "paciente_id", "medico_id"]
+    assert {"paciente_nome", "medico_nome", "data_criacao", "lembrete_enviado"} <= set(leitor.fieldnames)
+    linhas = list(leitor)
+    assert [{campo: linha[campo] for campo in CAMPOS} for linha in linhas] == [
+        {campo: "" if valor is None else str(valor) for campo, valor in esperada.items()} for esperada in esperadas
+    ]
+
+async def test_exportacao_ndjson_traz_um_objeto_por_linha(cliente, admin, consultas_exportadas):
+    medico, esperadas = consultas_exportadas
+
+    resposta, corpo = await _exportar(cliente, admin, "ndjson", medico_id=medico.id)
+
+    assert resposta.headers["content-type"].startswith("application/x-ndjson")
+    assert corpo.endswith("\n") and "Ângela" in corpo
+    linhas = [json.loads(linha) for linha in corpo.splitlines()]
+    assert [{campo: linha[campo] for campo in CAMPOS} for linha in linhas] == esperadas
+
+async def test_exportacao_maior_que_um_bloco_sai_completa(cliente, admin, db, criar_medico, criar_paciente):
+    medico, paciente = criar_medico(), criar_paciente()
+    total = 2 * TAMANHO_BLOCO_EXPORTACAO + 150
+    segunda = proxima_segunda()
+    # 20 horários por dia, inseridos direto na tabela
+    db.execute(insert(ConsultaModel), [
+        {
+            "paciente_id": paciente.id, "medico_id": medico.id, "status": StatusConsulta.AGENDADA,
+            "data_consulta": segunda + timedelta(days=numero // 20),
+            "hora_consulta": time(8 + numero % 20 // 2, 30 * (numero % 2))
+        }
+        for numero in range(total)
+    ])
+    db.commit()
+
+    _, corpo = await _exportar(cliente, admin, "csv")
+
+    linhas = list(csv.reader(io.StringIO(corpo)))
+    assert len(linhas) == total + 1
+    ids = [int(linha[0]) for linha in linhas[1:]]
+    assert sorted(ids) == [consulta_id for consulta_id, in db.query(ConsultaModel.id).order_by(ConsultaModel.id)]
+    # O gerador entrega o cabeçalho, dois blocos cheios e o restante
+    assert [bloco.count("\n") for bloco in exportar_consultas("csv")] == [1, TAMANHO_BLOCO_EXPORTACAO, TAMANHO_BLOCO_EXPORTACAO, 150]
+
+    _, corpo = await _exportar(cliente, admin, "ndjson")
+    assert len(corpo.splitlines()) == total
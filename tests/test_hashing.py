@@ -0,0 +1,46 @@
+# tests/test_hashing.py
+import time
+
+import pytest
+
+from app import auth
+from app.models.usuario import TipoUsuario
+from app.utils.security import PoolHashing, PoolHashingSaturado, PoolHashingTempoEsgotado
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def pool_lento():
+    """Um processo, uma vaga e um custo de bcrypt bem maior que o timeout."""
+    pool = PoolHashing(processos=1, fila_maxima=1, rounds=12, timeout=0.01)
+    yield pool
+    pool.encerrar()
+
+def _aguardar_vaga(pool, limite=30):
+    fim = time.monotonic() + limite
+    while pool.estatisticas()["em_andamento"] and time.monotonic() < fim:
+        time.sleep(0.05)
+
+def test_timeout_mantem_a_vaga_ate_o_processo_terminar(pool_lento):
+    with pytest.raises(PoolHashingTempoEsgotado):
+        pool_lento.gerar_hash("senha123")
+
+    # O bcrypt ainda roda no processo: a vaga continua ocupada
+    assert pool_lento.estatisticas()["em_andamento"] == 1
+    with pytest.raises(PoolHashingSaturado):
+        pool_lento.gerar_hash("senha123")
+
+    _aguardar_vaga(pool_lento)
+    estatisticas = pool_lento.estatisticas()
+    assert (estatisticas["em_andamento"], estatisticas["operacoes"]) == (0, 1)
+    assert (estatisticas["timeouts"], estatisticas["rejeicoes"]) == (1, 1)
+
+async def test_login_com_hashing_esgotado_responde_503(cliente, criar_usuario, pool_lento, monkeypatch):
+    criar_usuario(email="ana@testes.com.br", tipo=TipoUsuario.RECEPCIONISTA)
+    monkeypatch.setattr(auth, "pool_hashing", pool_lento)
+
+    resposta = await cliente.post("/api/auth/login", data={"username": "ana@testes.com.br", "password": "senha123"})
+
+    assert resposta.status_code == 503
+    assert resposta.headers["retry-after"] == "1"
+    _aguardar_vaga(pool_lento)
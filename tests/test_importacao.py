@@ -0,0 +1,92 @@
+# tests/test_importacao.py
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+
+from app.database import engine
+from app.models.estatistica import EstatisticaPacientesDia
+from app.models.paciente import Paciente as PacienteModel, Sexo, TipoContato
+from app.services.importacao_service import ImportadorPacientes
+
+pytestmark = pytest.mark.anyio
+
+CABECALHO = "nome,cpf,data_nascimento,sexo,telefone,tipo_contato,email\n"
+
+def _linha(nome, cpf, data_nascimento="1990-01-01", email=""):
+    return f"{nome},{cpf},{data_nascimento},feminino,(11) 98888-0000,celular,{email}\n"
+
+async def _importar(cliente, headers, conteudo: str):
+    resposta = await cliente.post(
+        "/api/pacientes/importar", files={"arquivo": ("pacientes.csv", conteudo.encode(), "text/csv")}, headers=headers
+    )
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()
+
+def _novos_pacientes(db):
+    db.expire_all()
+    return sum(novos for novos, in db.query(EstatisticaPacientesDia.novos))
+
+async def test_importacao_rejeita_cada_linha_pelo_proprio_motivo(cliente, admin, db, criar_paciente):
+    existente = criar_paciente()
+    conteudo = CABECALHO + "".join([
+        _linha("Ana Lima", "11111111111"),                    # linha 2
+        _linha("Bruno Dias", "123"),                          # linha 3: CPF curto
+        _linha("Carla Reis", "22222222222", "ontem"),         # linha 4: data inválida
+        _linha("Ana Repetida", "11111111111"),                # linha 5: repete a linha 2
+        _linha("Paciente Antigo", existente.cpf),             # linha 6: já cadastrado
+        _linha("Davi Souza", "33333333333", email="davi"),    # linha 7: e-mail inválido
+        _linha("Eva Melo", "44444444444"),                    # linha 8
+    ])
+
+    resultado = await _importar(cliente, admin, conteudo)
+
+    assert (resultado["total"], resultado["importados"], resultado["rejeitados"]) == (7, 2, 5)
+    rejeicoes = {rejeicao["linha"]: rejeicao for rejeicao in resultado["rejeicoes"]}
+    assert sorted(rejeicoes) == [3, 4, 5, 6, 7]
+    assert rejeicoes[3]["erro"].startswith("cpf:")
+    assert rejeicoes[4]["erro"].startswith("data_nascimento:")
+    assert rejeicoes[5] == {"linha": 5, "cpf": "11111111111", "erro": "CPF repetido no arquivo (linha 2)"}
+    assert rejeicoes[6] == {"linha": 6, "cpf": existente.cpf, "erro": "CPF já cadastrado"}
+    assert rejeicoes[7]["erro"].startswith("email:")
+    nomes = {nome for nome, in db.query(PacienteModel.nome)}
+    assert nomes == {existente.nome, "Ana Lima", "Eva Melo"}
+
+async def test_linhas_com_quebra_dentro_do_campo_mantem_a_numeracao(cliente, admin):
+    conteudo = CABECALHO + _linha('"Ana\nLima"', "11111111111") + _linha("Bruno Dias", "123")
+
+    resultado = await _importar(cliente, admin, conteudo)
+
+    # O registro da Ana ocupa as linhas 2 e 3 do arquivo
+    assert resultado["importados"] == 1
+    assert [rejeicao["linha"] for rejeicao in resultado["rejeicoes"]] == [4]
+
+async def test_importacao_soma_os_novos_pacientes_do_dashboard(cliente, admin, db, criar_paciente):
+    criar_paciente()
+    assert _novos_pacientes(db) == 1
+
+    await _importar(cliente, admin, CABECALHO + _linha("Ana Lima", "11111111111") + _linha("Eva Melo", "44444444444"))
+    assert _novos_pacientes(db) == 3
+    # Nada importado, nada somado
+    await _importar(cliente, admin, CABECALHO + _linha("Ana Lima", "11111111111"))
+    assert _novos_pacientes(db) == 3
+
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="COPY e ON CONFLICT só no PostgreSQL (TESTES_DATABASE_URL)")
+def test_cpf_cadastrado_durante_a_importacao_e_rejeitado(db, monkeypatch):
+    mesclar = ImportadorPacientes._mesclar
+
+    def cadastrar_antes_de_mesclar(importador):
+        # Outra transação cadastrou o CPF depois da conferência do bloco
+        importador.conexao.execute(insert(PacienteModel).values(
+            nome="Concorrente", cpf="11111111111", data_nascimento=date(1990, 1, 1),
+            sexo=Sexo.FEMININO, telefone="11988880000", tipo_contato=TipoContato.CELULAR
+        ))
+        return mesclar(importador)
+
+    monkeypatch.setattr(ImportadorPacientes, "_mesclar", cadastrar_antes_de_mesclar)
+    resultado = ImportadorPacientes(db).importar(
+        (CABECALHO + _linha("Ana Lima", "11111111111") + _linha("Eva Melo", "44444444444")).splitlines(keepends=True)
+    )
+
+    assert resultado["importados"] == 1
+    assert resultado["rejeicoes"] == [{"linha": 2, "cpf": "11111111111", "erro": "CPF já cadastrado"}]
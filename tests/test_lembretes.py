@@ -0,0 +1,96 @@
+# tests/test_lembretes.py
+import threading
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.models.consulta import Consulta as ConsultaModel, StatusConsulta
+from app.models.job_lembrete import JobLembretes, StatusJob
+from app.services import lembrete_service
+from app.services.lembrete_service import DespachanteLembretes, criar_job_lembretes, iniciar_job_lembretes
+
+AMANHA = date.today() + timedelta(days=1)
+
+@pytest.fixture
+def consultas_de_amanha(criar_medico, criar_paciente, criar_consulta):
+    medico = criar_medico()
+    emails = [f"paciente{i}@testes.com.br" for i in range(5)]
+    for indice, email in enumerate(emails):
+        criar_consulta(medico, criar_paciente(email=email), AMANHA, time(8 + indice, 0), StatusConsulta.CONFIRMADA)
+    return emails
+
+def test_so_um_job_em_andamento_por_data(db):
+    db.add(JobLembretes(data_referencia=AMANHA))
+    db.commit()
+
+    db.add(JobLembretes(data_referencia=AMANHA))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+
+    # Concluído o anterior, a data pode ter um novo job
+    db.query(JobLembretes).update({JobLembretes.status: StatusJob.CONCLUIDO})
+    db.add(JobLembretes(data_referencia=AMANHA))
+    db.commit()
+
+def test_criacao_concorrente_devolve_o_job_ja_criado(db, monkeypatch):
+    existente = JobLembretes(data_referencia=AMANHA)
+    db.add(existente)
+    db.commit()
+    # Simula a corrida: a busca não vê o job criado pela outra requisição
+    buscar = lembrete_service.buscar_job_em_andamento
+    chamadas = iter([None])
+    monkeypatch.setattr(
+        lembrete_service, "buscar_job_em_andamento", lambda *args: next(chamadas, None) or buscar(*args)
+    )
+
+    job = criar_job_lembretes(db, AMANHA)
+
+    assert job.id == existente.id
+    assert db.query(JobLembretes).count() == 1
+
+def test_iniciar_job_em_execucao_nao_cria_outra_thread(db, monkeypatch):
+    liberar = threading.Event()
+    execucoes = []
+
+    def executar(self, job_id):
+        execucoes.append(job_id)
+        liberar.wait(5)
+
+    monkeypatch.setattr(DespachanteLembretes, "executar", executar)
+    job = criar_job_lembretes(db, AMANHA)
+
+    primeira = iniciar_job_lembretes(job.id)
+    segunda = iniciar_job_lembretes(job.id)
+    liberar.set()
+    primeira.join(5)
+
+    assert segunda is primeira
+    assert execucoes == [job.id]
+
+def test_falhas_temporarias_sao_repetidas(db, servidor_smtp, monkeypatch, consultas_de_amanha):
+    monkeypatch.setattr(settings, "LEMBRETES_BACKOFF_SEGUNDOS", 0)
+    servidor_smtp.falhas = {consultas_de_amanha[1]: 2, consultas_de_amanha[3]: 1}
+    job = criar_job_lembretes(db, AMANHA)
+
+    DespachanteLembretes(conexoes=2, tamanho_lote=2).executar(job.id)
+
+    db.expire_all()
+    assert sorted(servidor_smtp.destinatarios()) == sorted(consultas_de_amanha)
+    assert (job.status, job.enviados, job.erros) == (StatusJob.CONCLUIDO, 5, 0)
+    assert db.query(ConsultaModel).filter(ConsultaModel.lembrete_enviado == False).count() == 0
+
+def test_falha_persistente_conta_como_erro_e_fica_pendente(db, servidor_smtp, monkeypatch, consultas_de_amanha):
+    monkeypatch.setattr(settings, "LEMBRETES_BACKOFF_SEGUNDOS", 0)
+    servidor_smtp.falhas = {consultas_de_amanha[0]: settings.LEMBRETES_MAX_TENTATIVAS}
+    job = criar_job_lembretes(db, AMANHA)
+
+    DespachanteLembretes(conexoes=2, tamanho_lote=2).executar(job.id)
+
+    db.expire_all()
+    assert (job.status, job.enviados, job.erros) == (StatusJob.CONCLUIDO, 4, 1)
+    assert "451" in job.ultimo_erro
+    # A consulta sem lembrete volta a ser candidata em um novo job da data
+    assert criar_job_lembretes(db, AMANHA).total == 1
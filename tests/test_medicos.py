@@ -0,0 +1,77 @@
+# tests/test_medicos.py
+import pytest
+
+from app.services.medico_service import diretorio_medicos
+
+pytestmark = pytest.mark.anyio
+
+async def test_listagem_de_medicos_tira_o_etag_das_linhas_servidas(
+    cliente, admin, db, contar_instrucoes, criar_medico
+):
+    medicos = [criar_medico() for _ in range(3)]
+    await cliente.get("/api/medicos/?limit=1", headers=admin)
+
+    with contar_instrucoes() as instrucoes:
+        primeira = await cliente.get("/api/medicos/", headers=admin)
+    assert primeira.status_code == 200 and len(instrucoes) == 1
+    assert [medico["id"] for medico in primeira.json()] == [medico.id for medico in medicos]
+    assert "versao_medico" not in primeira.json()[0]
+
+    with contar_instrucoes() as instrucoes:
+        repetida = await cliente.get("/api/medicos/", headers={**admin, "If-None-Match": primeira.headers["etag"]})
+    assert repetida.status_code == 304 and len(instrucoes) == 1
+
+    # O nome vem do usuário: a versão dele também entra no ETag
+    medicos[0].usuario.nome = "Médico Renomeado"
+    db.commit()
+    alterada = await cliente.get("/api/medicos/", headers={**admin, "If-None-Match": primeira.headers["etag"]})
+    assert alterada.status_code == 200
+    assert "Médico Renomeado" in [medico["nome"] for medico in alterada.json()]
+    assert (await cliente.get("/api/medicos/", headers=admin)).headers["etag"] == alterada.headers["etag"]
+
+async def _diretorio(cliente, headers, **params):
+    resposta = await cliente.get("/api/medicos/diretorio", params=params, headers=headers)
+    assert resposta.status_code in (200, 304)
+    return resposta
+
+def _nomes(resposta):
+    return {medico["nome"]: grupo["especialidade"] for grupo in resposta.json()["especialidades"] for medico in grupo["medicos"]}
+
+async def test_diretorio_responde_304_enquanto_o_conteudo_nao_muda(cliente, admin, criar_medico):
+    criar_medico(nome="Dra. Beatriz")
+    primeira = await _diretorio(cliente, admin)
+    etag = primeira.headers["etag"]
+    assert not etag.startswith("W/")
+
+    repetida = await _diretorio(cliente, admin)
+    assert repetida.headers["etag"] == etag
+    condicional = await cliente.get("/api/medicos/diretorio", headers={**admin, "If-None-Match": etag})
+    assert condicional.status_code == 304 and condicional.headers["etag"] == etag
+    # Reconstruído sem mudanças (invalidação ou TTL), o snapshot mantém o ETag
+    diretorio_medicos.invalidar()
+    reconstruida = await cliente.get("/api/medicos/diretorio", headers={**admin, "If-None-Match": etag})
+    assert reconstruida.status_code == 304
+
+async def test_diretorio_reflete_alteracoes_de_medico_e_de_usuario(cliente, admin, criar_medico):
+    medico = criar_medico(nome="Dr. Carlos")
+    medico_id, usuario_id = medico.id, medico.usuario_id
+    criar_medico(nome="Dra. Daniela")
+    primeira = await _diretorio(cliente, admin)
+    assert _nomes(primeira) == {"Dr. Carlos": "Clínica Geral", "Dra. Daniela": "Clínica Geral"}
+
+    resposta = await cliente.put(f"/api/medicos/{medico_id}", json={"especialidade": "Cardiologia"}, headers=admin)
+    assert resposta.status_code == 200
+    apos_medico = await cliente.get("/api/medicos/diretorio", headers={**admin, "If-None-Match": primeira.headers["etag"]})
+    assert apos_medico.status_code == 200
+    assert _nomes(apos_medico)["Dr. Carlos"] == "Cardiologia"
+
+    resposta = await cliente.put(f"/api/usuarios/{usuario_id}", json={"nome": "Dr. Carlos Alberto"}, headers=admin)
+    assert resposta.status_code == 200
+    apos_usuario = await cliente.get("/api/medicos/diretorio", headers={**admin, "If-None-Match": apos_medico.headers["etag"]})
+    assert apos_usuario.status_code == 200
+    assert "Dr. Carlos Alberto" in _nomes(apos_usuario)
+    assert (await _diretorio(cliente, admin, prefixo="alb")).json()["total"] == 1
+
+    resposta = await cliente.put(f"/api/usuarios/{usuario_id}", json={"ativo": False}, headers=admin)
+    assert resposta.status_code == 200
+    assert _nomes(await _diretorio(cliente, admin)) == {"Dra. Daniela": "Clínica Geral"}
@@ -0,0 +1,112 @@
+# tests/test_metricas.py
+import logging
+import re
+from collections import Counter
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db
+from app.models.paciente import Paciente as PacienteModel
+from app.utils.metricas import MiddlewareMetricas
+
+pytestmark = pytest.mark.anyio
+
+TOKEN = "token-de-testes"
+_LINHA = re.compile(r"^(\w+)(\{.*\})? (\S+)$")
+
+@pytest.fixture
+def metricas(cliente, monkeypatch):
+    """Amostras atuais de /metrics, como {(nome, rótulos): valor}."""
+    monkeypatch.setattr(settings, "METRICAS_TOKEN", TOKEN)
+
+    async def coletar():
+        resposta = await cliente.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+        assert resposta.status_code == 200
+        amostras = Counter()
+        for linha in resposta.text.splitlines():
+            encontrada = _LINHA.match(linha)
+            if encontrada:
+                nome, rotulos, valor = encontrada.groups()
+                amostras[(nome, rotulos or "")] = float(valor)
+        return amostras
+    return coletar
+
+async def test_metricas_exigem_o_token(cliente, monkeypatch):
+    monkeypatch.setattr(settings, "METRICAS_TOKEN", None)
+    assert (await cliente.get("/metrics")).status_code == 404
+
+    monkeypatch.setattr(settings, "METRICAS_TOKEN", TOKEN)
+    assert (await cliente.get("/metrics")).status_code == 401
+    assert (await cliente.get("/metrics", headers={"Authorization": "Bearer outro"})).status_code == 401
+    resposta = await cliente.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+async def test_requisicoes_contadas_pelo_modelo_da_rota(cliente, admin, metricas, criar_paciente):
+    ids = [criar_paciente().id for _ in range(3)]
+    antes = await metricas()
+
+    for paciente_id in ids + [9999]:
+        await cliente.get(f"/api/pacientes/{paciente_id}", headers=admin)
+
+    depois = await metricas()
+    rota = 'metodo="GET",rota="/api/pacientes/{paciente_id}"'
+    diferenca = {chave: depois[chave] - antes[chave] for chave in depois if depois[chave] != antes[chave]}
+    assert diferenca[("clinica_requisicoes_total", "{" + rota + ',status="200"}')] == 3
+    assert diferenca[("clinica_requisicoes_total", "{" + rota + ',status="404"}')] == 1
+    assert diferenca[("clinica_requisicao_duracao_segundos_count", "{" + rota + "}")] == 4
+    assert diferenca[("clinica_requisicao_sql_instrucoes_count", "{" + rota + "}")] == 4
+    # Nenhuma série por id acessado
+    assert not any(re.search(r'rota="/api/pacientes/\d', rotulos) for _, rotulos in depois)
+
+    buckets = [
+        (rotulos, valor) for (nome, rotulos), valor in depois.items()
+        if nome == "clinica_requisicao_duracao_segundos_bucket" and rota in rotulos
+    ]
+    acumulados = [valor for _, valor in buckets]
+    assert acumulados == sorted(acumulados)
+    assert buckets[-1] == ("{" + rota + ',le="+Inf"}', depois[("clinica_requisicao_duracao_segundos_count", "{" + rota + "}")])
+
+@pytest.fixture
+def aplicacao_n_mais_um():
+    """Aplicação mínima com o middleware: uma rota consulta linha a linha, a outra em uma instrução."""
+    aplicacao = FastAPI()
+    aplicacao.add_middleware(MiddlewareMetricas)
+
+    @aplicacao.get("/linha-a-linha")
+    def linha_a_linha(db: Session = Depends(get_db)):
+        ids = [paciente_id for paciente_id, in db.query(PacienteModel.id)]
+        return [db.query(PacienteModel.nome).filter(PacienteModel.id == paciente_id).scalar() for paciente_id in ids]
+
+    @aplicacao.get("/em-lote")
+    def em_lote(db: Session = Depends(get_db)):
+        return [nome for nome, in db.query(PacienteModel.nome).order_by(PacienteModel.id)]
+
+    return aplicacao
+
+async def test_detector_de_n_mais_um_aponta_a_consulta_repetida(
+    aplicacao_n_mais_um, metricas, monkeypatch, caplog, criar_paciente
+):
+    for _ in range(6):
+        criar_paciente()
+    monkeypatch.setattr(settings, "SQL_N_MAIS_UM_LIMITE", 3)
+    antes = await metricas()
+
+    transporte = httpx.ASGITransport(app=aplicacao_n_mais_um)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://testes") as cliente:
+        with caplog.at_level(logging.WARNING, logger="app.sql"):
+            assert len((await cliente.get("/linha-a-linha")).json()) == 6
+            assert len((await cliente.get("/em-lote")).json()) == 6
+
+    depois = await metricas()
+    alertas = ("clinica_n_mais_um_alertas_total", '{metodo="GET",rota="/linha-a-linha"}')
+    # Um alerta por requisição e formato de instrução, não um por repetição
+    assert depois[alertas] - antes[alertas] == 1
+    assert ("clinica_n_mais_um_alertas_total", '{metodo="GET",rota="/em-lote"}') not in depois
+    avisos = [registro.getMessage() for registro in caplog.records if "N+1" in registro.getMessage()]
+    assert len(avisos) == 1
+    assert avisos[0].startswith("Possível N+1 em GET /linha-a-linha") and "WHERE pacientes.id = ?" in avisos[0]
@@ -0,0 +1,83 @@
+# tests/test_migracoes.py
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, text
+
+from app.models.usuario import Base
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+@pytest.fixture
+def migrar(tmp_path):
+    """Banco SQLite próprio, fora do esquema recriado pelo conftest; devolve (migrar, engine)."""
+    banco = create_engine(f"sqlite:///{tmp_path}/migracoes.db")
+    config = Config(str(RAIZ / "alembic.ini"))
+    config.set_main_option("script_location", str(RAIZ / "alembic"))
+
+    def executar(revisao):
+        with banco.connect() as conexao:
+            config.attributes["connection"] = conexao
+            command.upgrade(config, revisao)
+
+    yield executar, banco
+    banco.dispose()
+
+def _clinica_anterior_as_migracoes(conexao, horarios=("09:00:00", "10:00:00")):
+    """Linhas como eram gravadas antes das colunas de busca e das estatísticas."""
+    conexao.execute(text(
+        "INSERT INTO usuarios (id, nome, email, senha_hash, tipo, ativo) "
+        "VALUES (1, 'Dra. Ana', 'ana@testes.com.br', 'x', 'MEDICO', 1)"
+    ))
+    conexao.execute(text(
+        "INSERT INTO medicos (id, usuario_id, crm, especialidade, telefone, data_nascimento, cpf, "
+        "horario_inicio_atendimento, horario_fim_atendimento, dias_atendimento, tempo_consulta) "
+        "VALUES (1, 1, 'CRM1', 'Clínica', '11999999999', '1980-01-01', '00000000001', '08:00', '18:00', '1,2,3,4,5', 30)"
+    ))
+    conexao.execute(text(
+        "INSERT INTO pacientes (id, nome, cpf, data_nascimento, sexo, telefone, tipo_contato, data_criacao) "
+        "VALUES (1, 'João  da SILVA', '12345678901', '1990-05-01', 'MASCULINO', '(11) 98765-4321', 'CELULAR', "
+        "'2026-10-01 12:00:00')"
+    ))
+    for numero, hora in enumerate(horarios, start=1):
+        conexao.execute(text(
+            "INSERT INTO consultas (id, paciente_id, medico_id, data_consulta, hora_consulta, status) "
+            f"VALUES ({numero}, 1, 1, '2026-10-19', '{hora}', 'AGENDADA')"
+        ))
+
+def test_migracoes_criam_o_esquema_dos_modelos(migrar):
+    executar, banco = migrar
+
+    executar("head")
+
+    with banco.connect() as conexao:
+        assert compare_metadata(MigrationContext.configure(conexao), Base.metadata) == []
+
+def test_banco_anterior_as_migracoes_e_completado_pelas_revisoes(migrar):
+    executar, banco = migrar
+    # Equivale a um banco criado por create_all e marcado com alembic stamp 0001
+    executar("0001")
+    with banco.begin() as conexao:
+        _clinica_anterior_as_migracoes(conexao)
+
+    executar("head")
+
+    with banco.connect() as conexao:
+        assert conexao.execute(text("SELECT nome_busca, telefone_digitos FROM pacientes")).one() == \
+            ("joao da silva", "11987654321")
+        assert conexao.execute(text("SELECT data, status, total FROM estatisticas_consultas_dia")).all() == \
+            [("2026-10-19", "AGENDADA", 2)]
+        assert conexao.execute(text("SELECT data, novos FROM estatisticas_pacientes_dia")).all() == [("2026-10-01", 1)]
+
+def test_horarios_duplicados_impedem_o_indice_unico(migrar):
+    executar, banco = migrar
+    executar("0001")
+    with banco.begin() as conexao:
+        _clinica_anterior_as_migracoes(conexao, horarios=("09:00:00", "09:00:00"))
+
+    with pytest.raises(RuntimeError, match="mesmo horário"):
+        executar("head")
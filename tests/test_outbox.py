@@ -0,0 +1,90 @@
+# tests/test_outbox.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.consulta import Consulta as ConsultaModel
+from app.models.notificacao import NotificacaoEmail, StatusNotificacao
+from app.services.email_service import ConexaoSMTP
+from app.services.notificacao_service import processar_lote
+from conftest import proxima_segunda
+
+pytestmark = pytest.mark.anyio
+
+async def _agendar(cliente, admin, medico, pacientes):
+    dia = proxima_segunda()
+    ids = []
+    for indice, paciente in enumerate(pacientes):
+        resposta = await cliente.post("/api/consultas/", json={
+            "medico_id": medico.id, "paciente_id": paciente.id,
+            "data_consulta": dia.isoformat(), "hora_consulta": f"{9 + indice:02d}:00:00"
+        }, headers=admin)
+        assert resposta.status_code == 200, resposta.text
+        ids.append(resposta.json()["id"])
+    return ids
+
+def _notificacoes(db):
+    db.expire_all()
+    return {n.destinatario: n for n in db.query(NotificacaoEmail).order_by(NotificacaoEmail.id)}
+
+async def test_agendamento_grava_na_outbox_sem_falar_com_o_smtp(
+    cliente, admin, db, servidor_smtp, criar_medico, criar_paciente
+):
+    servidor_smtp.atraso = 1.0
+    await _agendar(cliente, admin, criar_medico(), [criar_paciente(email="ana@testes.com.br")])
+
+    assert servidor_smtp.conexoes == 0
+    assert _notificacoes(db)["ana@testes.com.br"].status == StatusNotificacao.PENDENTE
+
+async def test_lote_e_enviado_por_uma_unica_conexao(
+    cliente, admin, db, servidor_smtp, criar_medico, criar_paciente
+):
+    emails = [f"paciente{i}@testes.com.br" for i in range(5)]
+    consultas = await _agendar(cliente, admin, criar_medico(), [criar_paciente(email=email) for email in emails])
+
+    with ConexaoSMTP() as conexao:
+        assert processar_lote(db, conexao) == 5
+
+    assert servidor_smtp.destinatarios() == emails
+    assert servidor_smtp.conexoes == 1
+    assert all(n.status == StatusNotificacao.ENVIADA for n in _notificacoes(db).values())
+    assert all(c.notificacao_enviada for c in db.query(ConsultaModel).filter(ConsultaModel.id.in_(consultas)))
+
+async def test_falha_descarta_a_conexao_e_o_restante_do_lote_e_entregue(
+    cliente, admin, db, servidor_smtp, criar_medico, criar_paciente
+):
+    emails = ["antes@testes.com.br", "falha@testes.com.br", "depois@testes.com.br", "ultimo@testes.com.br"]
+    await _agendar(cliente, admin, criar_medico(), [criar_paciente(email=email) for email in emails])
+    servidor_smtp.fora_de_ordem.add("falha@testes.com.br")
+
+    with ConexaoSMTP() as conexao:
+        processar_lote(db, conexao)
+
+    assert servidor_smtp.destinatarios() == ["antes@testes.com.br", "depois@testes.com.br", "ultimo@testes.com.br"]
+    assert servidor_smtp.conexoes == 2
+    falha = _notificacoes(db)["falha@testes.com.br"]
+    assert falha.status == StatusNotificacao.PENDENTE
+    assert falha.tentativas == 1
+    assert "451" in falha.ultimo_erro
+    assert falha.proxima_tentativa.replace(tzinfo=None) > datetime.utcnow()
+
+async def test_notificacao_vai_para_falha_ao_esgotar_as_tentativas(
+    cliente, admin, db, servidor_smtp, monkeypatch, criar_medico, criar_paciente
+):
+    from app.config import settings
+    monkeypatch.setattr(settings, "OUTBOX_MAX_TENTATIVAS", 2)
+    await _agendar(cliente, admin, criar_medico(), [criar_paciente(email="falha@testes.com.br")])
+    servidor_smtp.fora_de_ordem.add("falha@testes.com.br")
+
+    for _ in range(2):
+        with ConexaoSMTP() as conexao:
+            processar_lote(db, conexao)
+        # Antecipar a próxima tentativa em vez de esperar o backoff
+        db.query(NotificacaoEmail).update({NotificacaoEmail.proxima_tentativa: datetime.utcnow() - timedelta(minutes=1)})
+        db.commit()
+
+    notificacao = _notificacoes(db)["falha@testes.com.br"]
+    assert notificacao.status == StatusNotificacao.FALHA
+    assert notificacao.tentativas == 2
+    with ConexaoSMTP() as conexao:
+        assert processar_lote(db, conexao) == 0
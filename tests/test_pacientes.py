@@ -0,0 +1,53 @@
+# tests/test_pacientes.py
+import pytest
+from sqlalchemy import update
+
+from app.models.paciente import Paciente as PacienteModel
+from app.services.paciente_service import preencher_colunas_busca
+
+pytestmark = pytest.mark.anyio
+
+async def _buscar(cliente, headers, termo):
+    resposta = await cliente.get("/api/pacientes/", params={"busca": termo}, headers=headers)
+    assert resposta.status_code == 200
+    return [paciente["nome"] for paciente in resposta.json()]
+
+async def test_pacientes_antigos_voltam_a_busca_apos_o_preenchimento(cliente, admin, db, criar_paciente):
+    criar_paciente(nome="João da Conceição", telefone="(11) 97654-3210")
+    criar_paciente(nome="Maria Souza", telefone="(21) 3333-4444")
+    # Como estavam antes das colunas de busca existirem
+    db.execute(update(PacienteModel).values(nome_busca=None, telefone_digitos=None))
+    db.commit()
+    assert await _buscar(cliente, admin, "conceicao") == []
+
+    assert preencher_colunas_busca(db, tamanho_lote=1) == 2
+
+    assert await _buscar(cliente, admin, "conceicao") == ["João da Conceição"]
+    assert await _buscar(cliente, admin, "2133334") == ["Maria Souza"]
+    # Nada mais a preencher: executar de novo não altera nada
+    assert preencher_colunas_busca(db) == 0
+
+async def test_listagem_de_pacientes_tira_o_etag_das_linhas_servidas(
+    cliente, admin, db, contar_instrucoes, criar_paciente
+):
+    pacientes = [criar_paciente() for _ in range(3)]
+    await cliente.get("/api/pacientes/?limit=1", headers=admin)
+
+    with contar_instrucoes() as instrucoes:
+        primeira = await cliente.get("/api/pacientes/", headers=admin)
+    # Conteúdo e versões na mesma instrução
+    assert primeira.status_code == 200 and len(instrucoes) == 1
+    assert "last-modified" not in primeira.headers
+
+    with contar_instrucoes() as instrucoes:
+        repetida = await cliente.get("/api/pacientes/", headers={**admin, "If-None-Match": primeira.headers["etag"]})
+    assert repetida.status_code == 304 and len(instrucoes) == 1
+
+    pacientes[1].nome = "Paciente Renomeado"
+    db.commit()
+    with contar_instrucoes() as instrucoes:
+        alterada = await cliente.get("/api/pacientes/", headers={**admin, "If-None-Match": primeira.headers["etag"]})
+    assert alterada.status_code == 200 and len(instrucoes) == 2
+    assert "Paciente Renomeado" in [paciente["nome"] for paciente in alterada.json()]
+    assert alterada.headers["etag"] not in (primeira.headers["etag"], None)
+    assert (await cliente.get("/api/pacientes/", headers=admin)).headers["etag"] == alterada.headers["etag"]
@@ -0,0 +1,27 @@
+# tests/test_planos.py
+import pytest
+from sqlalchemy import text
+
+from app.database import SessionLocal
+from benchmarks.gerador_clinica import gerar_clinica
+from benchmarks.planos_consultas import amostrar, verificar_planos
+
+@pytest.fixture
+def clinica():
+    gerar_clinica(medicos=4, pacientes=300, ocupacao=0.6, semente=42)
+    with SessionLocal() as db:
+        db.execute(text("ANALYZE"))
+        db.commit()
+        yield db
+
+def test_consultas_quentes_nao_leem_tabelas_inteiras(clinica):
+    amostra = amostrar(clinica)
+    assert amostra is not None
+
+    resultados = {nome: (completas, planos) for nome, completas, planos in verificar_planos(clinica, amostra)}
+
+    assert "linha do tempo do paciente" in resultados
+    sem_instrucoes = [nome for nome, (_, planos) in resultados.items() if not planos]
+    assert sem_instrucoes == []
+    leituras_completas = {nome: planos for nome, (completas, planos) in resultados.items() if completas}
+    assert leituras_completas == {}
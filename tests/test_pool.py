@@ -0,0 +1,59 @@
+# tests/test_pool.py
+import threading
+import time
+
+import pytest
+from sqlalchemy import exc
+
+from app.config import settings
+from app.database import MetricasPool, criar_engine, engine, metricas_pool
+
+def _contadores():
+    with metricas_pool._lock:
+        return metricas_pool.checkouts, metricas_pool.timeouts, list(metricas_pool.histograma)
+
+def _balde(espera: float) -> int:
+    return next(i for i, limite in enumerate(MetricasPool.LIMITES_HISTOGRAMA) if espera <= limite)
+
+@pytest.fixture
+def pool_de_uma_conexao(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.2)
+    pequeno = criar_engine(engine.url.render_as_string(hide_password=False))
+    yield pequeno
+    pequeno.dispose()
+
+def test_pool_esgotado_conta_o_timeout(pool_de_uma_conexao):
+    checkouts, timeouts, _ = _contadores()
+
+    with pool_de_uma_conexao.connect():
+        with pytest.raises(exc.TimeoutError):
+            pool_de_uma_conexao.connect()
+
+    assert _contadores()[:2] == (checkouts + 1, timeouts + 1)
+
+def test_espera_por_conexao_vai_para_o_histograma(pool_de_uma_conexao):
+    ocupada = threading.Event()
+
+    def segurar_conexao():
+        with pool_de_uma_conexao.connect():
+            ocupada.set()
+            time.sleep(0.1)
+
+    segurando = threading.Thread(target=segurar_conexao)
+    segurando.start()
+    ocupada.wait(5)
+    checkouts, timeouts, histograma = _contadores()
+
+    with pool_de_uma_conexao.connect():
+        pass
+    segurando.join()
+
+    novo_checkouts, novo_timeouts, novo_histograma = _contadores()
+    assert (novo_checkouts, novo_timeouts) == (checkouts + 1, timeouts)
+    # Esperou os ~0,1 s em que a única conexão esteve ocupada: um registro, acima de 50 ms
+    diferenca = [depois - antes for antes, depois in zip(histograma, novo_histograma)]
+    assert sum(diferenca) == 1
+    assert sum(diferenca[_balde(0.05) + 1:]) == 1
+    assert metricas_pool.espera_maxima > 0.05
@@ -0,0 +1,79 @@
+# tests/test_replicas.py
+from collections import Counter
+from datetime import date
+
+import httpx
+import pytest
+
+from app.database import Replica, SessionLeitura, roteador_leituras
+from app.main import app
+from app.models.usuario import Base
+from app.models.paciente import Paciente as PacienteModel, Sexo, TipoContato
+from app.utils.replicas import COOKIE_PRIMARIO, MiddlewareLeituraPrimario, _escritas_recentes
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """Um segundo arquivo SQLite como réplica, com um paciente que o primário não tem."""
+    replica = Replica("replica0", f"sqlite:///{tmp_path}/replica.db")
+    Base.metadata.create_all(bind=replica.engine)
+    with SessionLeitura(bind=replica.engine) as sessao:
+        sessao.add(PacienteModel(
+            nome="Paciente da Réplica", cpf="11111111111", data_nascimento=date(1990, 1, 1),
+            sexo=Sexo.FEMININO, telefone="11988880000", tipo_contato=TipoContato.CELULAR
+        ))
+        sessao.commit()
+    monkeypatch.setattr(roteador_leituras, "replicas", [replica])
+    _escritas_recentes.clear()
+    yield replica
+    _escritas_recentes.clear()
+    replica.engine.dispose()
+
+@pytest.fixture
+async def cliente_replicas():
+    """Cliente da aplicação com o middleware de read-your-writes, ligado quando há réplicas."""
+    transporte = httpx.ASGITransport(app=MiddlewareLeituraPrimario(app))
+    async with httpx.AsyncClient(transport=transporte, base_url="http://testes") as cliente:
+        yield cliente
+
+async def _nomes_pacientes(cliente, headers):
+    resposta = await cliente.get("/api/pacientes/", headers=headers)
+    assert resposta.status_code == 200
+    return {paciente["nome"] for paciente in resposta.json()}
+
+def _decisoes_desde(antes: Counter) -> Counter:
+    return roteador_leituras.decisoes - antes
+
+async def test_leitura_sem_cookie_vai_para_a_replica(cliente_replicas, admin, replica, criar_paciente):
+    criar_paciente(nome="Paciente do Primário")
+    antes = Counter(roteador_leituras.decisoes)
+
+    assert await _nomes_pacientes(cliente_replicas, admin) == {"Paciente da Réplica"}
+    assert _decisoes_desde(antes) == Counter({("replica0", "rodizio"): 1})
+
+async def test_leitura_logo_apos_escrita_vai_para_o_primario(cliente_replicas, admin, replica, criar_paciente):
+    paciente = criar_paciente(nome="Paciente do Primário")
+    resposta = await cliente_replicas.put(
+        f"/api/pacientes/{paciente.id}", json={"nome": "Paciente Atualizado"}, headers=admin
+    )
+    assert resposta.status_code == 200
+    assert COOKIE_PRIMARIO in resposta.cookies
+    # Só o cookie leva ao primário, como aconteceria em outro processo da aplicação
+    _escritas_recentes.clear()
+    antes = Counter(roteador_leituras.decisoes)
+
+    assert await _nomes_pacientes(cliente_replicas, admin) == {"Paciente Atualizado"}
+    assert _decisoes_desde(antes) == Counter({("primario", "escrita_recente"): 1})
+
+    cliente_replicas.cookies.clear()
+    assert await _nomes_pacientes(cliente_replicas, admin) == {"Paciente da Réplica"}
+
+async def test_sem_replicas_tudo_vai_para_o_primario(cliente_replicas, admin, criar_paciente):
+    assert roteador_leituras.replicas == []
+    criar_paciente(nome="Paciente do Primário")
+    antes = Counter(roteador_leituras.decisoes)
+
+    assert await _nomes_pacientes(cliente_replicas, admin) == {"Paciente do Primário"}
+    assert (await cliente_replicas.get("/api/medicos/", headers=admin)).status_code == 200
+    assert _decisoes_desde(antes) == Counter({("primario", "sem_replicas"): 2})
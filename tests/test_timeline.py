@@ -0,0 +1,45 @@
+# tests/test_timeline.py
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from app.models.consulta import StatusConsulta
+from app.models.prontuario import Prontuario as ProntuarioModel
+from conftest import proxima_segunda
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def historico(db, criar_medico, criar_paciente, criar_consulta):
+    """Seis consultas em três dias, com prontuários intercalados entre elas."""
+    medico, paciente = criar_medico(), criar_paciente()
+    segunda = proxima_segunda()
+    esperado = []
+    for dia in range(3):
+        data = segunda + timedelta(days=dia)
+        for hora in (time(9, 0), time(10, 0)):
+            consulta = criar_consulta(medico, paciente, data, hora, StatusConsulta.CONCLUIDA)
+            esperado.append((datetime.combine(data, hora), "consulta", consulta.id))
+        # Registrado entre as duas consultas do dia
+        prontuario = ProntuarioModel(
+            paciente_id=paciente.id, consulta_id=consulta.id, medico_id=medico.id,
+            diagnostico="Gripe", data_criacao=datetime.combine(data, time(9, 30))
+        )
+        db.add(prontuario)
+        db.commit()
+        esperado.append((datetime.combine(data, time(9, 30)), "prontuario", prontuario.id))
+    return paciente, [(tipo, id) for _, tipo, id in sorted(esperado, reverse=True)]
+
+async def test_timeline_paginada_pelo_cursor(cliente, admin, historico):
+    paciente, esperado = historico
+    itens, cursor = [], None
+    for _ in range(len(esperado)):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resposta = await cliente.get(f"/api/pacientes/{paciente.id}/timeline", params=params, headers=admin)
+        assert resposta.status_code == 200, resposta.text
+        itens += [(item["tipo"], item["id"]) for item in resposta.json()]
+        cursor = resposta.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert itens == esperado
@@ -0,0 +1,44 @@
+# tests/test_usuarios.py
+import pytest
+
+from app.models.usuario import TipoUsuario
+
+pytestmark = pytest.mark.anyio
+
+async def test_listagem_de_usuarios_percorre_todas_as_paginas_pelo_cursor(cliente, admin, criar_usuario):
+    for indice, nome in enumerate(["Carla", "Bruno", "Ana", "Bruno", "Davi", "Elisa"]):
+        criar_usuario(nome=nome, email=f"usuario{indice}@testes.com.br", tipo=TipoUsuario.RECEPCIONISTA)
+
+    vistos = []
+    cursor = None
+    paginas = 0
+    while True:
+        url = "/api/usuarios/?limit=3" + (f"&cursor={cursor}" if cursor else "")
+        resposta = await cliente.get(url, headers=admin)
+        assert resposta.status_code == 200, resposta.text
+        vistos.extend(resposta.json())
+        paginas += 1
+        cursor = resposta.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    chaves = [(usuario["nome"], usuario["id"]) for usuario in vistos]
+    assert chaves == sorted(chaves)
+    assert len({usuario["id"] for usuario in vistos}) == len(vistos) == 7
+    assert paginas == 3
+    assert {usuario["tipo"] for usuario in vistos} == {"administrador", "recepcionista"}
+
+async def test_skip_e_limit_continuam_funcionando(cliente, admin, criar_usuario):
+    for indice in range(4):
+        criar_usuario(nome=f"Usuário {indice}", email=f"usuario{indice}@testes.com.br", tipo=TipoUsuario.MEDICO)
+
+    primeira = await cliente.get("/api/usuarios/?skip=0&limit=2", headers=admin)
+    segunda = await cliente.get("/api/usuarios/?skip=2&limit=2", headers=admin)
+
+    assert primeira.status_code == segunda.status_code == 200
+    ids = [usuario["id"] for usuario in primeira.json() + segunda.json()]
+    assert len(set(ids)) == 4
+
+async def test_cursor_invalido_e_recusado(cliente, admin):
+    resposta = await cliente.get("/api/usuarios/?cursor=nao-e-um-cursor", headers=admin)
+    assert resposta.status_code == 400